@@ -0,0 +1,244 @@
+"""Semantic answer cache for `ask_persona`.
+
+Synthesized answers are cached per persona and keyed by the query embedding.
+A lookup is a hit when a cached question's embedding has cosine similarity
+of at least `answer_cache_similarity_threshold` with the new one, so
+near-identical phrasings of the same question reuse one Opus synthesis.
+
+Every entry is stored under the persona's *fingerprint* (a hash of its
+voice prompt and the ingestion generation of its collections). When a
+persona is re-ingested or its `voice_prompt` changes, the fingerprint
+changes and old entries stop matching; the registry reloader also calls
+`invalidate()` to drop them eagerly.
+
+Backends (`answer_cache_backend`):
+  - "memory" — in-process, LRU + TTL (default)
+  - "redis"  — shared across MCP processes via `settings.redis_url`
+  - "none"   — caching disabled
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+@dataclass
+class _Entry:
+    persona_id: str
+    fingerprint: str
+    embedding: np.ndarray  # unit-normalized float32
+    answer: str
+    created_at: float
+
+
+class InProcessAnswerCache:
+    """In-process semantic cache with global LRU eviction and per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_persona: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None:
+            self._by_persona.get(entry.persona_id, set()).discard(entry_id)
+
+    async def lookup(self, persona_id: str, fingerprint: str, embedding: list[float]) -> str | None:
+        query = _normalize(embedding)
+        now = time.time()
+        with self._lock:
+            best_id, best_score = None, -1.0
+            for entry_id in list(self._by_persona.get(persona_id, ())):
+                entry = self._entries[entry_id]
+                if entry.fingerprint != fingerprint or now - entry.created_at > self.ttl_seconds:
+                    self._drop(entry_id)
+                    continue
+                score = float(np.dot(entry.embedding, query))
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id].answer
+
+    async def store(self, persona_id: str, fingerprint: str, embedding: list[float], answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[entry_id] = _Entry(
+                persona_id, fingerprint, _normalize(embedding), answer, time.time()
+            )
+            self._by_persona.setdefault(persona_id, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, persona_id: str) -> None:
+        with self._lock:
+            for entry_id in list(self._by_persona.pop(persona_id, ())):
+                self._entries.pop(entry_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_entries_scope": "global",
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RedisAnswerCache:
+    """Redis-backed semantic cache shared by all MCP processes.
+
+    Layout per (persona, fingerprint), with base key {prefix}:{persona}:{fingerprint}:
+      {base}:emb      hash  entry_id -> float32 unit embedding (raw bytes)
+      {base}:answers  hash  entry_id -> answer
+      {base}:created  zset  entry_id -> creation time (per-entry TTL)
+      {base}:lru      zset  entry_id -> last access time
+
+    A lookup reads only the embeddings and then fetches the answer of the
+    best match, so its transfer size does not grow with answer length.
+    Unlike the in-memory backend (one global LRU), `max_entries` applies
+    per persona fingerprint; all keys expire after `ttl_seconds` without
+    writes, and expired entries are pruned on lookup.
+    """
+
+    def __init__(self, redis_url: str, max_entries: int, ttl_seconds: float, threshold: float,
+                 prefix: str = "answer_cache"):
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, persona_id: str, fingerprint: str) -> str:
+        return f"{self.prefix}:{persona_id}:{fingerprint}"
+
+    async def _remove(self, key: str, entry_ids: list) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(f"{key}:emb", *entry_ids)
+            pipe.hdel(f"{key}:answers", *entry_ids)
+            pipe.zrem(f"{key}:created", *entry_ids)
+            pipe.zrem(f"{key}:lru", *entry_ids)
+            await pipe.execute()
+
+    async def lookup(self, persona_id: str, fingerprint: str, embedding: list[float]) -> str | None:
+        key = self._key(persona_id, fingerprint)
+        now = time.time()
+        expired = await self._redis.zrangebyscore(f"{key}:created", "-inf", now - self.ttl_seconds)
+        if expired:
+            await self._remove(key, expired)
+
+        query = _normalize(embedding)
+        best_id, best_score = None, -1.0
+        for entry_id, raw in (await self._redis.hgetall(f"{key}:emb")).items():
+            if entry_id in expired:
+                continue
+            score = float(np.dot(np.frombuffer(raw, dtype=np.float32), query))
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        answer = None
+        if best_id is not None and best_score >= self.threshold:
+            answer = await self._redis.hget(f"{key}:answers", best_id)
+        if answer is None:  # no match, or evicted meanwhile
+            self.misses += 1
+            return None
+
+        await self._redis.zadd(f"{key}:lru", {best_id: now})
+        self.hits += 1
+        return answer.decode() if isinstance(answer, bytes) else answer
+
+    async def store(self, persona_id: str, fingerprint: str, embedding: list[float], answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(persona_id, fingerprint)
+        entry_id = uuid.uuid4().hex
+        now = time.time()
+        ttl = int(self.ttl_seconds)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"{key}:emb", entry_id, _normalize(embedding).tobytes())
+            pipe.hset(f"{key}:answers", entry_id, answer)
+            pipe.zadd(f"{key}:created", {entry_id: now})
+            pipe.zadd(f"{key}:lru", {entry_id: now})
+            for suffix in ("emb", "answers", "created", "lru"):
+                pipe.expire(f"{key}:{suffix}", ttl)
+            await pipe.execute()
+
+        # LRU eviction beyond max_entries
+        overflow = await self._redis.zcard(f"{key}:lru") - self.max_entries
+        if overflow > 0:
+            evicted = await self._redis.zrange(f"{key}:lru", 0, overflow - 1)
+            if evicted:
+                await self._remove(key, evicted)
+
+    async def invalidate(self, persona_id: str) -> None:
+        keys = [k async for k in self._redis.scan_iter(match=f"{self.prefix}:{persona_id}:*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "max_entries": self.max_entries,
+            "max_entries_scope": "persona_fingerprint",
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache = None
+_cache_loaded = False
+
+
+def get_answer_cache():
+    """Return the configured answer cache backend, or None when caching is disabled."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        backend = settings.answer_cache_backend.lower()
+        kwargs = dict(
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            threshold=settings.answer_cache_similarity_threshold,
+        )
+        if backend == "memory":
+            _cache = InProcessAnswerCache(**kwargs)
+        elif backend == "redis":
+            _cache = RedisAnswerCache(settings.redis_url, **kwargs)
+        elif backend != "none":
+            logger.warning(f"Unknown ANSWER_CACHE_BACKEND '{backend}' — answer cache disabled")
+        _cache_loaded = True
+        if _cache is not None:
+            logger.info(f"Answer cache enabled (backend={backend})")
+    return _cache
@@ -0,0 +1,157 @@
+"""Per-stage concurrency limits for the MCP server request pipeline.
+
+Blocking work (Chroma queries, index loading) must never run on the event
+loop: a single slow query would stall every other MCP request served by the
+streamable-http transport. A `StageLimiter` runs such work on a dedicated
+thread pool and caps how many calls of that stage may be in flight at once.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class StageLimiter:
+    """Bound the concurrency of one pipeline stage, optionally on a thread pool.
+
+    Args:
+        name: Stage name (used for thread names and stats).
+        max_concurrency: Maximum number of calls allowed in flight at once.
+        max_workers: Thread pool size for blocking calls (None = no pool;
+            only `limit()` may be used).
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_workers: int | None = None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.abandoned = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"{self.name}-stage",
+                    )
+        return self._executor
+
+    def limit(self, timeout: float | None = None) -> "_StageSlot":
+        """Async context manager holding one concurrency slot of this stage.
+
+        Raises asyncio.TimeoutError if no slot frees up within `timeout` seconds.
+        """
+        return _StageSlot(self, timeout)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the stage thread pool within the concurrency limit.
+
+        The caller's context variables (request ID, current trace span) are
+        visible to the callable. The slot is held until the thread returns:
+        if the caller is cancelled (e.g. by `asyncio.wait_for`) while the
+        callable runs, the call is counted as `abandoned` in `stats()` and
+        still occupies the slot, so slow calls cannot pile up unbounded on
+        the thread pool behind the limit.
+        """
+        if self.max_workers is None:
+            raise RuntimeError(f"Stage '{self.name}' has no thread pool configured")
+
+        slot = self.limit()
+        await slot.__aenter__()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(
+                functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            )
+        except BaseException:
+            await slot.__aexit__(None, None, None)
+            raise
+        abandoned = False
+
+        def release(_future) -> None:
+            if abandoned:
+                self.abandoned -= 1
+            slot._release()
+
+        def on_done(_future) -> None:
+            try:
+                loop.call_soon_threadsafe(release, _future)
+            except RuntimeError:  # event loop already closed
+                pass
+
+        future.add_done_callback(on_done)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.running():
+                abandoned = True
+                self.abandoned += 1
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "stage": self.name,
+            "max_concurrency": self.max_concurrency,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class _StageSlot:
+    """Async context manager acquiring/releasing one slot of a StageLimiter."""
+
+    def __init__(self, stage: StageLimiter, timeout: float | None = None):
+        self._stage = stage
+        self._timeout = timeout
+
+    async def __aenter__(self):
+        stage = self._stage
+        semaphore = stage._get_semaphore()
+        stage.waiting += 1
+        try:
+            async with asyncio.timeout(self._timeout):
+                await semaphore.acquire()
+        finally:
+            stage.waiting -= 1
+        stage.in_flight += 1
+        return self
+
+    def _release(self) -> None:
+        stage = self._stage
+        stage.in_flight -= 1
+        stage.completed += 1
+        stage._get_semaphore().release()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._release()
+        return False
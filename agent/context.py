@@ -0,0 +1,167 @@
+"""Token-budgeted context assembly for persona synthesis.
+
+Retrieved chunks are packed into the synthesis prompt under a per-request
+token budget instead of fixed per-collection character limits:
+
+  1. Each section (profile, works, quotes) gets a share of the budget.
+  2. Near-duplicate and overlapping chunks (consecutive chunks share their
+     `chunk_overlap`) are dropped, across all sections.
+  3. A chunk that does not fit is cut at the last sentence boundary that fits.
+  4. Budget left unused by one section is handed to the others, in order.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+|\n{2,}")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Don't bother keeping a truncated chunk shorter than this many tokens
+MIN_TRUNCATED_TOKENS = 40
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the shared LlamaIndex tokenizer (tiktoken)."""
+    from llama_index.core.utils import get_tokenizer
+
+    return len(get_tokenizer()(text))
+
+
+@dataclass
+class RetrievedChunk:
+    """One retrieved node as used for context assembly."""
+
+    text: str
+    source: str
+    collection_type: str
+    node_id: str = ""
+    score: float | None = None
+
+
+@dataclass
+class ContextSection:
+    """A titled section of the context with its share of the token budget."""
+
+    name: str
+    header: str
+    chunks: list[RetrievedChunk]
+    share: float
+
+
+@dataclass
+class AssembledContext:
+    context: str
+    sources: set[str]
+    tokens: int
+    chunks: list[RetrievedChunk] = field(default_factory=list)
+    dropped_duplicates: int = 0
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = [w.casefold() for w in _WORD.findall(text)]
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _is_duplicate(shingles: set, kept: list[set], threshold: float) -> bool:
+    """True if `shingles` is mostly contained in (or contains) an already kept chunk."""
+    if not shingles:
+        return True
+    for other in kept:
+        if not other:
+            continue
+        overlap = len(shingles & other) / min(len(shingles), len(other))
+        if overlap >= threshold:
+            return True
+    return False
+
+
+def truncate_to_sentences(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of whole sentences that fits in `max_tokens` ("" if none)."""
+    sentences = [s for s in _SENTENCE_END.split(text) if s and s.strip()]
+    kept: list[str] = []
+    used = 0
+    for sentence in sentences:
+        tokens = count_tokens(sentence) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence.strip())
+        used += tokens
+    return " ".join(kept)
+
+
+class ContextAssembler:
+    """Pack retrieved chunks into a context string under a token budget."""
+
+    def __init__(self, token_budget: int, dedup_threshold: float = 0.8):
+        self.token_budget = token_budget
+        self.dedup_threshold = dedup_threshold
+
+    def assemble(self, sections: list[ContextSection]) -> AssembledContext:
+        total_share = sum(s.share for s in sections) or 1.0
+        pending = {s.name: list(s.chunks) for s in sections}
+        selected: dict[str, list[str]] = {s.name: [] for s in sections}
+        included: list[RetrievedChunk] = []
+        kept_shingles: list[set] = []
+        dropped = 0
+
+        def fill(section: ContextSection, allowance: int) -> int:
+            nonlocal dropped
+            used = 0
+            queue = pending[section.name]
+            while queue and used < allowance:
+                chunk = queue.pop(0)
+                shingles = _shingles(chunk.text)
+                if _is_duplicate(shingles, kept_shingles, self.dedup_threshold):
+                    dropped += 1
+                    continue
+
+                text = chunk.text.strip()
+                tokens = count_tokens(text)
+                if used + tokens > allowance:
+                    room = allowance - used
+                    if room < MIN_TRUNCATED_TOKENS:
+                        queue.insert(0, chunk)  # may still fit with spare budget later
+                        break
+                    text = truncate_to_sentences(text, room)
+                    if not text:
+                        queue.insert(0, chunk)
+                        break
+                    tokens = count_tokens(text)
+
+                selected[section.name].append(text)
+                included.append(chunk)
+                kept_shingles.append(shingles)
+                used += tokens
+            return used
+
+        # Pass 1: each section within its own quota
+        spare = 0
+        for section in sections:
+            quota = int(self.token_budget * section.share / total_share)
+            spare += quota - fill(section, quota)
+
+        # Pass 2: redistribute unused budget, in section order
+        for section in sections:
+            if spare <= 0:
+                break
+            if pending[section.name]:
+                spare -= fill(section, spare)
+
+        parts = [
+            section.header + "\n\n---\n\n".join(selected[section.name])
+            for section in sections
+            if selected[section.name]
+        ]
+        context = "\n\n".join(parts)
+        return AssembledContext(
+            context=context,
+            sources={c.source for c in included},
+            tokens=count_tokens(context) if context else 0,
+            chunks=included,
+            dropped_duplicates=dropped,
+        )
@@ -0,0 +1,206 @@
+"""In-memory NumPy flat index for small collections.
+
+The quotes and profile collections hold a few thousand vectors each; for
+them an exact brute-force search over one contiguous float32 matrix is
+faster than a round trip through Chroma's client and HNSW index. The
+whole collection (embeddings, chunk text, metadata) is loaded once into
+parallel arrays and top-k is answered with a single matrix-vector product
+and `argpartition`.
+
+The MCP server picks this backend automatically for collections with at
+most `flat_index_max_vectors` vectors (see `_get_retriever`).
+
+To bound resident memory with many personas loaded, vectors can be stored
+quantized: float16 (half the size) or int8 with a per-vector scale (a
+quarter). Scores are computed blockwise in float32. With rescoring, the
+top `rescore_factor * top_k` candidates are re-ranked using their
+full-precision vectors fetched from Chroma, recovering exact ordering.
+
+An index can also be opened over a memory-mapped snapshot
+(`ingest.snapshot`); unquantized, its matrix is the mapped file itself, so
+server workers share one copy of it through the page cache.
+"""
+
+import logging
+from typing import Callable
+
+import numpy as np
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from ingest.snapshot import Snapshot, read_collection
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = ("none", "float16", "int8")
+
+# Rows dequantized per step when scoring a quantized matrix
+_BLOCK_ROWS = 4096
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first."""
+    n = len(scores)
+    k = min(k, n)
+    top = np.argpartition(scores, -k)[-k:] if k < n else np.arange(n)
+    return top[np.argsort(scores[top])[::-1]]
+
+
+class FlatIndex:
+    """Cosine-similarity search over an (optionally quantized) embedding matrix.
+
+    `full_precision(rows)` returns the original vectors of the given rows;
+    when set on a quantized index, the top candidates are rescored with them.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+        embeddings: np.ndarray,
+        quantization: str = "none",
+        full_precision: Callable[[list[int]], np.ndarray] | None = None,
+        rescore_factor: int = 4,
+        normalized: bool = False,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.quantization = quantization
+        self.full_precision = full_precision if quantization != "none" else None
+        self.rescore_factor = max(1, rescore_factor)
+        self.scales: np.ndarray | None = None
+
+        if normalized and quantization == "none":
+            self.matrix = embeddings  # used as-is (e.g. a read-only memory map)
+            return
+
+        matrix = _normalize(np.ascontiguousarray(embeddings, dtype=np.float32))
+        if quantization == "float16":
+            matrix = matrix.astype(np.float16)
+        elif quantization == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0, np.float32)
+            scales[scales == 0] = 1.0
+            matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+            self.scales = scales.astype(np.float32)
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @classmethod
+    def from_collection(
+        cls,
+        collection,
+        quantization: str = "none",
+        rescore: bool = False,
+        rescore_factor: int = 4,
+        batch_size: int = 4000,
+    ) -> "FlatIndex":
+        """Load every vector, document and metadata of a Chroma collection.
+
+        With `rescore`, full-precision vectors of the top candidates are
+        re-fetched from the collection at query time.
+        """
+        ids, texts, metadatas, embeddings = read_collection(collection, batch_size)
+
+        def fetch(rows: list[int]) -> np.ndarray:
+            wanted = [ids[r] for r in rows]
+            got = collection.get(ids=wanted, include=["embeddings"])
+            by_id = dict(zip(got["ids"], got["embeddings"]))
+            return np.asarray([by_id[i] for i in wanted], dtype=np.float32)
+
+        return cls(
+            ids, texts, metadatas, embeddings,
+            quantization=quantization,
+            full_precision=fetch if rescore else None,
+            rescore_factor=rescore_factor,
+        )
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Snapshot,
+        quantization: str = "none",
+        rescore: bool = False,
+        rescore_factor: int = 4,
+    ) -> "FlatIndex":
+        """Open an index over a memory-mapped snapshot.
+
+        Quantized indexes copy the (smaller) quantized matrix into process
+        memory and rescore from the mapped float32 file.
+        """
+        return cls(
+            snapshot.ids, snapshot.texts, snapshot.metadatas, snapshot.embeddings,
+            quantization=quantization,
+            full_precision=(lambda rows: snapshot.embeddings[rows]) if rescore else None,
+            rescore_factor=rescore_factor,
+            normalized=True,
+        )
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        if self.quantization == "none":
+            return self.matrix @ query
+        scores = np.empty(len(self.matrix), dtype=np.float32)
+        for start in range(0, len(self.matrix), _BLOCK_ROWS):
+            block = self.matrix[start:start + _BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def search(self, query_embedding, top_k: int) -> list[tuple[int, float]]:
+        """Return (row, cosine similarity) of the `top_k` nearest vectors, best first."""
+        if len(self.ids) == 0 or top_k <= 0:
+            return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        scores = self._scores(query)
+
+        if self.full_precision is not None:
+            candidates = _top_rows(scores, top_k * self.rescore_factor)
+            try:
+                exact = _normalize(self.full_precision(candidates.tolist())) @ query
+            except Exception as e:
+                logger.warning(f"Full-precision rescoring failed, using quantized scores: {e}")
+            else:
+                order = _top_rows(exact, top_k)
+                return [(int(candidates[o]), float(exact[o])) for o in order]
+
+        return [(int(i), float(scores[i])) for i in _top_rows(scores, top_k)]
+
+
+class FlatRetriever(BaseRetriever):
+    """LlamaIndex retriever over a `FlatIndex` (drop-in for the Chroma retriever)."""
+
+    def __init__(self, index: FlatIndex, similarity_top_k: int, embed_model):
+        super().__init__()
+        self._index = index
+        self._similarity_top_k = similarity_top_k
+        self._embed_model = embed_model
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        embedding = query_bundle.embedding
+        if embedding is None:
+            embedding = self._embed_model.get_query_embedding(query_bundle.query_str)
+
+        index = self._index
+        return [
+            NodeWithScore(
+                node=TextNode(id_=index.ids[i], text=index.texts[i], metadata=index.metadatas[i]),
+                score=score,
+            )
+            for i, score in index.search(embedding, self._similarity_top_k)
+        ]
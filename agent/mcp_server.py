@@ -9,48 +9,287 @@ When running remotely, set MCP_API_KEY env var to require Bearer token auth.
 
 import argparse
 import asyncio
+import hashlib
+import json
 import logging
 import secrets
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Annotated, Any
+from typing import Annotated, Any, Awaitable, Callable
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 # Ensure project root is on path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config import settings
+from agent.answer_cache import get_answer_cache
+from agent.concurrency import StageLimiter
+from agent.context import ContextAssembler, ContextSection, RetrievedChunk, count_tokens
+from agent.metrics import (
+    CONTEXT_ASSEMBLY_SECONDS,
+    RETRIEVAL_SECONDS,
+    RETRIEVER_LOADS,
+    SYNTHESIS_FALLBACKS,
+    SYNTHESIS_SECONDS,
+    record_cache,
+    record_tokens,
+    render as render_metrics,
+    timed,
+)
+from agent.persona_router import PersonaRouter
+from agent.retriever_cache import RetrieverCache
+from agent.query_embedding import (
+    embed_query,
+    get_cache_stats as get_embedding_cache_stats,
+    normalize_query,
+)
+from agent.singleflight import Emit, SingleFlight
+from agent.slow_query_log import get_slow_query_log
+from agent.synthesis_client import SynthesisBusyError, get_synthesis_manager
+from agent.tracing import configure_tracing, get_request_id, set_request_id, span
+from ingest.lexical_index import (
+    BM25Index,
+    is_lexical_query,
+    lexical_index_path,
+    reciprocal_rank_fusion,
+    strip_query_quotes,
+)
+from ingest.snapshot import Snapshot
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Lazy-loaded retrievers: Dict[(persona_id, collection_type), retriever]
+# Lazy-loaded retrievers: bounded LRU keyed by (persona_id, collection_type),
+# stamped with (top_k, collection ingestion generation)
 # ---------------------------------------------------------------------------
-_retrievers: dict[tuple[str, str], Any] = {}
+_retriever_cache = RetrieverCache(settings.retriever_cache_max_entries)
+# BM25 lexical indexes, same keys and stamps (loaded from ingestion-built files)
+_lexical_cache = RetrieverCache(settings.retriever_cache_max_entries)
+
+# Blocking retrieval (index loading + Chroma queries) runs on this thread pool
+_retrieval_stage = StageLimiter(
+    "retrieval",
+    max_concurrency=settings.retrieval_max_concurrency,
+    max_workers=settings.retrieval_max_workers,
+)
+
+
+def _collection_top_k(persona, collection_type: str) -> int:
+    """Use persona-specific top_k or fall back to settings default."""
+    top_k = getattr(persona, f"{collection_type}_top_k", None)
+    if top_k is None:
+        top_k = getattr(settings, f"default_{collection_type}_top_k")
+    return top_k
 
 
 def _get_retriever(persona_id: str, collection_type: str):
-    """Get or create a retriever for a specific persona collection."""
-    key = (persona_id, collection_type)
-    if key not in _retrievers:
-        from personas import get_persona
-        from ingest.run_ingestion import get_index
+    """Get or create a retriever for a specific persona collection.
 
-        persona = get_persona(persona_id)
-        collection_name = getattr(persona, f"{collection_type}_collection")
+    Called from retrieval worker threads. The cached retriever is rebuilt
+    when the persona's top_k (from the reloaded registry) or the
+    collection's ingestion generation changed since it was loaded.
+    """
+    from personas import get_persona
 
-        # Use persona-specific top_k or fall back to settings default
-        top_k = getattr(persona, f"{collection_type}_top_k", None)
-        if top_k is None:
-            top_k = getattr(settings, f"default_{collection_type}_top_k")
+    persona = get_persona(persona_id)
+    collection_name = getattr(persona, f"{collection_type}_collection")
+    top_k = _collection_top_k(persona, collection_type)
+    stamp = (top_k, _collection_generation(collection_name))
+    loaded = False
+
+    def load():
+        nonlocal loaded
+        from ingest.run_ingestion import get_collection, get_index
+
+        loaded = True
+
+        # Small collections: exact NumPy search instead of Chroma/HNSW,
+        # mapped from the ingestion snapshot when it is current
+        if settings.flat_index_max_vectors:
+            from agent.flat_index import FlatIndex, FlatRetriever
+            from agent.query_embedding import _get_embed_model
+
+            options = dict(
+                quantization=settings.flat_index_quantization,
+                rescore=settings.flat_index_rescore,
+                rescore_factor=settings.flat_index_rescore_factor,
+            )
+            flat = None
+            snapshot = Snapshot.open(collection_name) if settings.embedding_snapshots else None
+            if snapshot is not None and snapshot.generation == stamp[1]:
+                if len(snapshot) <= settings.flat_index_max_vectors:
+                    flat = FlatIndex.from_snapshot(snapshot, **options)
+                    origin = "snapshot"
+            else:
+                collection = get_collection(collection_name)
+                if collection.count() <= settings.flat_index_max_vectors:
+                    flat = FlatIndex.from_collection(collection, **options)
+                    origin = "chroma"
+
+            if flat is not None:
+                logger.info(
+                    f"Loaded flat retriever: {collection_name} from {origin} ({len(flat)} vectors, "
+                    f"{flat.quantization}, {flat.nbytes / 1e6:.1f} MB, top_k={top_k})"
+                )
+                RETRIEVER_LOADS.labels(persona_id, collection_type, f"flat_{origin}").inc()
+                return FlatRetriever(flat, top_k, _get_embed_model())
 
         index = get_index(persona_id, collection_type)
-        _retrievers[key] = index.as_retriever(similarity_top_k=top_k)
+        retriever = index.as_retriever(similarity_top_k=top_k)
         logger.info(f"Loaded retriever: {collection_name} (top_k={top_k})")
+        RETRIEVER_LOADS.labels(persona_id, collection_type, "chroma").inc()
+        return retriever
+
+    retriever = _retriever_cache.get_or_load((persona_id, collection_type), stamp, load)
+    record_cache("retriever", not loaded, persona_id, collection_type)
+    return retriever
+
+
+def _get_lexical_index(persona_id: str, collection_type: str) -> BM25Index | None:
+    """Get the BM25 index of a persona collection (None if never built or stale).
+
+    Blocking; reloaded from disk when the collection is re-ingested. An index
+    built for another ingestion generation (e.g. its rebuild failed after a
+    re-ingest) is not served: search falls back to vectors only.
+    """
+    from personas import get_persona
 
-    return _retrievers[key]
+    collection_name = getattr(get_persona(persona_id), f"{collection_type}_collection")
+    generation = _collection_generation(collection_name)
+
+    def load():
+        index = BM25Index.load(lexical_index_path(collection_name))
+        if index is None:
+            logger.warning(f"No lexical index for {collection_name}; using vector search only")
+            return BM25Index.build([], [], [])
+        if index.generation != generation:
+            logger.warning(
+                f"Stale lexical index for {collection_name} (generation {index.generation}, "
+                f"collection {generation}); using vector search only"
+            )
+            return BM25Index.build([], [], [])
+        logger.info(f"Loaded lexical index: {collection_name} ({len(index)} chunks)")
+        return index
+
+    index = _lexical_cache.get_or_load((persona_id, collection_type), generation, load)
+    return index if len(index) else None
+
+
+def _warm_collection(persona_id: str, collection_type: str) -> None:
+    """Load the retriever (and lexical index) of one collection (blocking)."""
+    _get_retriever(persona_id, collection_type)
+    if settings.hybrid_retrieval:
+        _get_lexical_index(persona_id, collection_type)
+
+
+# ---------------------------------------------------------------------------
+# Persona fingerprints: voice prompt + ingestion generation of its collections
+# ---------------------------------------------------------------------------
+COLLECTION_TYPES = ("profile", "works", "quotes")
+
+_collection_generations: dict[str, str | None] = {}
+_persona_fingerprints: dict[str, str] = {}
+
+
+def _collection_generation(collection_name: str, refresh: bool = False) -> str | None:
+    """Return a collection's ingestion generation (blocking on first read or refresh)."""
+    if refresh or collection_name not in _collection_generations:
+        from ingest.run_ingestion import get_collection_generation
+
+        _collection_generations[collection_name] = get_collection_generation(collection_name)
+    return _collection_generations[collection_name]
+
+
+def _persona_fingerprint(persona_config, refresh: bool = False) -> str:
+    """Hash of everything whose change must invalidate a persona's cached answers.
+
+    Blocking on first use (reads collection metadata from Chroma); cached
+    generations are refreshed by the registry reloader.
+    """
+    digest = hashlib.sha256()
+    digest.update(settings.synthesis_model.encode())
+    digest.update(persona_config.voice_prompt.encode())
+    for collection_type in COLLECTION_TYPES:
+        name = getattr(persona_config, f"{collection_type}_collection")
+        digest.update(f"|{name}={_collection_generation(name, refresh)}".encode())
+
+    fingerprint = digest.hexdigest()[:16]
+    _persona_fingerprints[persona_config.persona_id] = fingerprint
+    return fingerprint
+
+
+async def _get_persona_fingerprint(persona_config) -> str:
+    """Return the persona fingerprint, reading Chroma off-loop only when needed."""
+    known = all(
+        getattr(persona_config, f"{t}_collection") in _collection_generations
+        for t in COLLECTION_TYPES
+    )
+    if known:
+        return _persona_fingerprint(persona_config)
+    return await _retrieval_stage.run(_persona_fingerprint, persona_config)
+
+
+def _refresh_persona_fingerprints() -> list[str]:
+    """Recompute all fingerprints; return persona IDs whose fingerprint changed (blocking).
+
+    Refreshing also updates collection generations, so retrievers of
+    re-ingested collections are rebuilt on next use; retrievers of
+    personas removed from the registry are dropped.
+    """
+    from personas import get_registry
+
+    registry = get_registry()
+    pruned = _retriever_cache.prune(set(registry))
+    _lexical_cache.prune(set(registry))
+    if pruned:
+        logger.info(f"Dropped {pruned} retrievers of removed personas")
+
+    changed = []
+    for persona_id, persona_config in registry.items():
+        previous = _persona_fingerprints.get(persona_id)
+        if _persona_fingerprint(persona_config, refresh=True) != previous and previous is not None:
+            changed.append(persona_id)
+    return changed
+
+
+# Persona routing matrix, rebuilt when the registry or a collection generation changes
+_persona_router: tuple[Any, PersonaRouter] | None = None
+_persona_router_lock = threading.Lock()
+
+
+def _get_persona_router() -> PersonaRouter:
+    """Return the routing matrix over all registry personas (blocking on rebuild)."""
+    global _persona_router
+    from personas import get_registry
+
+    registry = get_registry()
+    stamp = tuple(
+        (pid, tuple(_collection_generation(getattr(p, f"{t}_collection")) for t in COLLECTION_TYPES))
+        for pid, p in sorted(registry.items())
+    )
+    with _persona_router_lock:
+        if _persona_router is None or _persona_router[0] != stamp:
+            router = PersonaRouter.from_registry(registry, COLLECTION_TYPES)
+            logger.info(f"Built persona router: {len(router)} personas, {len(router.matrix)} vectors")
+            _persona_router = (stamp, router)
+        return _persona_router[1]
+
+
+_context_assembler = ContextAssembler(
+    token_budget=settings.context_token_budget,
+    dedup_threshold=settings.context_dedup_threshold,
+)
+
+# Coalesces identical in-flight ask_persona calls, keyed by (persona, normalized query)
+_ask_flight = SingleFlight()
+
+
+class _FallbackAnswer(str):
+    """Raw-context answer returned when synthesis fails (never cached)."""
 
 
 # ---------------------------------------------------------------------------
@@ -69,6 +308,7 @@ mcp = FastMCP(
 async def ask_persona(
     query: Annotated[str, "Intrebare de adresat personalitatii istorice romanesti"],
     persona: Annotated[str, "Personalitate: eminescu, bratianu, caragiale, eliade, cioran"],
+    ctx: Context | None = None,
 ) -> str:
     """Converseaza cu personalitati istorice romanesti.
 
@@ -82,89 +322,673 @@ async def ask_persona(
     - eliade: Mircea Eliade (1907-1986) — istoric al religiilor, filozof
     - cioran: Emil Cioran (1911-1995) — filozof si eseist
 
-    Raspunsurile sunt exclusiv in limba romana."""
+    Raspunsurile sunt exclusiv in limba romana.
+
+    Daca cererea include un progressToken, raspunsul este transmis progresiv
+    (fragmente de text in notificarile de progres) pe masura ce este generat."""
 
     from personas import get_persona
 
     persona_config = get_persona(persona)
+    streamer = _ProgressStreamer(ctx)
+
+    # Identical concurrent questions share one retrieval + synthesis
+    with span("ask_persona", persona=persona, query_chars=len(query)):
+        answer = await _ask_flight.do(
+            (persona, normalize_query(query)),
+            lambda emit: _answer_persona(query, persona_config, emit),
+            on_emit=streamer.write if streamer.enabled else None,
+        )
+    await streamer.flush()
+    return answer
 
-    sections = []
-    all_sources: set[str] = set()
 
-    # 3 parallel searches
-    profile_task = asyncio.create_task(_search_collection(query, persona, "profile"))
-    works_task = asyncio.create_task(_search_collection(query, persona, "works"))
-    quotes_task = asyncio.create_task(_search_collection(query, persona, "quotes"))
+@mcp.tool()
+async def ask_personas(
+    query: Annotated[str, "Intrebare adresata tuturor personalitatilor alese"],
+    personas: Annotated[list[str], "Lista de personalitati, ex. [\"eminescu\", \"cioran\"]"],
+    ctx: Context | None = None,
+) -> list[dict]:
+    """Pune aceeasi intrebare mai multor personalitati deodata.
+
+    Intrebarea este procesata o singura data, iar cautarile si sintezele
+    pentru fiecare personalitate ruleaza in paralel. Rezultatul este o lista,
+    in ordinea ceruta, cu raspunsul fiecarei personalitati (sau eroarea ei).
+
+    Daca cererea include un progressToken, fiecare notificare de progres
+    contine un obiect JSON: {"persona", "text"} pentru fragmentele generate
+    si {"persona", "done": true, "answer"} cand raspunsul unei
+    personalitati este complet."""
 
-    profile_chunks, profile_sources = await profile_task
-    works_chunks, works_sources = await works_task
-    quotes_chunks, quotes_sources = await quotes_task
+    from personas import get_persona
 
-    # Assemble context with hierarchy — profile first as interpretive lens
-    if profile_chunks:
-        sections.append(
-            "## Profil si Context Biografic\n"
-            "Foloseste acest context pentru a incadra si interpreta informatiile.\n\n"
-            + "\n\n---\n\n".join(profile_chunks)
+    personas = list(dict.fromkeys(personas))
+    if not personas:
+        raise ValueError("Alegeti cel putin o personalitate.")
+    if len(personas) > settings.ask_personas_max_personas:
+        raise ValueError(
+            f"Prea multe personalitati ({len(personas)}); "
+            f"maximum {settings.ask_personas_max_personas} pe cerere."
         )
-        all_sources.update(profile_sources)
 
-    if works_chunks:
-        sections.append(
-            f"## Opera (texte din lucrarile lui {persona_config.display_name})\n\n"
-            + "\n\n---\n\n".join(works_chunks)
+    streamer = _ProgressStreamer(ctx)
+    # Embed once; every persona reuses the same query vector
+    prepared = await _prepare_query(query)
+
+    async def answer_one(persona: str) -> dict:
+        try:
+            persona_config = get_persona(persona)
+            answer = await _ask_flight.do(
+                (persona, normalize_query(query)),
+                lambda emit: _answer_persona(query, persona_config, emit, prepared),
+                on_emit=(lambda text: streamer.write(text, persona)) if streamer.enabled else None,
+            )
+        except SynthesisBusyError as e:
+            result = {"persona": persona, "error": str(e), "retry_after": e.retry_after}
+        except ValueError as e:
+            result = {"persona": persona, "error": str(e)}
+        else:
+            result = {"persona": persona, "display_name": persona_config.display_name, "answer": answer}
+        if streamer.enabled:
+            await streamer.event({**result, "done": True})
+        return result
+
+    return list(await asyncio.gather(*(answer_one(p) for p in personas)))
+
+
+@mcp.tool()
+async def debate(
+    question: Annotated[str, "Tema dezbaterii"],
+    personas: Annotated[list[str], "Participantii, in ordinea in care iau cuvantul"],
+    rounds: Annotated[int, "Numarul de runde"] = 2,
+    parallel: Annotated[bool, "Participantii raspund independent (in paralel) in fiecare runda"] = False,
+    ctx: Context | None = None,
+) -> list[dict]:
+    """Organizeaza o dezbatere intre mai multe personalitati, pe mai multe runde.
+
+    In prima runda fiecare personalitate isi prezinta pozitia; in rundele
+    urmatoare raspunde argumentelor celorlalti. Implicit participantii
+    vorbesc pe rand si fiecare vede raspunsurile anterioare din runda; cu
+    parallel=true raspund independent si simultan, reactionand doar la
+    rundele anterioare. Rezultatul este lista rundelor cu raspunsurile lor;
+    daca serverul este ocupat, replica respectiva contine "error" si
+    "retry_after" (secunde) in loc de "answer", iar dezbaterea continua.
+
+    Daca cererea include un progressToken, notificarile de progres contin
+    obiecte JSON {"persona", "round", "text"} si, la final de replica,
+    {"persona", "round", "done": true, "answer"}."""
+
+    from personas import get_persona
+
+    personas = list(dict.fromkeys(personas))
+    if len(personas) < 2:
+        raise ValueError("O dezbatere are nevoie de cel putin doua personalitati.")
+    if len(personas) > settings.ask_personas_max_personas:
+        raise ValueError(
+            f"Prea multe personalitati ({len(personas)}); "
+            f"maximum {settings.ask_personas_max_personas} pe cerere."
         )
-        all_sources.update(works_sources)
+    if not 1 <= rounds <= settings.debate_max_rounds:
+        raise ValueError(f"Numarul de runde trebuie sa fie intre 1 si {settings.debate_max_rounds}.")
+
+    configs = [get_persona(p) for p in personas]
+    names = {c.persona_id: c.display_name for c in configs}
+    streamer = _ProgressStreamer(ctx)
+    retrieval = _DebateRetrieval()
+    history: list[list[tuple[str, str]]] = []
+    responses: list[list[dict]] = []
+
+    for round_no in range(1, rounds + 1):
+        previous = history[-1] if history else []
+
+        # Retrieval does not depend on this round's answers: fetch every
+        # persona's context up front, concurrently
+        contexts = await asyncio.gather(*(
+            retrieval.context_for(c, _debate_retrieval_query(question, c.persona_id, previous))
+            for c in configs
+        ))
+
+        async def turn(persona_config, chunks, earlier: list[tuple[str, str]]) -> dict:
+            persona = persona_config.persona_id
+            prompt = _debate_prompt(question, round_no, rounds, persona_config, history, earlier, names)
+            assembled = _assemble_context(persona_config, chunks)
+            try:
+                answer = await _synthesize_with_claude(
+                    prompt,
+                    assembled.context or "(niciun context recuperat)",
+                    "\n".join(f"  - {s}" for s in sorted(assembled.sources)),
+                    persona_config.voice_prompt,
+                    persona_config.display_name,
+                    on_text=(
+                        (lambda text: streamer.write(text, persona, round_no)) if streamer.enabled else None
+                    ),
+                    persona_id=persona,
+                )
+            except SynthesisBusyError as e:
+                # The turn is skipped; completed turns and rounds are kept
+                result = {"persona": persona, "error": str(e), "retry_after": e.retry_after}
+            else:
+                result = {"persona": persona, "display_name": names[persona], "answer": answer}
+            if streamer.enabled:
+                await streamer.event({**result, "round": round_no, "done": True})
+            return result
+
+        if parallel:
+            results = await asyncio.gather(*(turn(c, ch, []) for c, ch in zip(configs, contexts)))
+        else:
+            results = []
+            for c, ch in zip(configs, contexts):
+                results.append(await turn(c, ch, _spoken(results)))
+        responses.append(list(results))
+        history.append(_spoken(results))
+
+    logger.info(
+        f"Debate: {rounds} rounds x {len(personas)} personas, "
+        f"{retrieval.searches} searches, {retrieval.reused} reused"
+    )
+    return [{"round": i, "responses": round_results} for i, round_results in enumerate(responses, start=1)]
+
+
+def _spoken(results: list[dict]) -> list[tuple[str, str]]:
+    """(persona, answer) pairs of the turns that produced an answer."""
+    return [(r["persona"], r["answer"]) for r in results if "answer" in r]
+
+
+# Earlier answers quoted in debate prompts are truncated (characters), as in the debate UI
+_DEBATE_PREVIOUS_ROUND_CHARS = 600
+_DEBATE_SAME_ROUND_CHARS = 800
+_DEBATE_LAST_SPEAKER_CHARS = 1200
+_DEBATE_RETRIEVAL_EXCERPT_CHARS = 300
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "...[rezumat]"
+
+
+class _DebateRetrieval:
+    """Per-debate retrieval cache: a persona's chunks accumulate across rounds.
+
+    Each (persona, sub-question) pair is searched at most once per debate;
+    a turn reuses everything the persona retrieved in earlier rounds and
+    only searches for the new sub-question.
+    """
 
-    if quotes_chunks:
-        sections.append(
-            "## Citate Reprezentative\n\n"
-            + "\n\n---\n\n".join(quotes_chunks)
+    def __init__(self):
+        self._searched: dict[tuple[str, str], dict[str, list[RetrievedChunk]]] = {}
+        self._chunks: dict[str, dict[str, list[RetrievedChunk]]] = {}
+        self.searches = 0
+        self.reused = 0
+
+    async def context_for(self, persona_config, query: str) -> dict[str, list[RetrievedChunk]]:
+        persona = persona_config.persona_id
+        key = (persona, normalize_query(query))
+        new = self._searched.get(key)
+        if new is None:
+            self.searches += 1
+            new = await _retrieve_chunks(query, persona, await _prepare_query(query))
+            self._searched[key] = new
+        else:
+            self.reused += 1
+
+        # Chunks for the new sub-question first, then earlier rounds' chunks
+        known = self._chunks.setdefault(persona, {ct: [] for ct in COLLECTION_TYPES})
+        for ct in COLLECTION_TYPES:
+            fresh = {c.node_id for c in new[ct]}
+            known[ct] = new[ct] + [c for c in known[ct] if c.node_id not in fresh]
+        return {ct: list(chunks) for ct, chunks in known.items()}
+
+
+def _debate_retrieval_query(question: str, persona_id: str, previous: list[tuple[str, str]]) -> str:
+    """Sub-question to retrieve for: the topic plus the other speakers' last arguments."""
+    others = [_truncate(a, _DEBATE_RETRIEVAL_EXCERPT_CHARS) for p, a in previous if p != persona_id]
+    return "\n".join([question, *others])
+
+
+def _debate_prompt(
+    question: str,
+    round_no: int,
+    rounds: int,
+    persona_config,
+    history: list[list[tuple[str, str]]],
+    earlier: list[tuple[str, str]],
+    names: dict[str, str],
+) -> str:
+    """Build one debate turn's question, including the transcript so far."""
+    parts = [f"DEZBATERE: {question}", f"Runda {round_no} din {rounds}."]
+    if history:
+        parts.append("CONVERSATIA ANTERIOARA:")
+        for i, round_answers in enumerate(history, start=1):
+            parts.append(f"=== RUNDA {i} ===")
+            parts.extend(
+                f"{names[p]}: {_truncate(a, _DEBATE_PREVIOUS_ROUND_CHARS)}" for p, a in round_answers
+            )
+    if earlier:
+        parts.append("Raspunsuri anterioare in aceasta runda:")
+        for j, (p, a) in enumerate(earlier):
+            limit = _DEBATE_LAST_SPEAKER_CHARS if j == len(earlier) - 1 else _DEBATE_SAME_ROUND_CHARS
+            parts.append(f"{names[p]}: {_truncate(a, limit)}")
+
+    name = persona_config.display_name
+    if history or earlier:
+        parts.append(
+            f"Acum raspunde tu, {name}, tinand cont de cele spuse anterior: "
+            f"sustine-ti pozitia si raspunde argumentelor celorlalti."
         )
-        all_sources.update(quotes_sources)
+    else:
+        parts.append(f"Prezinta-ti pozitia asupra acestei teme, {name}.")
+    return "\n\n".join(parts)
+
+
+@mcp.tool()
+async def suggest_personas(
+    query: Annotated[str, "Intrebarea pentru care se cauta personalitatile potrivite"],
+    limit: Annotated[int, "Numarul maxim de personalitati recomandate"] = 3,
+) -> list[dict]:
+    """Recomanda personalitatile cele mai potrivite pentru o intrebare.
+
+    Ordoneaza toate personalitatile disponibile dupa relevanta fata de
+    intrebare (fara a genera un raspuns), folosind vectori reprezentativi
+    ai operei, citatelor si profilului fiecareia. Rezultatul contine
+    identificatorul personalitatii (de folosit cu ask_persona), numele si
+    scorul de relevanta."""
 
-    if not sections:
+    from personas import get_registry
+
+    query_embedding = await embed_query(query)
+    router = await _retrieval_stage.run(_get_persona_router)
+    registry = get_registry()
+    return [
+        {"persona": pid, "display_name": registry[pid].display_name, "score": round(score, 4)}
+        for pid, score in router.rank(query_embedding, max(1, limit))
+        if pid in registry
+    ]
+
+
+async def _prepare_query(query: str) -> tuple[bool, list[float] | None]:
+    """Return (lexical_only, query embedding), shared by all searches of a request.
+
+    Quoted exact-match queries are served by the lexical index alone and
+    are not embedded.
+    """
+    lexical_only = settings.hybrid_retrieval and is_lexical_query(query)
+    return lexical_only, None if lexical_only else await _embed_query(query)
+
+
+async def _answer_persona(
+    query: str,
+    persona_config,
+    emit: Emit,
+    prepared: tuple[bool, list[float] | None] | None = None,
+) -> str:
+    """Answer a question in a persona's voice: cache lookup, retrieval, synthesis.
+
+    Partial synthesized text is passed to `emit` as it is generated.
+    `prepared` is the result of `_prepare_query` when the caller already
+    embedded the query (batch tools). Answers slower than
+    `slow_query_log_seconds` are recorded in the slow-query log.
+    """
+    persona = persona_config.persona_id
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    # Embed the query once and share the vector across all 3 searches
+    if prepared is None:
+        prepared = await _prepare_query(query)
+        timings["embedding"] = round(time.perf_counter() - started, 4)
+    lexical_only, query_embedding = prepared
+
+    # Semantic answer cache (near-identical questions reuse one synthesis)
+    answer_cache = get_answer_cache()
+    fingerprint = None
+    if answer_cache is not None and query_embedding is not None:
+        lookup_started = time.perf_counter()
+        try:
+            fingerprint = await _get_persona_fingerprint(persona_config)
+            cached = await answer_cache.lookup(persona, fingerprint, query_embedding)
+        except Exception as e:
+            logger.error(f"Answer cache lookup error: {e}")
+            cached = None
+        record_cache("answer", cached is not None, persona)
+        timings["answer_cache"] = round(time.perf_counter() - lookup_started, 4)
+        if cached is not None:
+            logger.info(f"Answer cache hit ({persona})")
+            await emit(cached)
+            return cached
+
+    chunks = await _retrieve_chunks(query, persona, (lexical_only, query_embedding), timings)
+    context_started = time.perf_counter()
+    assembled = _assemble_context(persona_config, chunks)
+    timings["context"] = round(time.perf_counter() - context_started, 4)
+
+    if not assembled.context:
+        _record_slow_query(query, persona, started, timings, chunks, assembled, {})
         return (
             f"Nu am gasit informatii relevante despre aceasta intrebare "
             f"in baza de cunostinte a lui {persona_config.display_name}."
         )
 
-    context = "\n\n".join(sections)
-    source_list = "\n".join(f"  - {s}" for s in sorted(all_sources))
+    logger.info(
+        f"Context for {persona}: {assembled.tokens} tokens, "
+        f"{len(assembled.chunks)} chunks ({assembled.dropped_duplicates} duplicates dropped)"
+    )
+    context = assembled.context
+    source_list = "\n".join(f"  - {s}" for s in sorted(assembled.sources))
 
+    synthesis: dict = {}
+    synthesis_started = time.perf_counter()
     synthesized = await _synthesize_with_claude(
-        query, context, source_list, persona_config.voice_prompt, persona_config.display_name
+        query,
+        context,
+        source_list,
+        persona_config.voice_prompt,
+        persona_config.display_name,
+        on_text=emit if settings.synthesis_streaming else None,
+        persona_id=persona,
+        diagnostics=synthesis,
     )
+    timings["synthesis"] = round(time.perf_counter() - synthesis_started, 4)
+    synthesis["fallback"] = isinstance(synthesized, _FallbackAnswer)
+    _record_slow_query(query, persona, started, timings, chunks, assembled, synthesis)
+
+    if fingerprint is not None and not isinstance(synthesized, _FallbackAnswer):
+        try:
+            await answer_cache.store(persona, fingerprint, query_embedding, synthesized)
+        except Exception as e:
+            logger.error(f"Answer cache store error: {e}")
     return synthesized
 
 
-async def _search_collection(
-    query: str, persona_id: str, collection_type: str
-) -> tuple[list[str], set[str]]:
-    """Search a specific ChromaDB collection for a persona."""
+async def _retrieve_chunks(
+    query: str,
+    persona_id: str,
+    prepared: tuple[bool, list[float] | None],
+    timings: dict[str, float] | None = None,
+) -> dict[str, list[RetrievedChunk]]:
+    """Search a persona's 3 collections in parallel; chunks keyed by collection type.
+
+    Each search's duration is stored in `timings` as `retrieval_{type}`.
+    """
+    lexical_only, query_embedding = prepared
+
+    async def search(collection_type: str) -> list[RetrievedChunk]:
+        start = time.perf_counter()
+        chunks = await _search_collection(query, persona_id, collection_type, query_embedding, lexical_only)
+        if timings is not None:
+            timings[f"retrieval_{collection_type}"] = round(time.perf_counter() - start, 4)
+        return chunks
+
+    results = await asyncio.gather(*(search(ct) for ct in COLLECTION_TYPES))
+    return dict(zip(COLLECTION_TYPES, results))
+
+
+def _record_slow_query(
+    query: str,
+    persona_id: str,
+    started: float,
+    timings: dict[str, float],
+    chunks: dict[str, list[RetrievedChunk]],
+    assembled,
+    synthesis: dict,
+) -> None:
+    """Queue a slow-query log record if the answer took longer than the threshold."""
+    elapsed = time.perf_counter() - started
+    slow_log = get_slow_query_log()
+    if slow_log is None or elapsed < settings.slow_query_log_seconds:
+        return
+    in_context = {c.node_id for c in assembled.chunks}
+    slow_log.record({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "request_id": get_request_id(),
+        "persona": persona_id,
+        "query": query,
+        "total_seconds": round(elapsed, 4),
+        "stages": timings,
+        "chunks": [
+            {
+                "collection_type": collection_type,
+                "node_id": chunk.node_id,
+                "score": chunk.score,
+                "source": chunk.source,
+                "in_context": chunk.node_id in in_context,
+            }
+            for collection_type, items in chunks.items()
+            for chunk in items
+        ],
+        "context_tokens": assembled.tokens,
+        **synthesis,
+    })
+
+
+def _assemble_context(persona_config, chunks: dict[str, list[RetrievedChunk]]):
+    """Pack retrieved chunks under the per-request token budget.
+
+    Profile comes first, as the interpretive lens for works and quotes.
+    """
+    with timed(CONTEXT_ASSEMBLY_SECONDS, persona=persona_config.persona_id):
+        return _context_assembler.assemble([
+            ContextSection(
+                "profile",
+                "## Profil si Context Biografic\n"
+                "Foloseste acest context pentru a incadra si interpreta informatiile.\n\n",
+                chunks.get("profile", []),
+                settings.context_profile_share,
+            ),
+            ContextSection(
+                "works",
+                f"## Opera (texte din lucrarile lui {persona_config.display_name})\n\n",
+                chunks.get("works", []),
+                settings.context_works_share,
+            ),
+            ContextSection(
+                "quotes",
+                "## Citate Reprezentative\n\n",
+                chunks.get("quotes", []),
+                settings.context_quotes_share,
+            ),
+        ])
+
+
+async def _embed_query(query: str) -> list[float] | None:
+    """Embed the query once per request (cached); None lets retrievers embed it themselves."""
     try:
-        retriever = _get_retriever(persona_id, collection_type)
-        nodes = retriever.retrieve(query)
-        chunks = []
-        sources: set[str] = set()
+        return await embed_query(query)
+    except Exception as e:
+        logger.error(f"Query embedding error: {e}")
+        return None
 
-        # Truncation limits per collection type
-        max_chars = {"profile": 1200, "works": 600, "quotes": 0}  # 0 = no truncation
-        limit = max_chars.get(collection_type, 600)
 
+async def _search_collection(
+    query: str,
+    persona_id: str,
+    collection_type: str,
+    query_embedding: list[float] | None = None,
+    lexical_only: bool = False,
+) -> list[RetrievedChunk]:
+    """Search a specific ChromaDB collection for a persona.
+
+    The blocking Chroma query runs on the retrieval thread pool so the event
+    loop stays free for other MCP requests. Chunks are returned whole;
+    the context assembler fits them into the token budget.
+    """
+    try:
+        timeout = settings.retrieval_timeout_seconds or None
+        with (
+            span("search_collection", persona=persona_id, collection_type=collection_type) as current,
+            timed(RETRIEVAL_SECONDS, persona=persona_id, collection_type=collection_type),
+        ):
+            nodes = await asyncio.wait_for(
+                _retrieval_stage.run(
+                    _retrieve_nodes, query, persona_id, collection_type, query_embedding, lexical_only
+                ),
+                timeout=timeout,
+            )
+            current.set_attribute("chunks", len(nodes))
+        chunks = []
         for node in nodes:
             meta = node.metadata
-            source = meta.get("source_file", meta.get("file_name", "unknown"))
-            sources.add(source)
-            content = node.get_content()
-            if limit > 0:
-                content = content[:limit]
-            chunks.append(content)
-
-        return chunks, sources
+            chunks.append(RetrievedChunk(
+                text=node.get_content(),
+                source=meta.get("source_file", meta.get("file_name", "unknown")),
+                collection_type=collection_type,
+                node_id=node.node_id,
+                score=node.score,
+            ))
+        return chunks
+    except asyncio.TimeoutError:
+        logger.error(f"Search timed out ({persona_id}/{collection_type})")
+        return []
     except Exception as e:
         logger.error(f"Search error ({persona_id}/{collection_type}): {e}")
-        return [], set()
+        return []
+
+
+def _retrieve_nodes(
+    query: str,
+    persona_id: str,
+    collection_type: str,
+    query_embedding: list[float] | None,
+    lexical_only: bool = False,
+):
+    """Blocking retrieval for one collection (runs on a retrieval worker thread).
+
+    With hybrid retrieval, the BM25 and vector rankings are merged by
+    reciprocal rank fusion; `lexical_only` queries skip the vector search.
+    """
+    from llama_index.core.schema import QueryBundle
+    from personas import get_persona
+
+    lexical = _get_lexical_index(persona_id, collection_type) if settings.hybrid_retrieval else None
+    top_k = _collection_top_k(get_persona(persona_id), collection_type)
+
+    if lexical_only and lexical is not None:
+        with span("lexical_query", top_k=top_k):
+            return _lexical_nodes(lexical, strip_query_quotes(query), top_k)
+
+    retriever = _get_retriever(persona_id, collection_type)
+    with span("vector_query", retriever=type(retriever).__name__, top_k=top_k):
+        dense = retriever.retrieve(QueryBundle(query_str=query, embedding=query_embedding))
+    if lexical is None:
+        return dense
+
+    with span("lexical_query", top_k=top_k):
+        sparse = _lexical_nodes(lexical, query, top_k)
+    by_id = {n.node_id: n for n in sparse}
+    by_id.update({n.node_id: n for n in dense})
+    fused = reciprocal_rank_fusion(
+        [[n.node_id for n in dense], [n.node_id for n in sparse]], k=settings.hybrid_rrf_k
+    )
+    nodes = []
+    for node_id, score in fused[:top_k]:
+        node = by_id[node_id]
+        node.score = score
+        nodes.append(node)
+    return nodes
+
+
+def _lexical_nodes(index: BM25Index, query: str, top_k: int) -> list:
+    """Run a BM25 search and wrap the hits as LlamaIndex nodes."""
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    return [
+        NodeWithScore(
+            node=TextNode(id_=index.ids[i], text=index.texts[i], metadata=index.metadatas[i]),
+            score=score,
+        )
+        for i, score in index.search(query, top_k)
+    ]
+
+
+class _ProgressStreamer:
+    """Forward synthesized text deltas to the MCP client as progress notifications.
+
+    Each notification carries the new text in `message` and the running
+    character count in `progress`. Deltas are coalesced for
+    `synthesis_stream_flush_ms` so a fast stream doesn't flood the transport;
+    the first delta is sent immediately to minimise time-to-first-token.
+
+    Text written for a named persona (batch tools) is sent as a JSON
+    message `{"persona", "text"}` (plus `"round"` in debates) so the client
+    can demultiplex it.
+    """
+
+    def __init__(self, ctx: Context | None):
+        self._ctx = ctx
+        self._buffers: dict[tuple[str | None, int | None], list[str]] = {}
+        self._sent_chars = 0
+        self._last_flush = 0.0
+        self._interval = settings.synthesis_stream_flush_ms / 1000
+        self._lock = asyncio.Lock()  # keeps notifications in order across personas
+        self.enabled = settings.synthesis_streaming and self._has_progress_token(ctx)
+
+    @staticmethod
+    def _has_progress_token(ctx: Context | None) -> bool:
+        if ctx is None:
+            return False
+        try:
+            meta = ctx.request_context.meta
+        except ValueError:  # not inside an MCP request
+            return False
+        return meta is not None and meta.progressToken is not None
+
+    async def write(self, text: str, persona: str | None = None, round_no: int | None = None) -> None:
+        self._buffers.setdefault((persona, round_no), []).append(text)
+        if time.monotonic() - self._last_flush >= self._interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            for (persona, round_no), buffer in list(self._buffers.items()):
+                if not buffer:
+                    continue
+                chunk = "".join(buffer)
+                buffer.clear()
+                if persona is None:
+                    chunk_message = chunk
+                else:
+                    payload = {"persona": persona, "text": chunk}
+                    if round_no is not None:
+                        payload["round"] = round_no
+                    chunk_message = json.dumps(payload, ensure_ascii=False)
+                await self._send(len(chunk), chunk_message)
+            self._last_flush = time.monotonic()
+
+    async def event(self, payload: dict) -> None:
+        """Flush pending text, then send `payload` as a JSON progress message."""
+        await self.flush()
+        async with self._lock:
+            await self._send(1, json.dumps(payload, ensure_ascii=False))
+
+    async def _send(self, chars: int, message: str) -> None:
+        self._sent_chars += chars
+        try:
+            await self._ctx.report_progress(progress=self._sent_chars, message=message)
+        except Exception as e:
+            logger.warning(f"Failed to send progress notification: {e}")
+
+
+def _build_system_prompt(voice_prompt: str, display_name: str) -> list[dict]:
+    """Build the stable per-persona system prefix, marked for provider-side prompt caching.
+
+    The voice prompt and the static response instructions are identical on
+    every call for a persona, so they form the cached prefix; only the
+    retrieved context and the question (user message) vary per request.
+    """
+    instructions = (
+        f"# Instructiuni de Raspuns\n"
+        f"Folosind contextul recuperat din mesajul utilizatorului, raspunde la "
+        f"intrebarea utilizatorului in vocea lui {display_name}.\n\n"
+        f"**Ierarhia informatiei:**\n"
+        f"1. Profilul biografic/intelectual = LENTILA prin care interpretezi totul.\n"
+        f"2. Citatele = calibrarea vocii (ton, expresii, aforisme).\n"
+        f"3. Opera = dovezi textuale primare (scrierile reale).\n\n"
+        f"Fii detaliat si cuprinzator. Citeaza din opera cand e relevant. "
+        f"Raspunde EXCLUSIV in limba romana."
+    )
+    instructions_block = {"type": "text", "text": instructions}
+    if settings.synthesis_prompt_caching:
+        # cache_control on the last block caches the whole system prefix
+        instructions_block["cache_control"] = {"type": "ephemeral"}
+    return [{"type": "text", "text": voice_prompt}, instructions_block]
 
 
 async def _synthesize_with_claude(
@@ -173,44 +997,80 @@ async def _synthesize_with_claude(
     source_list: str,
     voice_prompt: str,
     display_name: str,
+    on_text: Callable[[str], Awaitable[None]] | None = None,
+    persona_id: str | None = None,
+    diagnostics: dict | None = None,
 ) -> str:
-    """Call Claude Opus to synthesize a persona-voice response from retrieved context."""
+    """Call Claude Opus to synthesize a persona-voice response from retrieved context.
+
+    Uses the shared pooled client; raises SynthesisBusyError when the
+    synthesis stage is saturated instead of falling back to raw context.
+    When `on_text` is given, the response is generated with the streaming
+    API and every text delta is passed to it as it arrives. `persona_id`
+    labels the synthesis metrics (defaults to the display name); the model,
+    prompt size and token usage are stored in `diagnostics` when given.
+    """
+    manager = get_synthesis_manager()
+    persona = persona_id or display_name
+    start = time.perf_counter()
     try:
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-
         user_message = (
             f"# Context Recuperat\n\n{context}\n\n"
             f"# Intrebarea Utilizatorului\n{query}\n\n"
-            f"# Surse\n{source_list}\n\n"
-            f"# Instructiuni de Raspuns\n"
-            f"Folosind contextul recuperat de mai sus, raspunde la intrebarea "
-            f"utilizatorului in vocea lui {display_name}.\n\n"
-            f"**Ierarhia informatiei:**\n"
-            f"1. Profilul biografic/intelectual = LENTILA prin care interpretezi totul.\n"
-            f"2. Citatele = calibrarea vocii (ton, expresii, aforisme).\n"
-            f"3. Opera = dovezi textuale primare (scrierile reale).\n\n"
-            f"Fii detaliat si cuprinzator. Citeaza din opera cand e relevant. "
-            f"Raspunde EXCLUSIV in limba romana."
+            f"# Surse\n{source_list}"
         )
 
-        response = await client.messages.create(
+        system = _build_system_prompt(voice_prompt, display_name)
+        request = dict(
             model=settings.synthesis_model,
             max_tokens=4096,
-            system=voice_prompt,
+            system=system,
             messages=[{"role": "user", "content": user_message}],
         )
-
-        return response.content[0].text
-
+        prompt_tokens = count_tokens(user_message) + sum(count_tokens(b["text"]) for b in system)
+        logger.info(f"Synthesis prompt for {display_name}: ~{prompt_tokens} tokens")
+        if diagnostics is not None:
+            diagnostics.update(model=settings.synthesis_model, prompt_tokens=prompt_tokens)
+
+        with span(
+            "synthesize", persona=persona, model=settings.synthesis_model,
+            prompt_tokens=prompt_tokens, streaming=on_text is not None,
+        ) as current:
+            async with manager.slot() as client:
+                if on_text is None:
+                    response = await client.messages.create(**request)
+                    usage, answer = response.usage, response.content[0].text
+                else:
+                    parts: list[str] = []
+                    async with client.messages.stream(**request) as stream:
+                        async for text in stream.text_stream:
+                            parts.append(text)
+                            await on_text(text)
+                        final = await stream.get_final_message()
+                    usage, answer = final.usage, "".join(parts)
+            manager.record_usage(usage)
+            record_tokens(persona, usage)
+            current.set_attribute("input_tokens", getattr(usage, "input_tokens", None) or 0)
+            current.set_attribute("output_tokens", getattr(usage, "output_tokens", None) or 0)
+            if diagnostics is not None:
+                diagnostics.update(
+                    input_tokens=getattr(usage, "input_tokens", None),
+                    output_tokens=getattr(usage, "output_tokens", None),
+                )
+            return answer
+
+    except SynthesisBusyError:
+        raise
     except Exception as e:
         logger.error(f"Claude synthesis error: {e}")
-        return (
+        SYNTHESIS_FALLBACKS.labels(persona).inc()
+        return _FallbackAnswer(
             f"{context}\n\n"
             f"# Surse\n{source_list}\n\n"
             f"(Nota: Sinteza LLM a esuat — se returneaza contextul brut. Eroare: {e})"
         )
+    finally:
+        SYNTHESIS_SECONDS.labels(persona).observe(time.perf_counter() - start)
 
 
 # ---------------------------------------------------------------------------
@@ -259,6 +1119,102 @@ def _wrap_with_api_key_auth(app):
     return middleware
 
 
+# ---------------------------------------------------------------------------
+# Request ID middleware (outermost): correlates trace spans per HTTP request
+# ---------------------------------------------------------------------------
+
+
+def _wrap_with_request_id(app):
+    """ASGI middleware binding an X-Request-ID (client-supplied or generated) to the request.
+
+    The ID tags every trace span of the request and is echoed in the
+    response headers.
+    """
+
+    async def middleware(scope, receive, send):
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        request_id = set_request_id(headers.get(b"x-request-id", b"").decode()[:128] or None)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), [b"x-request-id", request_id.encode()]],
+                }
+            await send(message)
+
+        await app(scope, receive, send_with_id)
+
+    return middleware
+
+
+# ---------------------------------------------------------------------------
+# Backpressure middleware: fast 429 when the synthesis stage is saturated
+# ---------------------------------------------------------------------------
+
+
+def _wrap_with_backpressure(app):
+    """ASGI middleware that rejects MCP tool calls with 429 while synthesis is saturated.
+
+    The request body is only inspected when the synthesis stage is full, so
+    the normal path adds no overhead. Non-tool MCP messages (initialize,
+    tools/list, ...) are always let through.
+    """
+    manager = get_synthesis_manager()
+
+    async def middleware(scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope.get("method") != "POST"
+            or not scope.get("path", "").startswith("/mcp")
+            or not manager.is_saturated()
+        ):
+            await app(scope, receive, send)
+            return
+
+        # Buffer the body to see whether this is a tool call
+        messages = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        if b'"tools/call"' in body:
+            manager.rejected += 1
+            retry_after = manager.retry_after()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    [b"content-type", b"application/json"],
+                    [b"retry-after", str(retry_after).encode()],
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b'{"error":"Server busy, retry later"}',
+            })
+            return
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        await app(scope, replay, send)
+
+    return middleware
+
+
 # ---------------------------------------------------------------------------
 # Background registry reloader
 # ---------------------------------------------------------------------------
@@ -267,7 +1223,11 @@ _registry_reloader_task = None
 
 
 async def registry_reloader():
-    """Background task to reload registry every 30 seconds."""
+    """Background task to reload registry every 30 seconds.
+
+    Also refreshes persona fingerprints and drops cached answers of personas
+    that were re-ingested or whose voice prompt changed.
+    """
     from personas import reload_registry
 
     logger.info("Registry reloader task started")
@@ -278,6 +1238,16 @@ async def registry_reloader():
         except Exception as e:
             logger.error(f"Failed to reload registry: {e}")
 
+        try:
+            changed = await _retrieval_stage.run(_refresh_persona_fingerprints)
+            answer_cache = get_answer_cache()
+            for persona_id in changed:
+                logger.info(f"Persona '{persona_id}' changed — invalidating cached answers")
+                if answer_cache is not None:
+                    await answer_cache.invalidate(persona_id)
+        except Exception as e:
+            logger.error(f"Failed to refresh persona fingerprints: {e}")
+
 
 def start_registry_reloader():
     """Start the registry reloader background task."""
@@ -288,6 +1258,61 @@ def start_registry_reloader():
         logger.info("Registry reloader background task created")
 
 
+# ---------------------------------------------------------------------------
+# Startup warmup: preload retrievers for every persona in the registry
+# ---------------------------------------------------------------------------
+
+_warmup: dict[str, Any] = {"status": "disabled"}
+
+
+async def warmup_retrievers():
+    """Load retrievers (Chroma client, collections, indexes) for all personas in parallel.
+
+    Removes the multi-second cold latency of the first question to each
+    persona after a deploy. /health reports ready only once this finishes.
+    """
+    from personas import get_registry
+
+    _warmup.update(status="running", loaded=0, failed=0)
+    start = time.perf_counter()
+
+    try:
+        registry = await _retrieval_stage.run(get_registry)
+        # Only as many retrievers as the cache can hold
+        keys = [(pid, ct) for pid in registry for ct in COLLECTION_TYPES]
+        keys = keys[:_retriever_cache.max_entries]
+        results = await asyncio.gather(
+            *(_retrieval_stage.run(_warm_collection, pid, ct) for pid, ct in keys),
+            *(_retrieval_stage.run(_persona_fingerprint, p) for p in registry.values()),
+            return_exceptions=True,
+        )
+        for (pid, ct), result in zip(keys, results):
+            if isinstance(result, Exception):
+                _warmup["failed"] += 1
+                logger.warning(f"Warmup failed for {pid}/{ct}: {result}")
+            else:
+                _warmup["loaded"] += 1
+
+        await _retrieval_stage.run(_get_persona_router)
+
+        # Shared clients: embedding model and pooled Anthropic client
+        from agent.query_embedding import _get_embed_model
+
+        _get_embed_model()
+        get_synthesis_manager().client
+    except Exception as e:
+        # Never stay "not ready" forever: serve cold rather than not at all
+        logger.error(f"Warmup error: {e}")
+        _warmup["error"] = str(e)
+    finally:
+        _warmup.update(status="done", seconds=round(time.perf_counter() - start, 2))
+
+    logger.info(
+        f"Warmup complete: {_warmup['loaded']} retrievers loaded, "
+        f"{_warmup['failed']} failed in {_warmup['seconds']}s"
+    )
+
+
 # ---------------------------------------------------------------------------
 # Health check route
 # ---------------------------------------------------------------------------
@@ -295,9 +1320,41 @@ def start_registry_reloader():
 
 @mcp.custom_route("/health", methods=["GET"])
 async def health(request):
+    """Liveness + readiness: 503 while startup warmup is still running."""
     from starlette.responses import JSONResponse
 
-    return JSONResponse({"status": "ok", "server": "romanian-personas-agent"})
+    if _warmup["status"] in ("pending", "running"):
+        return JSONResponse(
+            {"status": "warming_up", "server": "romanian-personas-agent", "warmup": _warmup},
+            status_code=503,
+        )
+    return JSONResponse({"status": "ok", "server": "romanian-personas-agent", "warmup": _warmup})
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request):
+    """Pool, queue and cache statistics for monitoring."""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse({
+        "synthesis": get_synthesis_manager().stats(),
+        "retrieval": _retrieval_stage.stats(),
+        "retriever_cache": _retriever_cache.stats(),
+        "lexical_index_cache": _lexical_cache.stats(),
+        "query_embedding_cache": get_embedding_cache_stats(),
+        "answer_cache": get_answer_cache().stats() if get_answer_cache() else None,
+        "coalescing": _ask_flight.stats(),
+        "slow_query_log": get_slow_query_log().stats() if get_slow_query_log() else None,
+    })
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """Prometheus metrics: stage latency histograms, cache/load/fallback/token counters."""
+    from starlette.responses import Response
+
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
 
 
 # ---------------------------------------------------------------------------
@@ -313,7 +1370,14 @@ def main():
         default="stdio",
         help="Transport mode (default: stdio for local, streamable-http for remote)",
     )
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Skip preloading retrievers at startup (overrides WARMUP_ON_STARTUP)",
+    )
     args = parser.parse_args()
+    warmup = settings.warmup_on_startup and not args.no_warmup
+    configure_tracing()
 
     if args.transport == "stdio":
         logger.info("Starting MCP server in stdio mode")
@@ -328,13 +1392,21 @@ def main():
         from starlette.middleware import Middleware
         from starlette.routing import Mount
 
+        if warmup:
+            _warmup["status"] = "pending"
+
         @starlette_app.on_event("startup")
         async def startup_event():
             """Start background tasks when the server starts."""
             logger.info("Starting registry reloader background task")
             asyncio.create_task(registry_reloader())
+            if warmup:
+                logger.info("Starting retriever warmup")
+                asyncio.create_task(warmup_retrievers())
 
-        wrapped_app = _wrap_with_api_key_auth(starlette_app)
+        wrapped_app = _wrap_with_request_id(
+            _wrap_with_api_key_auth(_wrap_with_backpressure(starlette_app))
+        )
 
         import uvicorn
 
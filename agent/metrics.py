@@ -0,0 +1,113 @@
+"""Prometheus metrics for the MCP server, exposed at `/metrics`.
+
+Stage latencies are histograms; cache lookups, retriever loads, synthesis
+fallbacks and Claude token usage are counters. Per-persona series carry a
+`persona` label and per-collection series a `collection_type` label
+(profile, works, quotes). The query embedding is shared by every persona
+and collection of a request, so its histogram is unlabelled.
+
+Metrics live in a dedicated registry so importing the server in tests or
+scripts never collides with other users of the default registry.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+)
+
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+
+_FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SYNTHESIS_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0)
+
+QUERY_EMBEDDING_SECONDS = Histogram(
+    "persona_query_embedding_seconds",
+    "Query embedding API call latency (cache hits are not observed)",
+    buckets=_FAST_BUCKETS,
+    registry=REGISTRY,
+)
+RETRIEVAL_SECONDS = Histogram(
+    "persona_retrieval_seconds",
+    "Retrieval latency of one collection search, including queueing for a worker",
+    ["persona", "collection_type"],
+    buckets=_FAST_BUCKETS,
+    registry=REGISTRY,
+)
+CONTEXT_ASSEMBLY_SECONDS = Histogram(
+    "persona_context_assembly_seconds",
+    "Context assembly (dedup + token budget packing) latency",
+    ["persona"],
+    buckets=_FAST_BUCKETS,
+    registry=REGISTRY,
+)
+SYNTHESIS_SECONDS = Histogram(
+    "persona_synthesis_seconds",
+    "Claude synthesis latency, including waiting for a synthesis slot",
+    ["persona"],
+    buckets=_SYNTHESIS_BUCKETS,
+    registry=REGISTRY,
+)
+
+CACHE_REQUESTS = Counter(
+    "persona_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result", "persona", "collection_type"],
+    registry=REGISTRY,
+)
+RETRIEVER_LOADS = Counter(
+    "persona_retriever_loads_total",
+    "Retrievers (re)loaded into the retriever cache, by backend",
+    ["persona", "collection_type", "backend"],
+    registry=REGISTRY,
+)
+SYNTHESIS_FALLBACKS = Counter(
+    "persona_synthesis_fallbacks_total",
+    "Synthesis failures answered with the raw retrieved context",
+    ["persona"],
+    registry=REGISTRY,
+)
+SYNTHESIS_TOKENS = Counter(
+    "persona_synthesis_tokens_total",
+    "Claude token usage by type (input, output, cache_read_input, cache_creation_input)",
+    ["persona", "type"],
+    registry=REGISTRY,
+)
+
+
+def record_cache(cache: str, hit: bool, persona: str = "", collection_type: str = "") -> None:
+    """Count one cache lookup."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss", persona, collection_type).inc()
+
+
+def record_tokens(persona: str, usage) -> None:
+    """Count the token usage of one Claude response."""
+    if usage is None:
+        return
+    for field in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        count = getattr(usage, field, None) or 0
+        if count:
+            SYNTHESIS_TOKENS.labels(persona, field.removesuffix("_tokens")).inc(count)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of the block in `histogram` (labelled if labels are given)."""
+    target = histogram.labels(**labels) if labels else histogram
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target.observe(time.perf_counter() - start)
+
+
+def render() -> tuple[bytes, str]:
+    """Return (body, content type) of the Prometheus text exposition."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,63 @@
+"""Rank registry personas by relevance to a question, without retrieval.
+
+Ingestion stores a few representative vectors (spherical k-means
+centroids) per collection in its snapshot. The router stacks the vectors
+of every persona's collections into one matrix; ranking a query is a
+single matrix-vector product followed by a max per persona, so it takes
+milliseconds regardless of how many personas are registered.
+"""
+
+import logging
+
+import numpy as np
+
+from ingest.snapshot import load_centroids
+
+logger = logging.getLogger(__name__)
+
+
+class PersonaRouter:
+    """Matrix of representative vectors with the persona owning each row."""
+
+    def __init__(self, owners: list[str], vectors: np.ndarray):
+        self.personas = sorted(set(owners))
+        position = {p: i for i, p in enumerate(self.personas)}
+        self.owners = np.asarray([position[p] for p in owners], dtype=np.int64)
+        self.matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.personas)
+
+    @classmethod
+    def from_registry(cls, registry: dict, collection_types: tuple[str, ...]) -> "PersonaRouter":
+        """Load the centroids of every persona collection (blocking; missing snapshots are skipped)."""
+        owners: list[str] = []
+        blocks: list[np.ndarray] = []
+        for persona_id, persona_config in registry.items():
+            for collection_type in collection_types:
+                loaded = load_centroids(getattr(persona_config, f"{collection_type}_collection"))
+                if loaded is None or not len(loaded[0]):
+                    continue
+                centroids = loaded[0]
+                owners.extend([persona_id] * len(centroids))
+                blocks.append(centroids)
+
+        if not blocks:
+            return cls([], np.zeros((0, 0), dtype=np.float32))
+        missing = set(registry) - set(owners)
+        if missing:
+            logger.warning(f"No routing centroids for: {', '.join(sorted(missing))}")
+        return cls(owners, np.vstack(blocks))
+
+    def rank(self, query_embedding, limit: int | None = None) -> list[tuple[str, float]]:
+        """Return (persona_id, score) best first; score is the best centroid similarity."""
+        if not len(self.owners):
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarities = self.matrix @ query
+
+        best = np.full(len(self.personas), -np.inf, dtype=np.float32)
+        np.maximum.at(best, self.owners, similarities)
+        order = np.argsort(best)[::-1][:limit or None]
+        return [(self.personas[i], float(best[i])) for i in order]
@@ -0,0 +1,104 @@
+"""Query embedding stage — embed each user query once per request.
+
+`ask_persona` searches three collections (profile, works, quotes) that all
+share the same embedding model. Instead of letting every retriever embed the
+query on its own, the server computes the vector once here and passes it to
+all three retrievers via `QueryBundle(embedding=...)`.
+
+Vectors are kept in a bounded LRU cache keyed by (embedding model,
+normalized query), so repeated questions skip the embedding call entirely.
+"""
+
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from agent.metrics import QUERY_EMBEDDING_SECONDS, record_cache, timed
+from agent.tracing import span
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache lookups (NFC, collapsed whitespace, casefolded)."""
+    return " ".join(unicodedata.normalize("NFC", query).split()).casefold()
+
+
+class QueryEmbeddingCache:
+    """Thread-safe bounded LRU cache of query embeddings."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> list[float] | None:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: tuple[str, str], embedding: list[float]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache = QueryEmbeddingCache(settings.query_embedding_cache_size)
+_embed_model = None
+
+
+def _get_embed_model():
+    """Return the shared query embedding model (same one used at ingestion)."""
+    global _embed_model
+    if _embed_model is None:
+        from ingest.run_ingestion import _get_embedding
+
+        _embed_model = _get_embedding()
+    return _embed_model
+
+
+async def embed_query(query: str) -> list[float]:
+    """Return the embedding for `query`, computing it at most once per cache lifetime."""
+    key = (settings.embedding_model, normalize_query(query))
+    embedding = _cache.get(key)
+    record_cache("query_embedding", embedding is not None)
+    if embedding is not None:
+        return embedding
+
+    with span("embed_query", model=settings.embedding_model), timed(QUERY_EMBEDDING_SECONDS):
+        embedding = await _get_embed_model().aget_query_embedding(query)
+    _cache.put(key, embedding)
+    return embedding
+
+
+def get_cache_stats() -> dict:
+    """Return query embedding cache statistics."""
+    return _cache.stats()
@@ -0,0 +1,97 @@
+"""Bounded, version-aware cache of per-collection retrievers.
+
+Each entry is stored with a *stamp* describing the state it was built from
+(the persona's `top_k` as of the last registry reload and the collection's
+ingestion generation). A lookup with a different stamp rebuilds the entry,
+so re-ingested collections and admin-UI `top_k` changes take effect without
+restarting the server. The cache holds at most `max_entries` retrievers and
+evicts the least recently used (cold) ones.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class RetrieverCache:
+    """Thread-safe LRU cache of retrievers keyed by (persona_id, collection_type)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[str, str], tuple[Hashable, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[tuple[str, str], threading.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def _lookup(self, key: tuple[str, str], stamp: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            return None
+
+    def get_or_load(self, key: tuple[str, str], stamp: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached retriever for `key` if built with `stamp`, else (re)build it.
+
+        Blocking; a per-key lock ensures concurrent callers load each
+        collection only once.
+        """
+        retriever = self._lookup(key, stamp)
+        if retriever is not None:
+            return retriever
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            retriever = self._lookup(key, stamp)
+            if retriever is not None:
+                return retriever
+
+            retriever = loader()
+            with self._lock:
+                if key in self._entries:
+                    self.reloads += 1
+                    logger.info(f"Reloaded stale retriever {key[0]}/{key[1]}")
+                self.loads += 1
+                self._entries[key] = (stamp, retriever)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._load_locks.pop(evicted, None)
+                    self.evictions += 1
+                    logger.info(f"Evicted cold retriever {evicted[0]}/{evicted[1]}")
+            return retriever
+
+    def prune(self, persona_ids: set[str]) -> int:
+        """Drop retrievers of personas no longer in the registry; return how many were dropped."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] not in persona_ids]
+            for key in stale:
+                del self._entries[key]
+                self._load_locks.pop(key, None)
+        return len(stale)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "loads": self.loads,
+            "reloads": self.reloads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,104 @@
+"""Single-flight request coalescing.
+
+Concurrent calls with the same key share one execution: the first caller
+starts the work as a task and later callers await the same task instead of
+repeating retrieval and synthesis. The shared work may also emit partial
+output (streamed text); every caller receives the full stream, late joiners
+get everything emitted so far replayed first.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[str], Awaitable[None]]
+
+
+class _Listener:
+    """Serializes delivery to one caller so replayed and live chunks stay in order."""
+
+    def __init__(self, fn: Emit):
+        self._fn = fn
+        self._lock = asyncio.Lock()
+
+    async def send(self, text: str) -> None:
+        async with self._lock:
+            try:
+                await self._fn(text)
+            except Exception as e:
+                logger.warning(f"Single-flight listener failed: {e}")
+
+
+class _Flight:
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.emitted: list[str] = []
+        self.listeners: list[_Listener] = []
+
+    async def emit(self, text: str) -> None:
+        self.emitted.append(text)
+        for listener in list(self.listeners):
+            await listener.send(text)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical async calls into one shared execution."""
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[Emit], Awaitable[Any]],
+        on_emit: Emit | None = None,
+    ) -> Any:
+        """Run `fn(emit)` once per key among concurrent callers and return its result.
+
+        Args:
+            key: Identity of the request (e.g. persona + normalized query).
+            fn: Coroutine function doing the work; receives an `emit` callback
+                for partial output.
+            on_emit: Optional per-caller callback receiving emitted output.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(fn(flight.emit))
+            flight.task.add_done_callback(lambda task: self._forget(key, flight, task))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        listener = None
+        if on_emit is not None:
+            listener = _Listener(on_emit)
+            backlog = "".join(flight.emitted)
+            flight.listeners.append(listener)
+            if backlog:
+                await listener.send(backlog)
+
+        try:
+            # shield: one caller going away must not cancel the shared work
+            return await asyncio.shield(flight.task)
+        finally:
+            if listener is not None and listener in flight.listeners:
+                flight.listeners.remove(listener)
+
+    def _forget(self, key: Hashable, flight: _Flight, task: asyncio.Task) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
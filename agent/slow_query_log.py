@@ -0,0 +1,124 @@
+"""Slow-query log: JSON lines records of `ask_persona` answers above a latency threshold.
+
+Each record holds what is needed to replay and tune a slow case offline:
+the query, persona, per-stage timings, the retrieved chunk IDs and scores
+(and which ones made it into the context), the prompt size and the model.
+
+Requests never wait on disk: `record()` only enqueues the entry, and a
+background writer thread serializes and appends entries in batches (up to
+`batch_size` entries, or whatever arrived within `flush_interval`
+seconds). When the queue is full, entries are dropped and counted rather
+than slowing the request down.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class SlowQueryLog:
+    """Asynchronous, batched JSON lines writer."""
+
+    def __init__(self, path: str | Path, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_pending: int = 10000):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, entry: dict) -> None:
+        """Enqueue an entry for writing (never blocks)."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            entries = batch[:-1] if stop else batch
+            if entries:
+                self._write(entries)
+            if stop:
+                return
+
+    def _write(self, entries: list[dict]) -> None:
+        try:
+            lines = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(entries)
+        except Exception as e:
+            self.dropped += len(entries)
+            logger.error(f"Slow-query log write error: {e}")
+
+    def close(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "threshold_seconds": settings.slow_query_log_seconds,
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+_log: SlowQueryLog | None = None
+_log_lock = threading.Lock()
+
+
+def get_slow_query_log() -> SlowQueryLog | None:
+    """Return the slow-query log, or None when it is disabled (threshold 0)."""
+    global _log
+    if settings.slow_query_log_seconds <= 0:
+        return None
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = SlowQueryLog(settings.slow_query_log_path)
+                logger.info(
+                    f"Slow-query log enabled (> {settings.slow_query_log_seconds}s "
+                    f"-> {settings.slow_query_log_path})"
+                )
+    return _log
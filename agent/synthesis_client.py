@@ -0,0 +1,187 @@
+"""Process-wide Anthropic client for persona synthesis.
+
+A single `AsyncAnthropic` client is shared by every `ask_persona` call so
+connections (and their TLS sessions) are kept alive and reused instead of
+being re-established per answer. The manager also caps the number of
+in-flight synthesis calls:
+
+  - up to `synthesis_max_in_flight` calls run at once;
+  - up to `synthesis_max_queue` further calls wait for a slot, at most
+    `synthesis_queue_timeout_seconds`;
+  - beyond that, callers get `SynthesisBusyError`.
+
+A request arriving while the stage is already saturated is rejected by the
+streamable-http middleware with HTTP 429 and Retry-After. A call that times
+out in the queue raises `SynthesisBusyError` inside the tool: `ask_persona`
+reports it as a tool error, while `ask_personas` and `debate` return it per
+persona/turn as {"error", "retry_after"} and keep the other answers.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from agent.concurrency import StageLimiter
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SynthesisBusyError(Exception):
+    """Raised when the synthesis stage is saturated and cannot accept more work."""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Serverul este ocupat (prea multe sinteze in curs). "
+            f"Reincercati in {retry_after} secunde."
+        )
+
+
+class SynthesisClientManager:
+    """Shared pooled Anthropic client with bounded synthesis concurrency."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+    ):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._stage = StageLimiter("synthesis", max_concurrency=max_in_flight)
+        self._client = None
+        self.rejected = 0
+        self.total_calls = 0
+        self._avg_latency: float | None = None  # EWMA of slot hold time, seconds
+        self.usage = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
+
+    @property
+    def client(self):
+        """Return the shared AsyncAnthropic client, creating it on first use."""
+        if self._client is None:
+            import anthropic
+
+            # Build Limits from the same httpx flavour the SDK is bound to
+            limits_cls = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+            http_client = anthropic.DefaultAsyncHttpxClient(
+                limits=limits_cls(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                )
+            )
+            self._client = anthropic.AsyncAnthropic(
+                api_key=settings.anthropic_api_key,
+                http_client=http_client,
+            )
+            logger.info(
+                f"Created shared Anthropic client "
+                f"(max_connections={self.max_connections}, "
+                f"keepalive={self.max_keepalive_connections})"
+            )
+        return self._client
+
+    def is_saturated(self) -> bool:
+        """True when every slot is busy and the wait queue is full."""
+        return (
+            self._stage.in_flight >= self._stage.max_concurrency
+            and self._stage.waiting >= self.max_queue
+        )
+
+    def retry_after(self) -> int:
+        """Estimate (in whole seconds) how long until a slot is likely to free up."""
+        avg = self._avg_latency or 10.0
+        backlog = (self._stage.waiting + 1) / self._stage.max_concurrency
+        return max(1, int(avg * backlog + 0.5))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one synthesis slot, applying backpressure or failing fast when saturated."""
+        if self.is_saturated():
+            self.rejected += 1
+            raise SynthesisBusyError(self.retry_after())
+
+        held = self._stage.limit(timeout=self.queue_timeout or None)
+        try:
+            await held.__aenter__()
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise SynthesisBusyError(self.retry_after()) from None
+
+        # Timeouts raised by the caller's API call propagate unchanged
+        self.total_calls += 1
+        start = time.perf_counter()
+        try:
+            yield self.client
+        finally:
+            self._record_latency(time.perf_counter() - start)
+            await held.__aexit__(None, None, None)
+
+    def record_usage(self, usage) -> None:
+        """Accumulate token usage (including prompt-cache reads/writes) from a response."""
+        if usage is None:
+            return
+        for field in self.usage:
+            self.usage[field] += getattr(usage, field, None) or 0
+
+    def _record_latency(self, seconds: float) -> None:
+        if self._avg_latency is None:
+            self._avg_latency = seconds
+        else:
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * seconds
+
+    def stats(self) -> dict:
+        stage = self._stage.stats()
+        return {
+            "max_in_flight": stage["max_concurrency"],
+            "in_flight": stage["in_flight"],
+            "queued": stage["waiting"],
+            "max_queue": self.max_queue,
+            "completed": stage["completed"],
+            "rejected": self.rejected,
+            "total_calls": self.total_calls,
+            "avg_latency_seconds": round(self._avg_latency, 3) if self._avg_latency else None,
+            "usage": dict(self.usage),
+            "pool": {
+                "client_created": self._client is not None,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry,
+            },
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_manager: SynthesisClientManager | None = None
+
+
+def get_synthesis_manager() -> SynthesisClientManager:
+    """Return the process-wide synthesis client manager."""
+    global _manager
+    if _manager is None:
+        _manager = SynthesisClientManager(
+            max_in_flight=settings.synthesis_max_in_flight,
+            max_queue=settings.synthesis_max_queue,
+            queue_timeout=settings.synthesis_queue_timeout_seconds,
+            max_connections=settings.synthesis_max_connections,
+            max_keepalive_connections=settings.synthesis_max_keepalive_connections,
+            keepalive_expiry=settings.synthesis_keepalive_expiry_seconds,
+        )
+    return _manager
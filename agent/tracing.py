@@ -0,0 +1,151 @@
+"""Per-request tracing spans, exported with OpenTelemetry when enabled.
+
+`span(name, **attributes)` wraps a pipeline stage (tool call, collection
+search, query embedding, vector query, synthesis). Spans nest through
+OpenTelemetry's context, which `StageLimiter` carries onto retrieval
+worker threads, and every span is tagged with the `request.id` of the
+HTTP request it belongs to (see `set_request_id`).
+
+Exporters (`TRACING_EXPORTER`):
+  none     tracing disabled; `span` is a no-op (default)
+  file     one JSON object per finished span appended to `TRACING_FILE`
+  console  spans printed to stdout
+  otlp     OTLP/gRPC collector at `TRACING_OTLP_ENDPOINT` (e.g. a local Jaeger)
+
+OpenTelemetry is optional (`pip install .[tracing]`); without it the
+server runs untraced and logs a warning if an exporter was configured.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPORTERS = ("none", "file", "console", "otlp")
+
+_request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+_tracer = None
+_provider = None
+
+
+def set_request_id(request_id: str | None = None) -> str:
+    """Bind a request ID (generated if not given) to the current context."""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+def get_request_id() -> str | None:
+    return _request_id.get()
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Trace the enclosed block as a span named `name` (no-op when tracing is disabled)."""
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    request_id = _request_id.get()
+    if request_id is not None:
+        attributes["request.id"] = request_id
+    with _tracer.start_as_current_span(
+        name, attributes={k: v for k, v in attributes.items() if v is not None}
+    ) as current:
+        yield current
+
+
+def _span_record(finished) -> dict:
+    context = finished.get_span_context()
+    parent = finished.parent
+    return {
+        "name": finished.name,
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_id": format(parent.span_id, "016x") if parent is not None else None,
+        "start_ns": finished.start_time,
+        "duration_ms": round((finished.end_time - finished.start_time) / 1e6, 3),
+        "status": finished.status.status_code.name,
+        "attributes": dict(finished.attributes or {}),
+    }
+
+
+def _file_exporter(path: Path):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        """Append finished spans to a local JSON lines file."""
+
+        def __init__(self):
+            self._lock = threading.Lock()
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        def export(self, spans):
+            lines = "".join(json.dumps(_span_record(s), ensure_ascii=False) + "\n" for s in spans)
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+    return JsonLinesSpanExporter()
+
+
+def configure_tracing(exporter: str | None = None) -> bool:
+    """Install the tracer for the configured exporter; returns whether tracing is on."""
+    global _tracer, _provider
+
+    exporter = (exporter or settings.tracing_exporter).lower()
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter '{exporter}'. Available: {', '.join(EXPORTERS)}")
+    if exporter == "none":
+        shutdown_tracing()
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("TRACING_EXPORTER is set but opentelemetry-sdk is not installed — tracing disabled")
+        _tracer = None
+        return False
+
+    if exporter == "file":
+        span_exporter = _file_exporter(Path(settings.tracing_file))
+    elif exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    else:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        span_exporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint, insecure=True)
+
+    shutdown_tracing()
+    _provider = TracerProvider(resource=Resource.create({"service.name": "romanian-personas-agent"}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    _tracer = _provider.get_tracer(__name__)
+    logger.info(f"Tracing enabled ({exporter})")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and disable tracing."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
@@ -0,0 +1,112 @@
+"""Benchmark multi-process chunking against the single-process path (no API keys required).
+
+A synthetic corpus of Romanian-like text files (a few hundred MB by
+default) is written to a temporary directory, then streamed file by file
+through the single-process splitter (the pre-pool ingestion path) and
+through `chunk_documents` with increasing worker counts. Node texts and
+document order are checked to be identical across runs.
+
+Usage:
+  python benchmark_chunking.py                          # 300 MB, 1..cpu_count workers
+  python benchmark_chunking.py --size-mb 50 --workers 1 2 4 --chunk-size 512
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document
+
+from ingest.parallel_chunking import chunk_documents, shutdown_pool
+
+WORDS = (
+    "codru izvor luna stea dor noapte vis lacrimi amurg tacere suflet mare vant "
+    "dragoste moarte timp cer pamant ganduri umbra lumina frunza floare inima "
+    "singuratate zbucium rasarit apus taina vecie cantec ochi doina departare"
+).split()
+
+
+def _write_corpus(directory: Path, size_mb: int, files: int, seed: int = 0) -> None:
+    """Write `files` text files totalling about `size_mb` MB of sentences and paragraphs."""
+    rng = random.Random(seed)
+    per_file = size_mb * 1024 * 1024 // files
+    for i in range(files):
+        parts, size = [], 0
+        while size < per_file:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+            if rng.random() < 0.1:
+                sentence += "\n\n"
+            parts.append(sentence)
+            size += len(sentence) + 1
+        (directory / f"opera_{i:04d}.txt").write_text(" ".join(parts), encoding="utf-8")
+
+
+def _documents(directory: Path):
+    """Stream one document per file, like SimpleDirectoryReader.iter_data()."""
+    for path in sorted(directory.glob("*.txt")):
+        yield Document(id_=str(path), text=path.read_text(encoding="utf-8"), metadata={"source_file": path.name})
+
+
+def _single_process(directory: Path, chunk_size: int, chunk_overlap: int):
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for doc in _documents(directory):
+        yield from run_transformations([doc], [splitter])
+
+
+def _timed(nodes) -> tuple[float, int, str]:
+    """Consume a node stream; return (seconds, node count, digest of ordered texts)."""
+    digest = hashlib.sha256()
+    count = 0
+    start = time.perf_counter()
+    for node in nodes:
+        digest.update(node.ref_doc_id.encode("utf-8"))
+        digest.update(node.text.encode("utf-8"))
+        count += 1
+    return time.perf_counter() - start, count, digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process vs single-process chunking benchmark")
+    parser.add_argument("--size-mb", type=int, default=300, help="Synthetic corpus size")
+    parser.add_argument("--files", type=int, default=200, help="Number of files in the corpus")
+    parser.add_argument("--workers", type=int, nargs="+", help="Worker counts (default: 1, 2, 4, .. cpu_count)")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--chunk-overlap", type=int, default=128)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i < cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        start = time.perf_counter()
+        _write_corpus(directory, args.size_mb, args.files)
+        size_mb = sum(p.stat().st_size for p in directory.glob("*.txt")) / 1e6
+        print(f"Synthetic corpus: {args.files} files, {size_mb:.0f} MB "
+              f"(written in {time.perf_counter() - start:.1f}s), {cpus} CPU cores")
+        print(f"Chunking: size={args.chunk_size}, overlap={args.chunk_overlap}\n")
+
+        baseline, nodes, expected = _timed(_single_process(directory, args.chunk_size, args.chunk_overlap))
+        print(f"  {'single-process':<16} {baseline:8.1f}s  {size_mb / baseline:6.1f} MB/s  {nodes} nodes")
+
+        for count in workers:
+            seconds, pooled_nodes, digest = _timed(
+                chunk_documents(_documents(directory), args.chunk_size, args.chunk_overlap, workers=count)
+            )
+            shutdown_pool()  # include pool start-up in every measurement
+            same = "identical" if (pooled_nodes, digest) == (nodes, expected) else "MISMATCH"
+            print(f"  {f'pool x{count}':<16} {seconds:8.1f}s  {size_mb / seconds:6.1f} MB/s  "
+                  f"speedup {baseline / seconds:4.2f}x  ({same})")
+
+
+if __name__ == "__main__":
+    main()
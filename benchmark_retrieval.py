@@ -0,0 +1,138 @@
+"""Benchmark in-process flat index retrieval against Chroma (no API keys required).
+
+Also reports memory and recall@k of the quantized (float16 / int8) flat
+index variants, with and without full-precision rescoring.
+
+Queries are taken from the stored chunk embeddings themselves (lightly
+perturbed), so no embedding calls are made.
+
+Usage:
+  python benchmark_retrieval.py --synthetic 5000              # random vectors, in-memory Chroma
+  python benchmark_retrieval.py --persona eminescu --collection quotes   # ingested collection
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.flat_index import QUANTIZATIONS, FlatIndex
+
+DIM = 1536
+
+
+def _synthetic_collection(n: int, seed: int = 0):
+    """Create an in-memory Chroma collection with `n` random unit vectors."""
+    import chromadb
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(f"bench_{n}_{seed}", metadata={"hnsw:space": "cosine"})
+    for start in range(0, n, 4000):
+        end = min(start + 4000, n)
+        collection.add(
+            ids=[f"n{i}" for i in range(start, end)],
+            embeddings=vectors[start:end],
+            documents=[f"chunk {i}" for i in range(start, end)],
+            metadatas=[{"source_file": f"{i}.txt"} for i in range(start, end)],
+        )
+    return collection
+
+
+def _queries(index: FlatIndex, count: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), size=min(count, len(index)), replace=False)
+    noise = rng.standard_normal((len(rows), index.matrix.shape[1])).astype(np.float32) * 0.02
+    return index.matrix[rows] + noise
+
+
+def _timed(fn, queries) -> tuple[list, list[float]]:
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def _report(name: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"  {name:<12} p50={statistics.median(latencies):7.3f} ms   p95={p95:7.3f} ms")
+
+
+def recall_at_k(results: list[list[str]], truth: list[list[str]]) -> float:
+    """Mean fraction of the exact top-k found by an approximate search."""
+    hits = [len(set(r) & set(t)) / len(t) for r, t in zip(results, truth) if t]
+    return sum(hits) / len(hits) if hits else 0.0
+
+
+def run(collection, top_k: int, num_queries: int) -> None:
+    start = time.perf_counter()
+    index = FlatIndex.from_collection(collection)
+    load_seconds = time.perf_counter() - start
+    print(f"Collection '{collection.name}': {len(index)} vectors, "
+          f"flat matrix {index.nbytes / 1e6:.1f} MB (loaded in {load_seconds:.2f}s)")
+
+    queries = _queries(index, num_queries)
+
+    flat_results, flat_ms = _timed(
+        lambda q: [index.ids[i] for i, _ in index.search(q, top_k)], queries
+    )
+    chroma_results, chroma_ms = _timed(
+        lambda q: collection.query(query_embeddings=[q.tolist()], n_results=top_k)["ids"][0], queries
+    )
+
+    print(f"\nTop-{top_k} latency over {len(queries)} queries:")
+    _report("chroma", chroma_ms)
+    _report("flat", flat_ms)
+    print(f"\n  Chroma (HNSW) recall@{top_k} vs exact flat search: "
+          f"{recall_at_k(chroma_results, flat_results):.3f}")
+
+    print(f"\nQuantized flat index (recall@{top_k} vs float32 flat search):")
+    for quantization in QUANTIZATIONS[1:]:
+        for rescore in (False, True):
+            quantized = FlatIndex.from_collection(collection, quantization=quantization, rescore=rescore)
+            results, latencies = _timed(
+                lambda q: [quantized.ids[i] for i, _ in quantized.search(q, top_k)], queries
+            )
+            saved = 1 - quantized.nbytes / index.nbytes
+            name = f"{quantization}{'+rescore' if rescore else ''}"
+            print(f"  {name:<16} {quantized.nbytes / 1e6:6.1f} MB (-{saved:.0%})   "
+                  f"recall={recall_at_k(results, flat_results):.3f}   "
+                  f"p50={statistics.median(latencies):7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flat index vs Chroma retrieval benchmark")
+    parser.add_argument("--synthetic", type=int, help="Benchmark N random vectors in memory")
+    parser.add_argument("--persona", type=str, help="Persona ID of an ingested collection")
+    parser.add_argument("--collection", choices=["works", "quotes", "profile"], default="quotes")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        collection = _synthetic_collection(args.synthetic)
+    elif args.persona:
+        from ingest.run_ingestion import get_collection
+        from personas import get_persona
+
+        name = getattr(get_persona(args.persona), f"{args.collection}_collection")
+        collection = get_collection(name)
+    else:
+        parser.error("pass --synthetic N or --persona ID")
+
+    run(collection, args.top_k, args.queries)
+
+
+if __name__ == "__main__":
+    main()
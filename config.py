@@ -11,6 +11,20 @@ class Settings(BaseSettings):
     # Embeddings
     openai_api_key: str = ""
     embedding_model: str = "text-embedding-3-small"
+    # Ingestion: persistent chunk embedding cache (SQLite, keyed by model +
+    # text hash); empty path = {chroma_persist_dir}/embedding_cache.sqlite
+    embedding_cache: bool = True
+    embedding_cache_path: str = ""
+    # Ingestion embedding requests: in flight at once, texts per request,
+    # provider budgets per minute (0 = unlimited) and retries on HTTP 429
+    ingest_embedding_concurrency: int = 4
+    ingest_embedding_batch_size: int = 100
+    ingest_embedding_rpm: int = 3000
+    ingest_embedding_tpm: int = 1000000
+    ingest_embedding_max_retries: int = 8
+    # Ingestion chunking processes (1 = in-process, 0 = one per CPU core);
+    # a pool only pays off for corpora of many large files
+    ingest_chunking_workers: int = 1
 
     # Vector store
     chroma_persist_dir: str = "./chroma_db"
@@ -36,10 +50,79 @@ class Settings(BaseSettings):
     default_quotes_top_k: int = 10
     default_profile_top_k: int = 5
 
+    # Hybrid retrieval: BM25 lexical index fused with vector results (RRF)
+    hybrid_retrieval: bool = True
+    hybrid_rrf_k: int = 60
+
+    # Collections with at most this many vectors are searched in-process with
+    # an exact NumPy flat index instead of Chroma (0 = always use Chroma)
+    flat_index_max_vectors: int = 10000
+    # Flat index vector storage: "none" (float32), "float16" or "int8" (per-vector
+    # scale); rescoring re-ranks top candidates with full-precision vectors
+    flat_index_quantization: str = "none"
+    flat_index_rescore: bool = True
+    flat_index_rescore_factor: int = 4
+    # Map flat indexes from the memory-mapped snapshots written at ingestion
+    # (shared page cache across worker processes) instead of loading from Chroma
+    embedding_snapshots: bool = True
+
+    # Context packing (token budget shared across profile/works/quotes sections)
+    context_token_budget: int = 6000
+    context_profile_share: float = 0.35
+    context_works_share: float = 0.45
+    context_quotes_share: float = 0.20
+    context_dedup_threshold: float = 0.8  # shingle overlap above this = duplicate
+
+    # Query embedding cache (LRU, keyed by embedding model + normalized query)
+    query_embedding_cache_size: int = 1024
+
+    # Retrieval concurrency (blocking Chroma calls run on a thread pool)
+    retrieval_max_workers: int = 16
+    retrieval_max_concurrency: int = 12
+    retrieval_timeout_seconds: float = 30.0  # 0 = no timeout
+    retriever_cache_max_entries: int = 60  # 3 per persona; LRU beyond this
+
+    # Synthesis client pool and concurrency limits
+    synthesis_max_in_flight: int = 8
+    synthesis_max_queue: int = 16
+    synthesis_queue_timeout_seconds: float = 60.0  # 0 = wait indefinitely
+    synthesis_max_connections: int = 20
+    synthesis_max_keepalive_connections: int = 10
+    synthesis_keepalive_expiry_seconds: float = 60.0
+    synthesis_prompt_caching: bool = True  # cache voice prompt + instructions prefix
+
+    # Max personas per ask_personas / debate call, and max debate rounds
+    ask_personas_max_personas: int = 10
+    debate_max_rounds: int = 5
+
+    # Streaming synthesis (text deltas forwarded as MCP progress notifications)
+    synthesis_streaming: bool = True
+    synthesis_stream_flush_ms: int = 50
+
+    # Semantic answer cache: "memory", "redis" (uses redis_url) or "none".
+    # max_entries is a global limit for "memory" but applies per persona
+    # (and fingerprint) for "redis"
+    answer_cache_backend: str = "memory"
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl_seconds: int = 86400
+    answer_cache_max_entries: int = 2000
+
+    # Tracing (OpenTelemetry, optional): "none", "file" (JSON lines), "console"
+    # or "otlp" (gRPC collector)
+    tracing_exporter: str = "none"
+    tracing_file: str = "./traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4317"
+
+    # Slow-query log: ask_persona answers slower than this many seconds are
+    # appended to slow_query_log_path as JSON lines (0 = disabled)
+    slow_query_log_seconds: float = 0.0
+    slow_query_log_path: str = "./slow_queries.jsonl"
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8080
     mcp_api_key: str = ""
+    warmup_on_startup: bool = True  # preload retrievers before reporting ready
 
     # Marketplace & Admin Configuration
     admin_password: str = ""
@@ -0,0 +1,169 @@
+"""Persistent, content-addressed embedding cache for ingestion.
+
+Chunk embeddings are stored in SQLite keyed by (embedding model,
+dimensions, sha256 of the exact text sent to the model), so re-running an
+ingestion after a crash, or after a chunking change that leaves most chunk
+texts identical, only sends the new texts to the embeddings API.
+
+`CachedEmbedding` wraps the ingestion embedding model and is used as the
+embedding transformation of the `IngestionPipeline`; the embedding stage
+uses its `lookup`/`merge` split so that only uncached texts are charged
+against the rate budgets. Query embeddings at serving time are not cached
+here (see agent/query_embedding.py).
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+from config import settings
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_cache_path() -> Path:
+    if settings.embedding_cache_path:
+        return Path(settings.embedding_cache_path)
+    return Path(settings.chroma_persist_dir) / "embedding_cache.sqlite"
+
+
+class EmbeddingCache:
+    """SQLite store of float32 vectors keyed by (model, dimensions, text hash). Thread-safe."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, dimensions INTEGER NOT NULL, text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL, PRIMARY KEY (model, dimensions, text_hash)"
+                ") WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, dimensions: int, hashes: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors among `hashes` (hash -> vector)."""
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for i in range(0, len(hashes), _SQL_BATCH):
+                batch = hashes[i:i + _SQL_BATCH]
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? AND dimensions = ?"
+                    f" AND text_hash IN ({','.join('?' * len(batch))})",
+                    (model, dimensions, *batch),
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, dimensions: int, vectors: dict[str, list[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimensions, text_hash, vector) VALUES (?, ?, ?, ?)",
+                [
+                    (model, dimensions, key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in vectors.items()
+                ],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embedding model wrapper that serves text embeddings from an `EmbeddingCache`."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+    _dimensions: int = PrivateAttr()
+    _stats_lock: threading.Lock = PrivateAttr()
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    def __init__(self, inner: BaseEmbedding, cache: EmbeddingCache):
+        super().__init__(model_name=inner.model_name, embed_batch_size=inner.embed_batch_size)
+        self._inner = inner
+        self._cache = cache
+        # Default (native) size when the model is not truncated to `dimensions`
+        self._dimensions = getattr(inner, "dimensions", None) or 0
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def inner(self) -> BaseEmbedding:
+        return self._inner
+
+    def lookup(self, texts: list[str]) -> tuple[list[list[float] | None], list[str], dict[str, str]]:
+        """Return (cached vector or None per text, text hashes, uncached hash -> text)."""
+        keys = [text_hash(t) for t in texts]
+        cached = self._cache.get_many(self.model_name, self._dimensions, list(dict.fromkeys(keys)))
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        miss_count = sum(1 for k in keys if k not in cached)
+        with self._stats_lock:
+            self._hits += len(texts) - miss_count
+            self._misses += miss_count
+        return [cached.get(k) for k in keys], keys, missing
+
+    def merge(self, keys: list[str], found: list, missing: dict[str, str], computed: list) -> list[list[float]]:
+        """Store the `computed` vectors of the `missing` texts and return all vectors in order."""
+        fresh = dict(zip(missing, computed))
+        if fresh:
+            self._cache.put_many(self.model_name, self._dimensions, fresh)
+        return [vector if vector is not None else fresh[key] for key, vector in zip(keys, found)]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        found, keys, missing = self.lookup(texts)
+        computed = self._inner._get_text_embeddings(list(missing.values())) if missing else []
+        return self.merge(keys, found, missing, computed)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        found, keys, missing = self.lookup(texts)
+        computed = await self._inner._aget_text_embeddings(list(missing.values())) if missing else []
+        return self.merge(keys, found, missing, computed)
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._inner._get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return await self._inner._aget_query_embedding(query)
+
+    def stats(self) -> dict:
+        """Hit/miss counts of this wrapper (one per ingestion pipeline run)."""
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+        }
@@ -0,0 +1,236 @@
+"""Concurrent, rate-limit-aware embedding stage for ingestion.
+
+Chunked nodes are embedded in batches (one embeddings API request per
+batch) with up to `concurrency` requests in flight, so throughput is bound
+by the provider's rate limits rather than by the latency of one request at
+a time. Each embedded batch is handed to `write` (the Chroma vector store)
+as soon as it completes.
+
+Rate limits are respected on two levels:
+  - `RateBudget` keeps requests and tokens within per-minute budgets
+    (sliding 60 s window) before a request is sent;
+  - on a 429 response every in-flight batch pauses (`Retry-After` if the
+    provider sent one, otherwise exponential backoff with jitter) and the
+    batch is retried; the backoff decays again after successful requests.
+
+Texts already in the embedding cache (ingest/embedding_cache.py) are
+resolved before a request is budgeted, so only uncached texts count against
+the budgets and a fully cached batch sends no request at all.
+
+Transient failures (connection errors, timeouts, 5xx) are retried with the
+same shared backoff, since the ingestion model is created without the
+SDK's own retries (those would hide 429s from the stage).
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Iterable
+
+import openai
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.utils import get_tokenizer
+
+from ingest.embedding_cache import CachedEmbedding
+
+WINDOW_SECONDS = 60.0
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """True for HTTP 429 errors of the OpenAI SDK (or any client exposing `status_code`)."""
+    return getattr(exc, "status_code", None) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """True for connection errors, timeouts and 5xx responses worth retrying."""
+    if isinstance(exc, (openai.APIConnectionError, openai.InternalServerError)):
+        return True  # APITimeoutError is an APIConnectionError
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateBudget:
+    """Requests-per-minute and tokens-per-minute budgets over a sliding window (0 = unlimited)."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, clock: Callable[[], float] = time.monotonic):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._clock = clock
+        self._sent: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._sent and self._sent[0][0] <= now - WINDOW_SECONDS:
+            self._tokens -= self._sent.popleft()[1]
+
+    def _fits(self, tokens: int) -> bool:
+        if self.rpm and len(self._sent) >= self.rpm:
+            return False
+        # A batch larger than the whole token budget is sent into an empty window
+        return not self.tpm or self._tokens + tokens <= self.tpm or not self._sent
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of `tokens` tokens fits in both budgets, then record it."""
+        async with self._lock:  # waiters are served in arrival order
+            while True:
+                now = self._clock()
+                self._expire(now)
+                if self._fits(tokens):
+                    self._sent.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                await asyncio.sleep(max(self._sent[0][0] + WINDOW_SECONDS - now, 0.01))
+
+
+class _Backoff:
+    """Shared pause after 429s: exponential while throttled, decaying on success."""
+
+    def __init__(self, base: float = 1.0, maximum: float = 60.0):
+        self.base = base
+        self.maximum = maximum
+        self.delay = 0.0
+        self._resume_at = 0.0
+
+    def rate_limited(self, retry_after: float | None = None) -> float:
+        self.delay = min(max(self.delay * 2, self.base), self.maximum)
+        pause = retry_after if retry_after is not None else self.delay * random.uniform(1.0, 1.5)
+        self._resume_at = max(self._resume_at, time.monotonic() + pause)
+        return pause
+
+    def succeeded(self) -> None:
+        self.delay /= 2
+
+    async def wait(self) -> None:
+        while (remaining := self._resume_at - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+
+class EmbeddingStage:
+    """Embed node batches concurrently within rate budgets and write each batch when done."""
+
+    def __init__(
+        self,
+        embed_model,
+        concurrency: int = 4,
+        batch_size: int = 100,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_retries: int = 8,
+        backoff_base: float = 1.0,
+    ):
+        self.embed_model = embed_model
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.budget = RateBudget(rpm, tpm)
+        self._backoff = _Backoff(backoff_base)
+        self._tokenizer = get_tokenizer()
+        self.requests = 0
+        self.tokens = 0
+        self.rate_limited = 0
+        self.transient_errors = 0
+        self.nodes = 0
+
+    def batches(self, nodes: Iterable[BaseNode]) -> Iterable[list[BaseNode]]:
+        """Group nodes into embedding batches of `batch_size`."""
+        batch: list[BaseNode] = []
+        for node in nodes:
+            batch.append(node)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed `texts`, serving cache hits first when the model is a `CachedEmbedding`."""
+        if not isinstance(self.embed_model, CachedEmbedding):
+            return await self._request(self.embed_model, texts)
+        cache = self.embed_model
+        found, keys, missing = await asyncio.to_thread(cache.lookup, texts)
+        computed = await self._request(cache.inner, list(missing.values())) if missing else []
+        return await asyncio.to_thread(cache.merge, keys, found, missing, computed)
+
+    async def _request(self, model, texts: list[str]) -> list[list[float]]:
+        """One embeddings API request, within the rate budgets and retried on 429/transient errors."""
+        tokens = sum(len(self._tokenizer(t)) for t in texts)
+        retries = 0
+        while True:
+            await self._backoff.wait()
+            await self.budget.acquire(tokens)
+            self.requests += 1
+            try:
+                embeddings = await model._aget_text_embeddings(texts)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if not (rate_limited or is_transient_error(e)) or retries >= self.max_retries:
+                    raise
+                retries += 1
+                pause = self._backoff.rate_limited(_retry_after(e))
+                if rate_limited:
+                    self.rate_limited += 1
+                    print(f"  Embedding rate limited (429), pausing {pause:.1f}s")
+                else:
+                    self.transient_errors += 1
+                    print(f"  Embedding request failed ({type(e).__name__}), retrying in {pause:.1f}s")
+                continue
+            self._backoff.succeeded()
+            self.tokens += tokens
+            return embeddings
+
+    async def run(self, batches: Iterable[list[BaseNode]], write: Callable[[list[BaseNode]], Any]) -> int:
+        """Embed every batch (at most `concurrency` in flight) and `write` each one; returns node count.
+
+        `batches` is consumed lazily, so a generator keeps memory bounded by
+        the batches in flight. It is advanced on a worker thread (one batch
+        ahead of the free slots), so blocking work inside it (reading files,
+        splitting, deleting stale vectors) overlaps with the requests in
+        flight instead of stalling them. Writes run one at a time on a
+        worker thread.
+        """
+        write_lock = asyncio.Lock()
+
+        async def process(batch: list[BaseNode]) -> None:
+            texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+            for node, embedding in zip(batch, await self._embed(texts)):
+                node.embedding = embedding
+            async with write_lock:
+                await asyncio.to_thread(write, batch)
+            self.nodes += len(batch)
+
+        batches = iter(batches)
+        pending: set[asyncio.Task] = set()
+        try:
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(process(batch)))
+            for task in asyncio.as_completed(pending):
+                await task
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        return self.nodes
+
+    def stats(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "rate_limited": self.rate_limited,
+            "transient_errors": self.transient_errors,
+        }
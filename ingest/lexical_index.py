@@ -0,0 +1,198 @@
+"""Local BM25 inverted index per collection, with Romanian diacritic folding.
+
+Dense retrieval misses exact lookups — titles ("Scrisoarea III"), character
+names from Caragiale's plays, quote fragments. For every
+`{persona_id}_{works,quotes,profile}` collection, ingestion builds a BM25
+index over the collection's chunks; the MCP server fuses its ranking with
+the vector results (reciprocal rank fusion) and answers quoted, exact-match
+queries from it alone, without embedding the query.
+
+Folding maps ă/â→a, î→i, ș/ş→s, ț/ţ→t (comma-below and legacy cedilla
+variants alike) and casefolds, so "Scrisoarea a III-a", "ŞTEFAN" and
+"stefan" match regardless of how the text or the query was typed.
+
+Index files live in `{chroma_persist_dir}/lexical/{collection_name}.json`.
+"""
+
+import json
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from config import settings
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_QUOTES = "\"'„”“«»"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+FORMAT_VERSION = 1
+
+
+def fold_diacritics(text: str) -> str:
+    """Strip Romanian (and other) diacritics and casefold: "Ştefan Ţepeş" -> "stefan tepes"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    """Fold and split text into word tokens."""
+    return _TOKEN.findall(fold_diacritics(text))
+
+
+def is_lexical_query(query: str) -> bool:
+    """True for exact-lookup queries wrapped in quotes, e.g. '"Scrisoarea III"'."""
+    stripped = query.strip()
+    return len(stripped) > 2 and stripped[0] in _QUOTES and stripped[-1] in _QUOTES
+
+
+def strip_query_quotes(query: str) -> str:
+    return query.strip().strip(_QUOTES).strip()
+
+
+def lexical_index_path(collection_name: str) -> Path:
+    return Path(settings.chroma_persist_dir) / "lexical" / f"{collection_name}.json"
+
+
+class BM25Index:
+    """In-memory BM25 index over the chunks of one collection."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+        postings: dict[str, list[list[int]]],
+        doc_lens: list[int],
+        generation: str | None = None,
+    ):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.postings = postings
+        self.doc_lens = doc_lens
+        self.generation = generation
+        self.avg_len = (sum(doc_lens) / len(doc_lens)) if doc_lens else 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: list[str], texts: list[str], metadatas: list[dict],
+              generation: str | None = None) -> "BM25Index":
+        return cls.build_batches([(ids, texts, metadatas)], generation)
+
+    @classmethod
+    def build_batches(cls, batches: Iterable[tuple[list[str], list[str], list[dict]]],
+                      generation: str | None = None) -> "BM25Index":
+        """Build from streamed (ids, texts, metadatas) batches, tokenizing each batch as it arrives."""
+        ids: list[str] = []
+        texts: list[str] = []
+        metadatas: list[dict] = []
+        postings: dict[str, list[list[int]]] = defaultdict(list)
+        doc_lens: list[int] = []
+        for batch_ids, batch_texts, batch_metadatas in batches:
+            for text in batch_texts:
+                tokens = tokenize(text)
+                for term, tf in Counter(tokens).items():
+                    postings[term].append([len(doc_lens), tf])
+                doc_lens.append(len(tokens))
+            ids.extend(batch_ids)
+            texts.extend(batch_texts)
+            metadatas.extend(batch_metadatas)
+        return cls(ids, texts, metadatas, dict(postings), doc_lens, generation)
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """Return (doc_index, score) for the best `top_k` matches.
+
+        Documents containing the whole folded query as a phrase get a boost,
+        so exact titles and quote fragments rank first.
+        """
+        terms = tokenize(query)
+        if not terms or not self.ids:
+            return []
+
+        n_docs = len(self.ids)
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_idx, tf in posting:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lens[doc_idx] / (self.avg_len or 1))
+                scores[doc_idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k * 3]
+        if len(terms) > 1:
+            phrase = " ".join(terms)
+            ranked = [
+                (idx, score * 2.0 if phrase in " ".join(tokenize(self.texts[idx])) else score)
+                for idx, score in ranked
+            ]
+            ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+    def save(self, path: Path) -> None:
+        """Write the index atomically (temp file + rename)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "generation": self.generation,
+                "ids": self.ids,
+                "texts": self.texts,
+                "metadatas": self.metadatas,
+                "doc_lens": self.doc_lens,
+                "postings": self.postings,
+            }, f, ensure_ascii=False)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index | None":
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            return None
+        return cls(
+            data["ids"], data["texts"], data["metadatas"],
+            data["postings"], data["doc_lens"], data.get("generation"),
+        )
+
+
+def _iter_chunks(collection, batch_size: int) -> Iterator[tuple[list[str], list[str], list[dict]]]:
+    offset = 0
+    while True:
+        batch = collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+        if not batch["ids"]:
+            return
+        yield (
+            list(batch["ids"]),
+            [text or "" for text in batch["documents"]],
+            # Drop LlamaIndex internals (_node_content etc.), keep user-facing metadata
+            [{k: v for k, v in (meta or {}).items() if not k.startswith("_")} for meta in batch["metadatas"]],
+        )
+        offset += len(batch["ids"])
+
+
+def build_lexical_index(collection, generation: str | None = None, batch_size: int = 4000) -> BM25Index:
+    """Build and save the BM25 index for a Chroma collection, streaming its stored chunks."""
+    index = BM25Index.build_batches(_iter_chunks(collection, batch_size), generation)
+    index.save(lexical_index_path(collection.name))
+    return index
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse several ranked ID lists: score(id) = sum over lists of 1 / (k + rank)."""
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,170 @@
+"""Per-collection ingestion manifests for incremental re-ingestion.
+
+The manifest of a collection, stored at
+`{chroma_persist_dir}/manifests/{collection_name}.json`, records the
+chunking/embedding parameters it was built with and a content hash per
+source document (keyed by document ID, which is the file path for
+directory sources). Comparing it with the documents of a new run, as they
+stream in, yields an `IngestPlan`:
+
+  - unchanged documents are skipped (no chunking, no embedding calls)
+  - new and changed documents are (re-)ingested, after deleting any
+    vectors already stored under their document ID
+  - documents that disappeared have their vectors pruned
+
+A collection is rebuilt from scratch when the parameters changed, when
+`full` is requested, when it holds vectors but has no manifest (built
+before manifests existed, possibly with duplicates from earlier re-runs),
+or when its manifest lists documents but the collection is empty (dropped,
+e.g. by a persona deletion, or emptied by an interrupted full rebuild).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from llama_index.core.schema import Document
+
+from config import settings
+
+FORMAT_VERSION = 1
+
+# File-system metadata added by SimpleDirectoryReader; not part of the content
+_VOLATILE_METADATA = {"file_path", "file_size", "creation_date", "last_modified_date", "last_accessed_date"}
+
+# Chroma rejects very large `$in` filters; delete in slices
+_DELETE_BATCH = 500
+
+
+def manifest_path(collection_name: str) -> Path:
+    return Path(settings.chroma_persist_dir) / "manifests" / f"{collection_name}.json"
+
+
+def content_hash(doc: Document) -> str:
+    """sha256 of a document's text and content metadata."""
+    metadata = {k: v for k, v in doc.metadata.items() if k not in _VOLATILE_METADATA}
+    digest = hashlib.sha256(doc.text.encode("utf-8"))
+    digest.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_manifest(collection_name: str) -> dict | None:
+    """Return a collection's manifest, or None if missing or of another format version."""
+    try:
+        with open(manifest_path(collection_name), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    return manifest if manifest.get("version") == FORMAT_VERSION else None
+
+
+def save_manifest(collection_name: str, params: dict, files: dict[str, str]) -> Path:
+    """Write a manifest atomically (temp file + rename)."""
+    path = manifest_path(collection_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": FORMAT_VERSION, "collection": collection_name, "params": params, "files": files},
+            f, ensure_ascii=False, indent=1, sort_keys=True,
+        )
+    tmp.replace(path)
+    return path
+
+
+def delete_manifest(collection_name: str) -> None:
+    """Forget a collection's manifest (before its vectors are dropped)."""
+    manifest_path(collection_name).unlink(missing_ok=True)
+
+
+@dataclass
+class IngestPlan:
+    """What an ingestion run has to do to bring a collection up to date.
+
+    Documents are classified as they stream through `select()`, so the
+    corpus never has to be held in memory; `finish()` then determines the
+    documents that disappeared.
+    """
+
+    params: dict
+    previous: dict[str, str]  # document ID -> hash from the manifest (empty for full rebuilds)
+    full: bool = False
+    reason: str = ""
+    hashes: dict[str, str] = field(default_factory=dict)  # every current document
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
+
+    def select(
+        self,
+        docs: Iterable[Document],
+        on_stale: Callable[[list[str]], None] | None = None,
+    ) -> Iterator[Document]:
+        """Yield the new and changed documents, recording the hash of every document.
+
+        `on_stale` is called with a document's ID before it is yielded, to
+        delete vectors stored under that ID by an earlier (or interrupted) run.
+        """
+        for doc in docs:
+            if doc.id_ in self.hashes:
+                continue  # duplicate ID: the first document wins
+            digest = self.hashes[doc.id_] = content_hash(doc)
+            old = self.previous.get(doc.id_)
+            if old == digest:
+                self.unchanged += 1
+                continue
+            if old is None:
+                self.new += 1
+            else:
+                self.changed += 1
+            if on_stale is not None:
+                on_stale([doc.id_])
+            yield doc
+
+    def finish(self) -> list[str]:
+        """Return (and record) the IDs of manifest documents that were not seen."""
+        self.removed = sorted(set(self.previous) - set(self.hashes))
+        return self.removed
+
+    @property
+    def up_to_date(self) -> bool:
+        return not self.full and not self.new and not self.changed and not self.removed
+
+    def summary(self) -> str:
+        if self.full:
+            return f"full rebuild ({self.reason}): {self.new} documents"
+        return (
+            f"{self.new} new, {self.changed} changed, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged"
+        )
+
+
+def plan_ingestion(
+    collection_name: str,
+    params: dict,
+    existing_vectors: int,
+    full: bool = False,
+) -> IngestPlan:
+    """Start an ingestion plan from the collection's manifest (or a full rebuild)."""
+    manifest = load_manifest(collection_name)
+    reason = ""
+    if full:
+        reason = "requested"
+    elif manifest is None and existing_vectors:
+        reason = "no manifest"
+    elif manifest is not None and manifest.get("files") and not existing_vectors:
+        reason = "collection empty"  # dropped or rebuilt without finishing
+    elif manifest is not None and manifest.get("params") != params:
+        reason = "parameters changed"
+    if reason:
+        return IngestPlan(params, {}, full=True, reason=reason)
+    return IngestPlan(params, manifest["files"] if manifest else {})
+
+
+def delete_documents(collection, doc_ids: list[str]) -> None:
+    """Delete every vector stored under the given LlamaIndex document IDs."""
+    for i in range(0, len(doc_ids), _DELETE_BATCH):
+        collection.delete(where={"document_id": {"$in": doc_ids[i:i + _DELETE_BATCH]}})
@@ -0,0 +1,127 @@
+"""Multi-process chunking for ingestion.
+
+Sentence splitting (`SentenceSplitter`) is pure Python and CPU-bound, so on
+large corpora it pins one core while the embedding stage waits for nodes.
+`chunk_documents` fans the splitting out over a process pool, one source
+file (document) per unit of work; small documents such as individual
+quotes are grouped into one unit so inter-process overhead stays small.
+
+Units are submitted in order with a bounded number in flight and their
+nodes are yielded in submission order, so the node sequence (IDs, texts,
+prev/next relationships) is reassembled exactly as the single-process path
+would produce it, and memory stays bounded for streamed corpora.
+
+The pool is created on first use and shut down by `shutdown_pool()`, which
+ingestion calls after each collection so no processes outlive a run (e.g.
+between Celery tasks). `workers=1`, the default, splits in-process, as
+does running inside a daemonic process (e.g. a Celery prefork child, which
+may not start children). Pool start-up re-imports llama_index in every
+worker, so the pool pays off only for large corpora of many files.
+
+The node stream is advanced on a worker thread by the embedding stage, so
+waiting on a unit here overlaps with the embedding requests in flight.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode, Document
+
+logger = logging.getLogger(__name__)
+
+# Documents are grouped into one unit of work until it holds this many characters
+MIN_UNIT_CHARS = 256 * 1024
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+# Per-process splitters, keyed by (chunk_size, chunk_overlap)
+_splitters: dict[tuple[int, int], SentenceSplitter] = {}
+
+
+def resolve_workers(workers: int) -> int:
+    """Number of chunking processes: 0 = one per CPU core."""
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.warning("Chunking in-process: daemonic processes cannot start a process pool")
+        return 1
+    return workers
+
+
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> SentenceSplitter:
+    key = (chunk_size, chunk_overlap)
+    if key not in _splitters:
+        _splitters[key] = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return _splitters[key]
+
+
+def split_documents(docs: list[Document], chunk_size: int, chunk_overlap: int) -> list[BaseNode]:
+    """Split one unit of work (runs in a pool process, or in-process for `workers=1`)."""
+    return _get_splitter(chunk_size, chunk_overlap).get_nodes_from_documents(docs)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        # spawn: the caller may already run threads (Chroma, embedding writes)
+        _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool, _pool_workers = None, 0
+
+
+def _units(docs: Iterable[Document]) -> Iterator[list[Document]]:
+    unit: list[Document] = []
+    size = 0
+    for doc in docs:
+        unit.append(doc)
+        size += len(doc.text)
+        if size >= MIN_UNIT_CHARS:
+            yield unit
+            unit, size = [], 0
+    if unit:
+        yield unit
+
+
+def chunk_documents(
+    docs: Iterable[Document],
+    chunk_size: int,
+    chunk_overlap: int,
+    workers: int = 1,
+) -> Iterator[BaseNode]:
+    """Yield the nodes of `docs` in document order, splitting on `workers` processes.
+
+    `docs` is consumed lazily: at most two units per worker are in flight.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for unit in _units(docs):
+            yield from split_documents(unit, chunk_size, chunk_overlap)
+        return
+
+    pool = _get_pool(workers)
+    pending: deque[Future] = deque()
+    try:
+        for unit in _units(docs):
+            pending.append(pool.submit(split_documents, unit, chunk_size, chunk_overlap))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
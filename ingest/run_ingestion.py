@@ -11,11 +11,28 @@ Usage:
   python -m ingest.run_ingestion --persona eminescu --works   # single collection type
   python -m ingest.run_ingestion --persona eminescu --quotes
   python -m ingest.run_ingestion --persona eminescu --profile
+  python -m ingest.run_ingestion --persona eminescu --full  # re-embed everything
+  python -m ingest.run_ingestion --lexical-index      # rebuild BM25 indexes only (no embedding)
+  python -m ingest.run_ingestion --snapshot           # rebuild mmap snapshots only (no embedding)
+
+Re-runs are incremental: a per-collection manifest of document hashes
+(ingest/manifest.py) limits embedding to new and changed documents and
+prunes the vectors of removed ones.
+
+Documents are streamed file by file through splitter -> embedder -> writer,
+and nodes are written in node-count batches, so memory stays bounded
+regardless of corpus size.
 """
 
+import asyncio
+import hashlib
 import json
+import time
 import sys
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import chromadb
 from llama_index.core import SimpleDirectoryReader, VectorStoreIndex
@@ -28,6 +45,12 @@ from llama_index.vector_stores.chroma import ChromaVectorStore
 # Add parent to path so config is importable
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from config import settings
+from ingest.embedding_cache import CachedEmbedding, EmbeddingCache, embedding_cache_path
+from ingest.embedding_stage import EmbeddingStage
+from ingest.lexical_index import build_lexical_index
+from ingest.manifest import delete_documents, delete_manifest, plan_ingestion, save_manifest
+from ingest.parallel_chunking import chunk_documents, shutdown_pool
+from ingest.snapshot import snapshot_collection
 
 
 # ---------------------------------------------------------------------------
@@ -41,14 +64,33 @@ def _get_chroma_client():
     return chromadb.PersistentClient(path=str(persist_dir))
 
 
-def _get_embedding():
+def _get_embedding(**kwargs):
     """Return the shared embedding model."""
     return OpenAIEmbedding(
         model=settings.embedding_model,
         api_key=settings.openai_api_key,
+        **kwargs,
     )
 
 
+_embedding_cache: EmbeddingCache | None = None
+
+
+def _get_ingest_embedding():
+    """Return the embedding model for ingestion, behind the persistent embedding cache if enabled."""
+    global _embedding_cache
+    # 429s and transient errors (connection, timeout, 5xx) must reach the
+    # embedding stage's shared backoff instead of being retried blindly
+    # inside each concurrent request
+    embed_model = _get_embedding(max_retries=0)
+    if not settings.embedding_cache:
+        return embed_model
+    path = embedding_cache_path()
+    if _embedding_cache is None or _embedding_cache.path != path:
+        _embedding_cache = EmbeddingCache(path)
+    return CachedEmbedding(embed_model, _embedding_cache)
+
+
 def _get_chunk_params(persona_config, collection_type: str) -> tuple[int, int]:
     """Resolve chunk_size and chunk_overlap for a collection type.
 
@@ -85,21 +127,58 @@ def _build_pipeline(vector_store: ChromaVectorStore, chunk_size: int, chunk_over
     return IngestionPipeline(
         transformations=[
             SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap),
-            _get_embedding(),
+            _get_ingest_embedding(),
         ],
         vector_store=vector_store,
     )
 
 
-def _run_pipeline_batched(pipeline: IngestionPipeline, docs: list[Document]) -> int:
-    """Run ingestion pipeline in batches to avoid ChromaDB batch size limits."""
-    total_nodes = 0
-    for i in range(0, len(docs), CHROMA_MAX_BATCH):
-        batch = docs[i:i + CHROMA_MAX_BATCH]
-        if len(docs) > CHROMA_MAX_BATCH:
-            print(f"  Batch {i // CHROMA_MAX_BATCH + 1}: {len(batch)} documents")
-        nodes = pipeline.run(documents=batch, show_progress=True)
-        total_nodes += len(nodes)
+def _get_embedding_stage(embed_model) -> EmbeddingStage:
+    """Concurrent, rate-limited embedding stage configured from settings."""
+    return EmbeddingStage(
+        embed_model,
+        concurrency=settings.ingest_embedding_concurrency,
+        batch_size=min(settings.ingest_embedding_batch_size, CHROMA_MAX_BATCH),
+        rpm=settings.ingest_embedding_rpm,
+        tpm=settings.ingest_embedding_tpm,
+        max_retries=settings.ingest_embedding_max_retries,
+    )
+
+
+def _run_pipeline_streaming(pipeline: IngestionPipeline, docs: Iterable[Document]) -> int:
+    """Stream documents through the pipeline: splitter -> embedder -> Chroma writer.
+
+    Documents are pulled from `docs` (a generator) and split on a worker
+    thread of the embedding stage, in-process or on a process pool when
+    INGEST_CHUNKING_WORKERS != 1 (see ingest/parallel_chunking.py), only as
+    fast as the embedding stage takes batches, so memory stays bounded by
+    the in-flight batches regardless of corpus size. Any chunking pool is
+    shut down before returning, so Celery tasks do not leave it running.
+    Embedding
+    requests run concurrently within the configured rate budgets (see
+    ingest/embedding_stage.py); nodes are batched by node count and each
+    batch is written to Chroma as soon as it is embedded.
+    """
+    splitter, embed_model = pipeline.transformations
+    nodes = chunk_documents(
+        docs, splitter.chunk_size, splitter.chunk_overlap, settings.ingest_chunking_workers
+    )
+
+    stage = _get_embedding_stage(embed_model)
+    started = time.perf_counter()
+    try:
+        total_nodes = asyncio.run(stage.run(stage.batches(nodes), pipeline.vector_store.add))
+    finally:
+        nodes.close()
+        shutdown_pool()
+    elapsed = time.perf_counter() - started
+    if total_nodes:
+        stats = stage.stats()
+        print(
+            f"  Embedded {stats['nodes']} nodes in {elapsed:.1f}s: {stats['requests']} requests, "
+            f"{stats['tokens']} tokens ({stats['tokens'] / max(elapsed, 1e-9) * 60:.0f}/min), "
+            f"{stats['rate_limited']} rate limited, {stats['transient_errors']} retried errors"
+        )
     return total_nodes
 
 
@@ -112,12 +191,141 @@ def _verify_collection(collection_name: str) -> int:
     return count
 
 
+def _mark_collection_ingested(collection_name: str) -> str:
+    """Stamp a collection with a fresh ingestion generation.
+
+    The MCP server compares generations to detect re-ingested collections
+    and invalidate its caches without a restart.
+    """
+    client = _get_chroma_client()
+    collection = client.get_collection(collection_name)
+    generation = uuid.uuid4().hex
+    # modify() replaces metadata; keep existing keys except immutable hnsw settings
+    metadata = {k: v for k, v in (collection.metadata or {}).items() if not k.startswith("hnsw:")}
+    metadata["ingest_generation"] = generation
+    metadata["ingested_at"] = datetime.now(timezone.utc).isoformat()
+    collection.modify(metadata=metadata)
+    return generation
+
+
+def _build_lexical_index(collection_name: str, generation: str | None = None) -> None:
+    """Build the collection's BM25 index from the chunks now stored in Chroma."""
+    client = _get_chroma_client()
+    collection = client.get_collection(collection_name)
+    if generation is None:
+        generation = (collection.metadata or {}).get("ingest_generation")
+    index = build_lexical_index(collection, generation)
+    print(f"  Lexical index for '{collection_name}': {len(index)} chunks, {len(index.postings)} terms")
+
+
+def _write_snapshot(collection_name: str, generation: str | None = None) -> None:
+    """Export the collection to a memory-mapped snapshot for the MCP server."""
+    client = _get_chroma_client()
+    collection = client.get_collection(collection_name)
+    if generation is None:
+        generation = (collection.metadata or {}).get("ingest_generation")
+    path = snapshot_collection(collection, generation)
+    print(f"  Snapshot for '{collection_name}': {path}")
+
+
+def _ingest_documents(
+    collection_name: str,
+    docs: Iterable[Document],
+    chunk_size: int,
+    chunk_overlap: int,
+    full: bool = False,
+) -> int:
+    """Bring a collection up to date with the streamed `docs`; returns its vector count.
+
+    Only new and changed documents are chunked and embedded; their stale
+    vectors are deleted by document ID first, and the vectors of removed
+    documents are pruned at the end. The manifest is saved only after the
+    pipeline succeeded, so an interrupted run is simply redone next time.
+    """
+    client = _get_chroma_client()
+    collection = client.get_or_create_collection(collection_name)
+    params = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "embedding_model": settings.embedding_model,
+    }
+    plan = plan_ingestion(collection_name, params, collection.count(), full)
+    if plan.full:
+        print(f"  Rebuilding '{collection_name}' ({plan.reason})")
+        # An interrupted rebuild must not leave a manifest describing vectors that are gone
+        delete_manifest(collection_name)
+        client.delete_collection(collection_name)
+
+    vector_store = _get_vector_store(collection_name)
+    collection = vector_store.client
+    # Changed documents (or leftovers of an interrupted run) lose their old vectors first
+    on_stale = (lambda doc_ids: delete_documents(collection, doc_ids)) if collection.count() else None
+    pipeline = _build_pipeline(vector_store, chunk_size, chunk_overlap)
+    print(f"  Chunking: size={chunk_size}, overlap={chunk_overlap}")
+    nodes = _run_pipeline_streaming(pipeline, plan.select(docs, on_stale))
+    delete_documents(collection, plan.finish())
+    print(f"  Plan: {plan.summary()}")
+    if plan.up_to_date:
+        print(f"  '{collection_name}' is up to date, nothing to embed")
+        return _verify_collection(collection_name)
+
+    print(f"  Ingested {nodes} nodes")
+    embed_model = pipeline.transformations[-1]
+    if isinstance(embed_model, CachedEmbedding):
+        stats = embed_model.stats()
+        print(f"  Embedding cache: {stats['hits']} hits, {stats['misses']} misses (embedded)")
+    save_manifest(collection_name, plan.params, plan.hashes)
+
+    count = _verify_collection(collection_name)
+    generation = _mark_collection_ingested(collection_name)
+    _build_lexical_index(collection_name, generation)
+    _write_snapshot(collection_name, generation)
+    return count
+
+
+def get_collection(collection_name: str):
+    """Return an existing ChromaDB collection (raises if it does not exist)."""
+    return _get_chroma_client().get_collection(collection_name)
+
+
+def get_collection_generation(collection_name: str) -> str | None:
+    """Return the ingestion generation of a collection (None if missing or never stamped)."""
+    client = _get_chroma_client()
+    try:
+        collection = client.get_collection(collection_name)
+    except Exception:
+        return None
+    return (collection.metadata or {}).get("ingest_generation")
+
+
 # ---------------------------------------------------------------------------
 # Works ingestion
 # ---------------------------------------------------------------------------
 
-def ingest_works(persona_id: str):
-    """Ingest literary works for a persona from data/{persona_id}/works/."""
+def _load_works(persona, works_dir: Path) -> Iterator[Document]:
+    """Yield work documents file by file, with persona metadata."""
+    reader = SimpleDirectoryReader(
+        input_dir=str(works_dir),
+        recursive=True,
+        required_exts=[".txt", ".md"],
+        filename_as_id=True,
+    )
+    for docs in reader.iter_data():
+        for doc in docs:
+            fp = doc.metadata.get("file_path", "")
+            doc.metadata["source_type"] = "literary_work"
+            doc.metadata["source_file"] = Path(fp).name if fp else "unknown"
+            doc.metadata["persona_id"] = persona.persona_id
+            doc.metadata["persona_name"] = persona.display_name
+            yield doc
+
+
+def ingest_works(persona_id: str, full: bool = False) -> int | None:
+    """Ingest literary works for a persona from data/{persona_id}/works/.
+
+    Files are streamed one at a time. Returns the collection's vector count
+    (None if there is no works data).
+    """
     from personas import get_persona
 
     persona = get_persona(persona_id)
@@ -129,41 +337,43 @@ def ingest_works(persona_id: str):
 
     print(f"\n--- Ingesting works for {persona.display_name} ---")
 
-    docs = SimpleDirectoryReader(
-        input_dir=str(works_dir),
-        recursive=True,
-        required_exts=[".txt", ".md"],
-        filename_as_id=True,
-    ).load_data()
-
-    # Enrich metadata
-    for doc in docs:
-        fp = doc.metadata.get("file_path", "")
-        fname = Path(fp).name if fp else "unknown"
-        doc.metadata["source_type"] = "literary_work"
-        doc.metadata["source_file"] = fname
-        doc.metadata["persona_id"] = persona_id
-        doc.metadata["persona_name"] = persona.display_name
-
-    print(f"  Loaded {len(docs)} work documents")
-
     chunk_size, chunk_overlap = _get_chunk_params(persona, "works")
-    collection_name = persona.works_collection
-    vector_store = _get_vector_store(collection_name)
-    pipeline = _build_pipeline(vector_store, chunk_size, chunk_overlap)
-
-    print(f"  Chunking: size={chunk_size}, overlap={chunk_overlap}")
-    nodes = _run_pipeline_batched(pipeline, docs)
-    print(f"  Ingested {nodes} nodes")
-    _verify_collection(collection_name)
+    return _ingest_documents(
+        persona.works_collection, _load_works(persona, works_dir), chunk_size, chunk_overlap, full
+    )
 
 
 # ---------------------------------------------------------------------------
 # Quotes ingestion
 # ---------------------------------------------------------------------------
 
-def ingest_quotes(persona_id: str):
-    """Ingest quotes for a persona from data/{persona_id}/quotes/all_quotes.jsonl."""
+def _load_quotes(persona, quotes_file: Path) -> Iterator[Document]:
+    """Yield one document per quote, reading the JSONL file line by line."""
+    with open(quotes_file, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            q = json.loads(line)
+            source_file = q.get("source_file", "unknown")
+            yield Document(
+                id_="quote-" + hashlib.sha256(f"{source_file}\n{q['text']}".encode("utf-8")).hexdigest()[:32],
+                text=q["text"],
+                metadata={
+                    "source_type": q.get("source_type", "quote"),
+                    "source_file": source_file,
+                    "persona_id": persona.persona_id,
+                    "persona_name": persona.display_name,
+                },
+            )
+
+
+def ingest_quotes(persona_id: str, full: bool = False) -> int | None:
+    """Ingest quotes for a persona from data/{persona_id}/quotes/all_quotes.jsonl.
+
+    Each quote is its own document, identified by a hash of its text and
+    source, so edits to the file only re-embed the quotes that changed.
+    Returns the collection's vector count (None if there is no quotes file).
+    """
     from personas import get_persona
 
     persona = get_persona(persona_id)
@@ -175,105 +385,73 @@ def ingest_quotes(persona_id: str):
 
     print(f"\n--- Ingesting quotes for {persona.display_name} ---")
 
-    quotes = []
-    with open(quotes_file, encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                quotes.append(json.loads(line))
-
-    print(f"  Loaded {len(quotes)} quotes")
-
-    docs = []
-    for q in quotes:
-        doc = Document(
-            text=q["text"],
-            metadata={
-                "source_type": q.get("source_type", "quote"),
-                "source_file": q.get("source_file", "unknown"),
-                "persona_id": persona_id,
-                "persona_name": persona.display_name,
-            },
-        )
-        docs.append(doc)
-
     chunk_size, chunk_overlap = _get_chunk_params(persona, "quotes")
-    collection_name = persona.quotes_collection
-    vector_store = _get_vector_store(collection_name)
-    pipeline = _build_pipeline(vector_store, chunk_size, chunk_overlap)
-
-    print(f"  Chunking: size={chunk_size}, overlap={chunk_overlap}")
-    nodes = _run_pipeline_batched(pipeline, docs)
-    print(f"  Ingested {nodes} nodes")
-    _verify_collection(collection_name)
+    return _ingest_documents(
+        persona.quotes_collection, _load_quotes(persona, quotes_file), chunk_size, chunk_overlap, full
+    )
 
 
 # ---------------------------------------------------------------------------
 # Profile ingestion
 # ---------------------------------------------------------------------------
 
-def ingest_profile(persona_id: str):
-    """Ingest profile documents for a persona.
-
-    Sources (in priority order):
-    1. data/{persona_id}/profile/ — additional profile docs
-    2. personas/{persona_id}/profile.md — built-in scholarly summary
-    """
-    from personas import get_persona
-
-    persona = get_persona(persona_id)
-    profile_data_dir = Path(settings.data_dir) / persona_id / "profile"
-    profile_md = persona.profile_md_path
-
-    print(f"\n--- Ingesting profile for {persona.display_name} ---")
-
-    docs = []
-
-    # Load profile.md (always present)
+def _load_profile(persona, profile_md: Path, profile_data_dir: Path) -> Iterator[Document]:
+    """Yield profile.md, then the additional profile documents file by file."""
     if profile_md.exists():
-        profile_docs = SimpleDirectoryReader(
-            input_files=[str(profile_md)],
-            filename_as_id=True,
-        ).load_data()
-        for doc in profile_docs:
+        reader = SimpleDirectoryReader(input_files=[str(profile_md)], filename_as_id=True)
+        for doc in reader.load_data():
             doc.metadata["source_type"] = "profile_summary"
             doc.metadata["source_file"] = profile_md.name
-            doc.metadata["persona_id"] = persona_id
+            doc.metadata["persona_id"] = persona.persona_id
             doc.metadata["persona_name"] = persona.display_name
-        docs.extend(profile_docs)
-        print(f"  Loaded profile.md ({len(profile_docs)} pages)")
+            yield doc
 
-    # Load additional profile documents from data dir
     if profile_data_dir.exists() and any(profile_data_dir.iterdir()):
-        extra_docs = SimpleDirectoryReader(
+        reader = SimpleDirectoryReader(
             input_dir=str(profile_data_dir),
             recursive=True,
             required_exts=[".txt", ".md"],
             filename_as_id=True,
-        ).load_data()
+        )
+        for docs in reader.iter_data():
+            for doc in docs:
+                fp = doc.metadata.get("file_path", "")
+                doc.metadata["source_type"] = "profile_document"
+                doc.metadata["source_file"] = Path(fp).name if fp else "unknown"
+                doc.metadata["persona_id"] = persona.persona_id
+                doc.metadata["persona_name"] = persona.display_name
+                yield doc
 
-        for doc in extra_docs:
-            fp = doc.metadata.get("file_path", "")
-            fname = Path(fp).name if fp else "unknown"
-            doc.metadata["source_type"] = "profile_document"
-            doc.metadata["source_file"] = fname
-            doc.metadata["persona_id"] = persona_id
-            doc.metadata["persona_name"] = persona.display_name
-        docs.extend(extra_docs)
-        print(f"  Loaded {len(extra_docs)} additional profile documents")
 
-    if not docs:
+def ingest_profile(persona_id: str, full: bool = False) -> int | None:
+    """Ingest profile documents for a persona.
+
+    Sources (in priority order):
+    1. data/{persona_id}/profile/ — additional profile docs
+    2. personas/{persona_id}/profile.md — built-in scholarly summary
+
+    Returns the collection's vector count (None if there is no profile data).
+    """
+    from personas import get_persona
+
+    persona = get_persona(persona_id)
+    profile_data_dir = Path(settings.data_dir) / persona_id / "profile"
+    profile_md = persona.profile_md_path
+
+    if not profile_md.exists() and not (profile_data_dir.exists() and any(profile_data_dir.iterdir())):
         print(f"  No profile data found for {persona_id}")
         return
 
-    chunk_size, chunk_overlap = _get_chunk_params(persona, "profile")
-    collection_name = persona.profile_collection
-    vector_store = _get_vector_store(collection_name)
-    pipeline = _build_pipeline(vector_store, chunk_size, chunk_overlap)
+    print(f"\n--- Ingesting profile for {persona.display_name} ---")
 
-    print(f"  Chunking: size={chunk_size}, overlap={chunk_overlap}")
-    nodes = _run_pipeline_batched(pipeline, docs)
-    print(f"  Ingested {nodes} nodes")
-    _verify_collection(collection_name)
+    chunk_size, chunk_overlap = _get_chunk_params(persona, "profile")
+    return _ingest_documents(
+        persona.profile_collection,
+        _load_profile(persona, profile_md, profile_data_dir),
+        chunk_size,
+        chunk_overlap,
+        full,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -301,8 +479,9 @@ def get_index(persona_id: str, collection_type: str) -> VectorStoreIndex:
 # CLI entry point
 # ---------------------------------------------------------------------------
 
-def ingest_persona(persona_id: str, works: bool = True, quotes: bool = True, profile: bool = True):
-    """Ingest all collection types for a single persona."""
+def ingest_persona(persona_id: str, works: bool = True, quotes: bool = True, profile: bool = True,
+                   full: bool = False):
+    """Ingest all collection types for a single persona (`full` re-embeds everything)."""
     from personas import get_persona
 
     persona = get_persona(persona_id)
@@ -311,14 +490,32 @@ def ingest_persona(persona_id: str, works: bool = True, quotes: bool = True, pro
     print(f"{'=' * 60}")
 
     if works:
-        ingest_works(persona_id)
+        ingest_works(persona_id, full)
     if quotes:
-        ingest_quotes(persona_id)
+        ingest_quotes(persona_id, full)
     if profile:
-        ingest_profile(persona_id)
+        ingest_profile(persona_id, full)
+
 
+def rebuild_derived_indexes(persona_id: str | None = None, lexical: bool = True, snapshot: bool = True):
+    """Rebuild BM25 indexes and/or snapshots from already ingested collections (no embedding calls)."""
+    from personas import VALID_PERSONA_IDS, get_persona
 
-def ingest_all():
+    client = _get_chroma_client()
+    existing = {c.name for c in client.list_collections()}
+    for pid in ([persona_id] if persona_id else VALID_PERSONA_IDS):
+        persona = get_persona(pid)
+        for collection_type in ("works", "quotes", "profile"):
+            collection_name = getattr(persona, f"{collection_type}_collection")
+            if collection_name not in existing:
+                continue
+            if lexical:
+                _build_lexical_index(collection_name)
+            if snapshot:
+                _write_snapshot(collection_name)
+
+
+def ingest_all(full: bool = False):
     """Ingest all personas, all collection types."""
     from personas import VALID_PERSONA_IDS
 
@@ -327,7 +524,7 @@ def ingest_all():
     print("=" * 60)
 
     for persona_id in VALID_PERSONA_IDS:
-        ingest_persona(persona_id)
+        ingest_persona(persona_id, full=full)
 
     # Final summary
     print("\n" + "=" * 60)
@@ -351,13 +548,21 @@ if __name__ == "__main__":
     parser.add_argument("--works", action="store_true", help="Ingest works only")
     parser.add_argument("--quotes", action="store_true", help="Ingest quotes only")
     parser.add_argument("--profile", action="store_true", help="Ingest profile only")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore ingestion manifests: rebuild collections and re-embed everything")
+    parser.add_argument("--lexical-index", action="store_true",
+                        help="Only rebuild BM25 lexical indexes from existing collections")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Only rebuild mmap embedding snapshots from existing collections")
     args = parser.parse_args()
 
-    if args.persona:
+    if args.lexical_index or args.snapshot:
+        rebuild_derived_indexes(args.persona, lexical=args.lexical_index, snapshot=args.snapshot)
+    elif args.persona:
         # If no specific collection type flags, do all
         do_works = args.works or (not args.works and not args.quotes and not args.profile)
         do_quotes = args.quotes or (not args.works and not args.quotes and not args.profile)
         do_profile = args.profile or (not args.works and not args.quotes and not args.profile)
-        ingest_persona(args.persona, works=do_works, quotes=do_quotes, profile=do_profile)
+        ingest_persona(args.persona, works=do_works, quotes=do_quotes, profile=do_profile, full=args.full)
     else:
-        ingest_all()
+        ingest_all(full=args.full)
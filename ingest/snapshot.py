@@ -0,0 +1,319 @@
+"""Memory-mapped embedding snapshots of ingested collections.
+
+After ingestion each collection is exported to
+`{chroma_persist_dir}/snapshots/{collection_name}/`:
+
+  manifest.json                   generation, count, dim, format version
+  embeddings.npy                  (count, dim) float32, L2-normalized
+  ids.bin / ids.offsets.npy       chunk IDs, offset-indexed
+  texts.bin / texts.offsets.npy   chunk text (UTF-8), offset-indexed
+  metadata.bin / metadata.offsets.npy   chunk metadata (JSON), offset-indexed
+  centroids.npy                   (k, dim) representative vectors (persona routing)
+
+MCP server processes open snapshots read-only with `mmap`, so every worker
+on a node shares one page-cache copy instead of loading its own copy of
+each collection, and startup is a file map instead of a Chroma load.
+Record `i` of a `.bin` file spans bytes `offsets[i]:offsets[i + 1]`.
+
+The export streams the collection batch by batch into a preallocated
+memmap and the record files, so it needs memory for one batch, not for the
+whole collection.
+"""
+
+import json
+import mmap
+import shutil
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from config import settings
+
+FORMAT_VERSION = 1
+
+# Representative vectors per collection for persona routing
+NUM_CENTROIDS = 8
+
+# Rows per block when copying or clustering a (memory-mapped) embedding matrix
+_BLOCK_ROWS = 65536
+
+
+def snapshot_dir(collection_name: str) -> Path:
+    return Path(settings.chroma_persist_dir) / "snapshots" / collection_name
+
+
+def iter_collection(collection, batch_size: int = 4000) -> Iterator[tuple[list[str], list[str], list[dict], np.ndarray]]:
+    """Yield a Chroma collection in batches: (ids, texts, metadatas, float32 embeddings)."""
+    offset = 0
+    while True:
+        batch = collection.get(
+            include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+        )
+        if not batch["ids"]:
+            return
+        yield (
+            list(batch["ids"]),
+            [text or "" for text in batch["documents"]],
+            # Drop LlamaIndex internals (_node_content etc.), keep user-facing metadata
+            [{k: v for k, v in (meta or {}).items() if not k.startswith("_")} for meta in batch["metadatas"]],
+            np.asarray(batch["embeddings"], dtype=np.float32),
+        )
+        offset += len(batch["ids"])
+
+
+def read_collection(collection, batch_size: int = 4000) -> tuple[list[str], list[str], list[dict], np.ndarray]:
+    """Read every chunk of a Chroma collection: (ids, texts, metadatas, float32 embeddings)."""
+    ids: list[str] = []
+    texts: list[str] = []
+    metadatas: list[dict] = []
+    blocks: list[np.ndarray] = []
+    for batch_ids, batch_texts, batch_metadatas, batch_embeddings in iter_collection(collection, batch_size):
+        ids.extend(batch_ids)
+        texts.extend(batch_texts)
+        metadatas.extend(batch_metadatas)
+        blocks.append(batch_embeddings)
+
+    embeddings = np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+    return ids, texts, metadatas, embeddings
+
+
+class _RecordWriter:
+    """Append variable-length records to `{name}.bin`, writing offsets on close."""
+
+    def __init__(self, directory: Path, name: str):
+        self._directory = directory
+        self._name = name
+        self._file = open(directory / f"{name}.bin", "wb")
+        self._offsets = array("q", [0])
+
+    def write(self, records: Iterable[bytes]) -> None:
+        for record in records:
+            self._file.write(record)
+            self._offsets.append(self._offsets[-1] + len(record))
+
+    def close(self) -> None:
+        self._file.close()
+        np.save(self._directory / f"{self._name}.offsets.npy", np.frombuffer(self._offsets, dtype=np.int64))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def write_snapshot_batches(
+    collection_name: str,
+    batches: Iterable[tuple[list[str], list[str], list[dict], np.ndarray]],
+    count: int,
+    generation: str | None = None,
+) -> Path:
+    """Write a snapshot from streamed batches, replacing any previous one atomically.
+
+    Embeddings go straight into a preallocated `.npy` memmap of `count` rows
+    and records are appended to their `.bin` files, so memory use is one
+    batch regardless of collection size. Centroids are computed on the
+    memmap. `count` is an upper bound: surplus rows are dropped.
+    """
+    target = snapshot_dir(collection_name)
+    tmp = target.with_name(f".{target.name}.tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    writers = {name: _RecordWriter(tmp, name) for name in ("ids", "texts", "metadata")}
+    matrix = None
+    rows = 0
+    try:
+        for ids, texts, metadatas, embeddings in batches:
+            if not len(ids):
+                continue
+            if matrix is None:
+                dim = int(np.shape(embeddings)[1])
+                matrix = np.lib.format.open_memmap(
+                    tmp / "embeddings.npy", mode="w+", dtype=np.float32, shape=(count, dim)
+                )
+            if rows + len(ids) > count:
+                raise ValueError(f"Collection '{collection_name}' grew while being snapshotted")
+            matrix[rows:rows + len(ids)] = _normalize_rows(embeddings)
+            rows += len(ids)
+            writers["ids"].write(i.encode() for i in ids)
+            writers["texts"].write(t.encode() for t in texts)
+            writers["metadata"].write(json.dumps(m, ensure_ascii=False).encode() for m in metadatas)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if matrix is None:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+        np.save(tmp / "embeddings.npy", matrix)
+    else:
+        matrix.flush()
+        if rows < count:  # rows deleted meanwhile: rewrite at the actual size
+            shrunk = np.lib.format.open_memmap(
+                tmp / "embeddings.tmp.npy", mode="w+", dtype=np.float32, shape=(rows, matrix.shape[1])
+            )
+            for block in _row_blocks(rows):
+                shrunk[block] = matrix[block]
+            shrunk.flush()
+            del matrix
+            (tmp / "embeddings.tmp.npy").replace(tmp / "embeddings.npy")
+            matrix = shrunk
+    np.save(tmp / "centroids.npy", representative_vectors(matrix))
+    with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "collection": collection_name,
+            "generation": generation,
+            "count": rows,
+            "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        }, f)
+    del matrix
+
+    # Readers that already mapped the old files keep them alive until they close
+    old = target.with_name(f".{target.name}.old")
+    if target.exists():
+        if old.exists():
+            shutil.rmtree(old)
+        target.rename(old)
+    tmp.rename(target)
+    if old.exists():
+        shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def write_snapshot(
+    collection_name: str,
+    ids: list[str],
+    texts: list[str],
+    metadatas: list[dict],
+    embeddings: np.ndarray,
+    generation: str | None = None,
+) -> Path:
+    """Write a snapshot from in-memory data (see `write_snapshot_batches`)."""
+    return write_snapshot_batches(
+        collection_name, [(ids, texts, metadatas, embeddings)], len(ids), generation
+    )
+
+
+def snapshot_collection(collection, generation: str | None = None) -> Path:
+    """Export a Chroma collection to a snapshot, one `get` batch at a time."""
+    return write_snapshot_batches(collection.name, iter_collection(collection), collection.count(), generation)
+
+
+def _row_blocks(n: int) -> Iterator[slice]:
+    size = _BLOCK_ROWS
+    for start in range(0, n, size):
+        yield slice(start, min(start + size, n))
+
+
+def representative_vectors(embeddings: np.ndarray, k: int = NUM_CENTROIDS,
+                           iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit length) summarizing a collection's topics.
+
+    Works block by block, so `embeddings` can be a memmap larger than memory.
+    """
+    n = len(embeddings)
+    if n == 0:
+        return np.zeros((0, embeddings.shape[1] if embeddings.ndim == 2 else 0), dtype=np.float32)
+    k = min(k, n)
+
+    def similarities(vector: np.ndarray) -> np.ndarray:
+        return np.concatenate([embeddings[block] @ vector for block in _row_blocks(n)])
+
+    # Farthest-first initialization: spread the seeds over distinct topics
+    rng = np.random.default_rng(seed)
+    chosen = [int(rng.integers(n))]
+    closest = similarities(np.asarray(embeddings[chosen[0]]))
+    for _ in range(k - 1):
+        chosen.append(int(np.argmin(closest)))
+        closest = np.maximum(closest, similarities(np.asarray(embeddings[chosen[-1]])))
+    centroids = np.asarray(embeddings[chosen], dtype=np.float32).copy()
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        counts = np.zeros(k, dtype=np.int64)
+        for block in _row_blocks(n):
+            rows = np.asarray(embeddings[block])
+            assignment = np.argmax(rows @ centroids.T, axis=1)
+            for c in range(k):
+                sums[c] += rows[assignment == c].sum(axis=0)
+            counts += np.bincount(assignment, minlength=k)
+        members = counts > 0
+        centroids[members] = sums[members] / counts[members, None]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+def load_centroids(collection_name: str) -> tuple[np.ndarray, str | None] | None:
+    """Return (centroids, generation) of a collection's snapshot, or None if unavailable."""
+    directory = snapshot_dir(collection_name)
+    try:
+        with open(directory / "manifest.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+        centroids = np.load(directory / "centroids.npy")
+    except FileNotFoundError:
+        return None
+    return centroids, manifest.get("generation")
+
+
+class OffsetRecords:
+    """Read-only, memory-mapped sequence of variable-length records."""
+
+    def __init__(self, directory: Path, name: str, decode: Callable[[bytes], object]):
+        self._offsets = np.load(directory / f"{name}.offsets.npy", mmap_mode="r")
+        self._decode = decode
+        self._file = open(directory / f"{name}.bin", "rb")
+        size = self._file.seek(0, 2)
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._decode(self._data[start:end])
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+class Snapshot:
+    """A collection snapshot opened read-only with mmap."""
+
+    def __init__(self, directory: Path):
+        with open(directory / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.embeddings = np.load(directory / "embeddings.npy", mmap_mode="r")
+        self.ids = OffsetRecords(directory, "ids", lambda b: b.decode())
+        self.texts = OffsetRecords(directory, "texts", lambda b: b.decode())
+        self.metadatas = OffsetRecords(directory, "metadata", json.loads)
+
+    @property
+    def generation(self) -> str | None:
+        return self.manifest.get("generation")
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    @classmethod
+    def open(cls, collection_name: str) -> "Snapshot | None":
+        """Open a collection's snapshot (None if missing or of another format version)."""
+        directory = snapshot_dir(collection_name)
+        try:
+            snapshot = cls(directory)
+        except FileNotFoundError:
+            return None
+        if snapshot.manifest.get("version") != FORMAT_VERSION:
+            return None
+        return snapshot
@@ -159,66 +159,126 @@ async function searchWebContext(question) {
   }
 }
 
-// Call MCP server ask_persona tool
-async function askPersona(persona, query) {
-  try {
-    // Prepare headers
-    const headers = {
-      'Content-Type': 'application/json',
-      'Accept': 'application/json, text/event-stream'
-    };
+// Extract the text content from a JSON-RPC tools/call result
+function extractToolText(jsonData) {
+  if (jsonData.result && jsonData.result.content) {
+    const content = jsonData.result.content.find(c => c.type === 'text');
+    return content ? content.text : 'No response';
+  }
+  return null;
+}
 
-    // Add authorization if MCP_API_KEY is set
-    if (process.env.MCP_API_KEY) {
-      headers['Authorization'] = `Bearer ${process.env.MCP_API_KEY}`;
-    }
+// Call an MCP tool over streamable HTTP and return the JSON-RPC message
+// carrying its result. If onProgress is given, a progress token is sent and
+// every progress notification message is passed to onProgress.
+async function callMcpTool(name, args, onProgress = null) {
+  // Prepare headers
+  const headers = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json, text/event-stream'
+  };
+
+  // Add authorization if MCP_API_KEY is set
+  if (process.env.MCP_API_KEY) {
+    headers['Authorization'] = `Bearer ${process.env.MCP_API_KEY}`;
+  }
+
+  const params = { name: name, arguments: args };
+  if (onProgress) {
+    params._meta = { progressToken: `${name}-${Date.now()}` };
+  }
 
-    const response = await axios.post(
-      `${MCP_SERVER_URL}/mcp`,
-      {
-        jsonrpc: '2.0',
-        id: Date.now(),
-        method: 'tools/call',
-        params: {
-          name: 'ask_persona',
-          arguments: {
-            query: query,
-            persona: persona
-          }
+  const response = await axios.post(
+    `${MCP_SERVER_URL}/mcp`,
+    {
+      jsonrpc: '2.0',
+      id: Date.now(),
+      method: 'tools/call',
+      params: params
+    },
+    {
+      headers: headers,
+      timeout: 120000, // 2 minute timeout
+      responseType: 'stream'
+    }
+  );
+
+  // Parse SSE response incrementally
+  return await new Promise((resolve, reject) => {
+    let buffer = '';
+    let raw = '';
+    let result = null;
+
+    const handleLine = (line) => {
+      if (!line.startsWith('data: ')) return;
+      const jsonData = JSON.parse(line.substring(6));
+      if (jsonData.method === 'notifications/progress') {
+        if (onProgress && jsonData.params && jsonData.params.message) {
+          onProgress(jsonData.params.message);
         }
-      },
-      {
-        headers: headers,
-        timeout: 120000 // 2 minute timeout
+        return;
       }
-    );
+      if (jsonData.result || jsonData.error) result = jsonData;
+    };
 
-    // Parse SSE response
-    const data = response.data;
-    if (typeof data === 'string') {
-      // Parse SSE format
-      const lines = data.split('\n');
-      for (const line of lines) {
-        if (line.startsWith('data: ')) {
-          const jsonData = JSON.parse(line.substring(6));
-          if (jsonData.result && jsonData.result.content) {
-            const content = jsonData.result.content.find(c => c.type === 'text');
-            return content ? content.text : 'No response';
-          }
+    response.data.setEncoding('utf8');
+    response.data.on('data', (chunk) => {
+      raw += chunk;
+      buffer += chunk;
+      const lines = buffer.split('\n');
+      buffer = lines.pop() || '';
+      try {
+        lines.forEach(handleLine);
+      } catch (err) {
+        reject(err);
+      }
+    });
+    response.data.on('end', () => {
+      try {
+        if (buffer) handleLine(buffer);
+        if (result === null && raw.trim().startsWith('{')) {
+          // Plain JSON response (non-SSE)
+          result = JSON.parse(raw);
         }
+        resolve(result);
+      } catch (err) {
+        reject(err);
       }
-    } else if (data.result && data.result.content) {
-      const content = data.result.content.find(c => c.type === 'text');
-      return content ? content.text : 'No response';
-    }
+    });
+    response.data.on('error', reject);
+  });
+}
 
-    return 'No response received';
+// Call MCP server ask_persona tool.
+// If onChunk is given, the answer is streamed: the server sends partial text
+// as MCP progress notifications on the SSE response, forwarded to onChunk.
+async function askPersona(persona, query, onChunk = null) {
+  try {
+    const jsonData = await callMcpTool('ask_persona', { query: query, persona: persona }, onChunk);
+    const text = jsonData ? extractToolText(jsonData) : null;
+    return text !== null ? text : 'No response received';
   } catch (error) {
     console.error(`Error calling persona ${persona}:`, error.message);
     throw new Error(`Failed to get response from ${persona}: ${error.message}`);
   }
 }
 
+// Call MCP server ask_personas tool: one question, several personas, answered
+// concurrently in a single request. onEvent receives the per-persona progress
+// messages ({persona, text} deltas and {persona, done, answer|error}).
+async function askPersonas(personas, query, onEvent = null) {
+  const onProgress = onEvent ? (message) => onEvent(JSON.parse(message)) : null;
+  const jsonData = await callMcpTool('ask_personas', { query: query, personas: personas }, onProgress);
+  if (!jsonData || jsonData.error) {
+    throw new Error(`ask_personas failed: ${jsonData ? jsonData.error.message : 'no response'}`);
+  }
+  const result = jsonData.result;
+  if (result.structuredContent && result.structuredContent.result) {
+    return result.structuredContent.result;
+  }
+  return (result.content || []).filter(c => c.type === 'text').map(c => JSON.parse(c.text));
+}
+
 // API endpoint to get personas
 app.get('/api/personas', async (req, res) => {
   try {
@@ -232,7 +292,9 @@ app.get('/api/personas', async (req, res) => {
 
 // API endpoint for debate with streaming
 app.post('/api/debate', async (req, res) => {
-  const { question, personas, previousRounds = [] } = req.body;
+  // parallel: every persona answers the question independently, in one
+  // ask_personas call, instead of in turn after the previous speakers
+  const { question, personas, previousRounds = [], parallel = false } = req.body;
 
   if (!question || !personas || personas.length === 0) {
     return res.status(400).json({ error: 'Question and personas are required' });
@@ -288,8 +350,34 @@ app.post('/api/debate', async (req, res) => {
     // Send initial status
     res.write(`data: ${JSON.stringify({ type: 'start', question, personaCount: personas.length })}\n\n`);
 
+    if (parallel) {
+      personas.forEach((persona, i) => {
+        res.write(`data: ${JSON.stringify({ type: 'thinking', persona, index: i })}\n\n`);
+      });
+
+      const fullQuery = contextPrefix + `Întrebare: ${question}`;
+      const answers = await askPersonas(personas, fullQuery, (event) => {
+        const index = personas.indexOf(event.persona);
+        if (event.text !== undefined) {
+          res.write(`data: ${JSON.stringify({ type: 'chunk', persona: event.persona, index, text: event.text })}\n\n`);
+        } else if (event.done && event.answer !== undefined) {
+          // Stream each response as soon as that persona is done
+          res.write(`data: ${JSON.stringify({
+            type: 'response', persona: event.persona, response: event.answer,
+            timestamp: new Date().toISOString(), index
+          })}\n\n`);
+        }
+      });
+
+      for (const answer of answers) {
+        if (answer.error) throw new Error(`Failed to get response from ${answer.persona}: ${answer.error}`);
+        roundResults.push({ persona: answer.persona, response: answer.answer, timestamp: new Date().toISOString() });
+      }
+      console.log(`✓ ${personas.length} personas responded in parallel`);
+    }
+
     // Call each persona in order
-    for (let i = 0; i < personas.length; i++) {
+    for (let i = 0; !parallel && i < personas.length; i++) {
       const persona = personas[i];
 
       // Send "thinking" status
@@ -322,7 +410,10 @@ app.post('/api/debate', async (req, res) => {
       }
 
       console.log(`Calling ${persona}...`);
-      const response = await askPersona(persona, fullQuery);
+      const response = await askPersona(persona, fullQuery, (text) => {
+        // Forward partial text as it is generated
+        res.write(`data: ${JSON.stringify({ type: 'chunk', persona, index: i, text })}\n\n`);
+      });
 
       const result = {
         persona: persona,
@@ -0,0 +1,177 @@
+"""Test the semantic answer cache backends (no API keys or Redis server required)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.answer_cache import InProcessAnswerCache, RedisAnswerCache
+
+
+def _cache(**overrides) -> InProcessAnswerCache:
+    kwargs = dict(max_entries=10, ttl_seconds=3600, threshold=0.95)
+    kwargs.update(overrides)
+    return InProcessAnswerCache(**kwargs)
+
+
+def test_similar_query_hits():
+    """A near-identical query embedding should return the cached answer."""
+    cache = _cache()
+
+    async def scenario():
+        await cache.store("eminescu", "fp1", [1.0, 0.0, 0.0], "Raspuns despre Luceafarul")
+        assert await cache.lookup("eminescu", "fp1", [0.99, 0.05, 0.0]) == "Raspuns despre Luceafarul"
+        assert await cache.lookup("eminescu", "fp1", [0.0, 1.0, 0.0]) is None, "Dissimilar query should miss"
+        assert await cache.lookup("cioran", "fp1", [1.0, 0.0, 0.0]) is None, "Other persona should miss"
+
+    asyncio.run(scenario())
+    assert cache.hits == 1 and cache.misses == 2
+    print("PASS: Cosine-neighbour hit, dissimilar/other-persona miss")
+
+
+def test_fingerprint_change_invalidates():
+    """Entries stored under an old persona fingerprint should no longer match."""
+    cache = _cache()
+
+    async def scenario():
+        await cache.store("caragiale", "before-ingest", [0.0, 1.0], "Raspuns vechi")
+        assert await cache.lookup("caragiale", "after-ingest", [0.0, 1.0]) is None
+        assert cache.stats()["size"] == 0, "Stale entry should be dropped"
+
+        await cache.store("caragiale", "after-ingest", [0.0, 1.0], "Raspuns nou")
+        await cache.invalidate("caragiale")
+        assert await cache.lookup("caragiale", "after-ingest", [0.0, 1.0]) is None
+
+    asyncio.run(scenario())
+    print("PASS: Fingerprint change and explicit invalidation")
+
+
+def test_ttl_and_lru_eviction():
+    """Expired entries miss and the least recently used entry is evicted first."""
+    async def scenario():
+        expired = _cache(ttl_seconds=-1)
+        await expired.store("eliade", "fp", [1.0, 0.0], "Expirat")
+        assert await expired.lookup("eliade", "fp", [1.0, 0.0]) is None
+
+        cache = _cache(max_entries=2)
+        await cache.store("eliade", "fp", [1.0, 0.0], "A")
+        await cache.store("eliade", "fp", [0.0, 1.0], "B")
+        assert await cache.lookup("eliade", "fp", [1.0, 0.0]) == "A"  # A most recent
+        await cache.store("eliade", "fp", [0.7, 0.7], "C")
+        assert await cache.lookup("eliade", "fp", [0.0, 1.0]) is None, "B should be evicted"
+        assert await cache.lookup("eliade", "fp", [1.0, 0.0]) == "A"
+
+    asyncio.run(scenario())
+    print("PASS: TTL expiry and LRU eviction")
+
+
+def _b(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class _FakeRedis:
+    """The asyncio Redis commands used by RedisAnswerCache, in memory; records hash reads."""
+
+    def __init__(self):
+        self.hashes: dict[bytes, dict[bytes, bytes]] = {}
+        self.zsets: dict[bytes, dict[bytes, float]] = {}
+        self.read: list[tuple[str, bytes]] = []
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(_b(key), {})[_b(field)] = _b(value)
+
+    async def hget(self, key, field):
+        self.read.append(("hget", _b(key)))
+        return self.hashes.get(_b(key), {}).get(_b(field))
+
+    async def hgetall(self, key):
+        self.read.append(("hgetall", _b(key)))
+        return dict(self.hashes.get(_b(key), {}))
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(_b(key), {}).pop(_b(field), None)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(_b(key), {}).update({_b(m): s for m, s in mapping.items()})
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(_b(key), {}).pop(_b(member), None)
+
+    async def zcard(self, key):
+        return len(self.zsets.get(_b(key), {}))
+
+    async def zrange(self, key, start, end):
+        return sorted(self.zsets.get(_b(key), {}), key=self.zsets[_b(key)].get)[start:end + 1]
+
+    async def zrangebyscore(self, key, low, high):
+        return [m for m, score in self.zsets.get(_b(key), {}).items() if score <= high]
+
+    async def expire(self, key, ttl):
+        pass
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis, self._calls = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self._calls.append(getattr(self._redis, name)(*args))
+
+    async def execute(self):
+        return [await call for call in self._calls]
+
+
+def test_redis_lookup_fetches_only_the_best_answer():
+    """Redis lookups read the embeddings and fetch just the matching answer."""
+    cache = RedisAnswerCache("redis://localhost:6379/0", max_entries=2, ttl_seconds=3600, threshold=0.95)
+    cache._redis = redis = _FakeRedis()
+
+    async def scenario():
+        await cache.store("eminescu", "fp", [1.0, 0.0], "Raspuns lung A " * 100)
+        await cache.store("eminescu", "fp", [0.0, 1.0], "B")
+        redis.read.clear()
+        assert await cache.lookup("eminescu", "fp", [0.0, 0.99]) == "B"
+        assert redis.read == [
+            ("hgetall", b"answer_cache:eminescu:fp:emb"), ("hget", b"answer_cache:eminescu:fp:answers"),
+        ]
+        assert await cache.lookup("eminescu", "fp", [0.7, -0.7]) is None
+
+        # LRU: A is least recently used and is evicted with all its fields
+        await cache.store("eminescu", "fp", [0.6, 0.8], "C")
+        assert len(redis.hashes[b"answer_cache:eminescu:fp:answers"]) == 2
+        assert await cache.lookup("eminescu", "fp", [1.0, 0.0]) is None
+
+        cache.ttl_seconds = -1
+        assert await cache.lookup("eminescu", "fp", [0.0, 1.0]) is None
+        assert redis.hashes[b"answer_cache:eminescu:fp:emb"] == {}
+
+    asyncio.run(scenario())
+    assert cache.hits == 1 and cache.misses == 3
+    print("PASS: Redis lookup fetches only the best answer")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ANSWER CACHE TESTS")
+    print("=" * 60)
+
+    test_similar_query_hits()
+    test_fingerprint_change_invalidates()
+    test_ttl_and_lru_eviction()
+    test_redis_lookup_fetches_only_the_best_answer()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,162 @@
+"""Test multi-persona MCP tools with fake retrieval and synthesis (no API keys required)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent import mcp_server
+from agent.context import RetrievedChunk
+from agent.synthesis_client import SynthesisBusyError
+
+
+class _FakeContext:
+    """Minimal MCP Context: a progress token and a recorder for progress notifications."""
+
+    def __init__(self):
+        self.request_context = SimpleNamespace(meta=SimpleNamespace(progressToken="tok"))
+        self.progress: list[tuple[float, str]] = []
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress.append((progress, message))
+
+
+class _Patched:
+    """Replace embedding, retrieval and synthesis in mcp_server for the duration of a test."""
+
+    def __init__(self):
+        self.embed_calls = 0
+        self.searches: list[tuple[str, str, str]] = []
+        self.prompts: list[tuple[str, str]] = []
+
+    async def embed(self, query):
+        self.embed_calls += 1
+        return [0.1, 0.2, 0.3]
+
+    async def search(self, query, persona_id, collection_type, query_embedding=None, lexical_only=False):
+        self.searches.append((query, persona_id, collection_type))
+        return [RetrievedChunk(
+            text=f"Text din {collection_type} pentru {persona_id}.",
+            source=f"{persona_id}_{collection_type}.txt",
+            collection_type=collection_type,
+            node_id=f"{persona_id}-{collection_type}",
+        )]
+
+    async def synthesize(self, query, context, source_list, voice_prompt, display_name, on_text=None,
+                         persona_id=None, diagnostics=None):
+        self.prompts.append((display_name, query))
+        answer = f"Raspunsul lui {display_name}."
+        if on_text is not None:
+            for part in answer.split(" "):
+                await on_text(part + " ")
+        return answer
+
+    def __enter__(self):
+        self._saved = (
+            mcp_server._embed_query, mcp_server._search_collection,
+            mcp_server._synthesize_with_claude, mcp_server.get_answer_cache,
+        )
+        mcp_server._embed_query = self.embed
+        mcp_server._search_collection = self.search
+        mcp_server._synthesize_with_claude = self.synthesize
+        mcp_server.get_answer_cache = lambda: None
+        return self
+
+    def __exit__(self, *exc):
+        (
+            mcp_server._embed_query, mcp_server._search_collection,
+            mcp_server._synthesize_with_claude, mcp_server.get_answer_cache,
+        ) = self._saved
+        return False
+
+
+def test_ask_personas_embeds_once_and_streams_per_persona():
+    """One embedding for all personas; progress messages are tagged by persona."""
+    ctx = _FakeContext()
+    with _Patched() as patched:
+        results = asyncio.run(mcp_server.ask_personas(
+            "Ce este libertatea?", ["eminescu", "cioran", "eminescu", "necunoscut"], ctx
+        ))
+
+    assert patched.embed_calls == 1
+    assert [r["persona"] for r in results] == ["eminescu", "cioran", "necunoscut"]
+    assert results[0]["answer"] == "Raspunsul lui Mihai Eminescu."
+    assert "error" in results[2]
+
+    messages = [json.loads(m) for _, m in ctx.progress]
+    done = {m["persona"] for m in messages if m.get("done")}
+    assert done == {"eminescu", "cioran", "necunoscut"}
+    streamed = "".join(m["text"] for m in messages if m.get("persona") == "cioran" and "text" in m)
+    assert streamed.strip() == "Raspunsul lui Emil Cioran."
+    progress = [p for p, _ in ctx.progress]
+    assert progress == sorted(progress) and len(set(progress)) == len(progress)
+    print("PASS: ask_personas embeds once and streams per persona")
+
+
+def test_debate_reuses_retrieval_across_rounds():
+    """Each (persona, sub-question) is searched once; later speakers see earlier answers."""
+    ctx = _FakeContext()
+    with _Patched() as patched:
+        rounds = asyncio.run(mcp_server.debate("Ce este libertatea?", ["eminescu", "cioran"], 3, False, ctx))
+
+    assert [r["round"] for r in rounds] == [1, 2, 3]
+    assert [r["persona"] for r in rounds[0]["responses"]] == ["eminescu", "cioran"]
+    # Round 1: the question; round 2: question + the other's reply; round 3 repeats
+    # round 2's sub-question (same fake answers), so it is served from the debate cache
+    assert len(patched.searches) == 2 * 2 * len(mcp_server.COLLECTION_TYPES)
+
+    first_round = patched.prompts[:2]
+    assert "Raspunsul lui Mihai Eminescu" not in first_round[0][1]
+    assert "Raspunsul lui Mihai Eminescu" in first_round[1][1]
+    assert "RUNDA 2" in patched.prompts[-1][1]
+
+    done = [json.loads(m) for _, m in ctx.progress if '"done"' in m]
+    assert [(d["round"], d["persona"]) for d in done][:2] == [(1, "eminescu"), (1, "cioran")]
+    print("PASS: Debate reuses retrieval across rounds")
+
+
+def test_parallel_debate_round():
+    """In parallel mode, speakers of the same round don't see each other's answers."""
+    with _Patched() as patched:
+        asyncio.run(mcp_server.debate("Ce este libertatea?", ["eminescu", "cioran"], 1, True))
+    assert all("Raspunsuri anterioare" not in prompt for _, prompt in patched.prompts)
+    print("PASS: Parallel debate round")
+
+
+def test_debate_keeps_rounds_when_synthesis_is_busy():
+    """A busy synthesis stage skips one turn (with retry_after) instead of failing the debate."""
+
+    class _Busy(_Patched):
+        async def synthesize(self, query, context, source_list, voice_prompt, display_name, **kwargs):
+            if display_name == "Emil Cioran" and len(self.prompts) == 1:
+                self.prompts.append((display_name, query))
+                raise SynthesisBusyError(7)
+            return await super().synthesize(query, context, source_list, voice_prompt, display_name, **kwargs)
+
+    with _Busy() as patched:
+        rounds = asyncio.run(mcp_server.debate("Ce este libertatea?", ["eminescu", "cioran"], 2, False))
+
+    first = rounds[0]["responses"]
+    assert first[0]["answer"] == "Raspunsul lui Mihai Eminescu."
+    assert first[1]["persona"] == "cioran" and first[1]["retry_after"] == 7 and "answer" not in first[1]
+    assert all("answer" in r for r in rounds[1]["responses"])
+    assert "RUNDA 1" in patched.prompts[-1][1]
+    print("PASS: Debate keeps completed rounds when synthesis is busy")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BATCH TOOL TESTS")
+    print("=" * 60)
+
+    test_ask_personas_embeds_once_and_streams_per_persona()
+    test_debate_reuses_retrieval_across_rounds()
+    test_parallel_debate_round()
+    test_debate_keeps_rounds_when_synthesis_is_busy()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
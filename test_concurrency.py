@@ -0,0 +1,208 @@
+"""Test per-stage concurrency limits used by the MCP server (no API keys required)."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.concurrency import StageLimiter
+from agent.singleflight import SingleFlight
+from agent.synthesis_client import SynthesisBusyError, SynthesisClientManager
+
+
+def test_blocking_calls_do_not_block_event_loop():
+    """Blocking stage calls should run off-loop and overlap with each other."""
+    stage = StageLimiter("test", max_concurrency=3, max_workers=3)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            ticker(),
+            *(stage.run(time.sleep, 0.1) for _ in range(3)),
+        )
+        return time.perf_counter() - start, ticks
+
+    elapsed, ticks = asyncio.run(scenario())
+    stage.shutdown()
+    assert ticks == 5, "Event loop should keep running while blocking calls execute"
+    assert elapsed < 0.25, f"3 x 0.1s calls should overlap, took {elapsed:.2f}s"
+    print(f"PASS: Blocking calls ran concurrently ({elapsed:.2f}s)")
+
+
+def test_concurrency_limit():
+    """No more than max_concurrency calls should be in flight at once."""
+    stage = StageLimiter("test", max_concurrency=2, max_workers=8)
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    async def scenario():
+        await asyncio.gather(*(stage.run(work) for _ in range(8)))
+
+    asyncio.run(scenario())
+    stage.shutdown()
+    assert peak == 2, f"Expected peak concurrency 2, got {peak}"
+    assert stage.stats()["completed"] == 8
+    print("PASS: Stage concurrency limit enforced")
+
+
+def test_timed_out_call_keeps_slot():
+    """A caller timing out must not free the slot while its thread is still running."""
+    stage = StageLimiter("test", max_concurrency=1, max_workers=4)
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(stage.run(time.sleep, 0.2), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        busy = stage.stats()
+        start = time.perf_counter()
+        await stage.run(lambda: None)
+        return busy, time.perf_counter() - start
+
+    busy, waited = asyncio.run(scenario())
+    stage.shutdown()
+    assert busy["in_flight"] == 1 and busy["abandoned"] == 1
+    assert waited >= 0.1, "The next call should wait for the abandoned thread"
+    assert stage.stats()["abandoned"] == 0 and stage.stats()["in_flight"] == 0
+    print("PASS: Timed-out call keeps its slot until the thread returns")
+
+
+def test_synthesis_backpressure():
+    """A saturated synthesis stage should reject new calls with a Retry-After hint."""
+    manager = SynthesisClientManager(
+        max_in_flight=1,
+        max_queue=1,
+        queue_timeout=5,
+        max_connections=2,
+        max_keepalive_connections=1,
+        keepalive_expiry=30,
+    )
+    manager._client = object()  # no network: the slot only hands out the client
+
+    async def hold(release: asyncio.Event):
+        async with manager.slot():
+            await release.wait()
+
+    async def scenario():
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(release))
+        queued = asyncio.create_task(hold(release))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert manager.is_saturated(), "1 in flight + 1 queued should saturate"
+
+        try:
+            async with manager.slot():
+                pass
+            assert False, "Should have raised SynthesisBusyError"
+        except SynthesisBusyError as e:
+            assert e.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+    stats = manager.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2, stats
+    print("PASS: Synthesis backpressure rejects when saturated")
+
+
+def test_single_flight_coalesces_identical_calls():
+    """Concurrent calls with the same key should share one execution and its stream."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work(emit):
+        nonlocal calls
+        calls += 1
+        await emit("Prima parte, ")
+        await asyncio.sleep(0.02)
+        await emit("a doua parte.")
+        return "Prima parte, a doua parte."
+
+    async def scenario():
+        streams = [[] for _ in range(3)]
+
+        async def caller(i: int, delay: float):
+            await asyncio.sleep(delay)
+
+            async def on_emit(text):
+                streams[i].append(text)
+
+            return await flight.do(("eminescu", "luceafarul"), work, on_emit=on_emit)
+
+        # Third caller joins after the first chunk was emitted
+        results = await asyncio.gather(caller(0, 0), caller(1, 0), caller(2, 0.01))
+        return results, ["".join(s) for s in streams]
+
+    results, streams = asyncio.run(scenario())
+    assert calls == 1, f"Expected 1 execution, got {calls}"
+    assert results == ["Prima parte, a doua parte."] * 3
+    assert streams == ["Prima parte, a doua parte."] * 3, f"Every caller should see the full stream: {streams}"
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 2}
+    print("PASS: Single-flight coalesced identical calls")
+
+
+def test_synthesis_call_timeout_is_not_busy():
+    """A timeout raised by the API call itself must not be reported as backpressure."""
+    manager = SynthesisClientManager(
+        max_in_flight=1,
+        max_queue=1,
+        queue_timeout=5,
+        max_connections=2,
+        max_keepalive_connections=1,
+        keepalive_expiry=30,
+    )
+    manager._client = object()
+
+    async def scenario():
+        async with manager.slot():
+            raise asyncio.TimeoutError
+
+    try:
+        asyncio.run(scenario())
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("Expected the call's TimeoutError")
+    stats = manager.stats()
+    assert stats["rejected"] == 0 and stats["in_flight"] == 0 and stats["completed"] == 1
+    print("PASS: Synthesis call timeouts are not reported as busy")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CONCURRENCY TESTS")
+    print("=" * 60)
+
+    test_blocking_calls_do_not_block_event_loop()
+    test_concurrency_limit()
+    test_timed_out_call_keeps_slot()
+    test_synthesis_backpressure()
+    test_synthesis_call_timeout_is_not_busy()
+    test_single_flight_coalesces_identical_calls()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,82 @@
+"""Test token-budgeted context assembly (no API keys required)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.context import (
+    ContextAssembler,
+    ContextSection,
+    RetrievedChunk,
+    count_tokens,
+    truncate_to_sentences,
+)
+
+SENTENCES = [
+    "Lumea e o iluzie, iar fericirea trece ca un nor peste campie.",
+    "Doar creatia artistica transcende nimicnicia existentei omenesti.",
+    "Geniul ramane singur, neinteles de cei ce traiesc in clipa.",
+    "Natura romaneasca ii ofera poetului un refugiu si o oglinda.",
+]
+
+
+def _chunk(text: str, ct: str, source: str = "opera.txt") -> RetrievedChunk:
+    return RetrievedChunk(text=text, source=source, collection_type=ct)
+
+
+def test_truncate_at_sentence_boundary():
+    """Truncation should keep whole sentences only."""
+    text = " ".join(SENTENCES)
+    budget = count_tokens(SENTENCES[0]) + count_tokens(SENTENCES[1]) + 3
+    truncated = truncate_to_sentences(text, budget)
+    assert truncated == f"{SENTENCES[0]} {SENTENCES[1]}", truncated
+    print("PASS: Truncation at sentence boundary")
+
+
+def test_overlapping_chunks_dropped():
+    """A chunk mostly contained in an already selected chunk should be dropped."""
+    full = " ".join(SENTENCES)
+    overlap = " ".join(SENTENCES[1:3])  # overlapping window of the same text
+    assembler = ContextAssembler(token_budget=2000)
+    assembled = assembler.assemble([
+        ContextSection("works", "## Opera\n\n", [_chunk(full, "works"), _chunk(overlap, "works")], 1.0),
+    ])
+    assert assembled.dropped_duplicates == 1
+    assert len(assembled.chunks) == 1
+    print("PASS: Overlapping chunk dropped")
+
+
+def test_budget_and_redistribution():
+    """The context should respect the budget, and unused quota flows to other sections."""
+    # Distinct chunks, so none are treated as duplicates
+    long_works = [
+        _chunk(f"Fragmentul {i}: " + " ".join(f"cuvant{i}_{j}." for j in range(60)), "works", f"w{i}.txt")
+        for i in range(20)
+    ]
+
+    budget = 800
+    assembler = ContextAssembler(token_budget=budget)
+    assembled = assembler.assemble([
+        ContextSection("profile", "## Profil\n\n", [], 0.5),  # empty: its quota is spare
+        ContextSection("works", "## Opera\n\n", long_works, 0.5),
+    ])
+    works_quota = budget // 2
+    assert assembled.tokens <= budget + 50, f"Context too large: {assembled.tokens} tokens"
+    assert assembled.tokens > works_quota, "Unused profile quota should be given to works"
+    assert assembled.sources <= {f"w{i}.txt" for i in range(20)}
+    print(f"PASS: Budget respected with redistribution ({assembled.tokens} tokens)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CONTEXT ASSEMBLY TESTS")
+    print("=" * 60)
+
+    test_truncate_at_sentence_boundary()
+    test_overlapping_chunks_dropped()
+    test_budget_and_redistribution()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,103 @@
+"""Test the persistent ingestion embedding cache (no API keys required)."""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.embeddings import MockEmbedding
+
+from config import settings
+from ingest import run_ingestion
+from ingest.embedding_cache import CachedEmbedding, EmbeddingCache
+
+
+class _CountingEmbedding(MockEmbedding):
+    """Deterministic local embedding that counts embedded texts."""
+
+    embedded: int = 0
+
+    def _get_text_embeddings(self, texts):
+        self.embedded += len(texts)
+        return [[float(len(t)), 1.0, 0.5, 0.25] for t in texts]
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+
+def test_cache_roundtrip_is_keyed_by_model():
+    """Vectors persist across connections and are not shared between models."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite"
+        cache = EmbeddingCache(path)
+        cache.put_many("model-a", 0, {"h1": [0.5, -1.0], "h2": [2.0, 3.0]})
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        assert reopened.get_many("model-a", 0, ["h1", "h2", "h3"]) == {"h1": [0.5, -1.0], "h2": [2.0, 3.0]}
+        assert reopened.get_many("model-b", 0, ["h1"]) == {}
+        assert reopened.get_many("model-a", 256, ["h1"]) == {}
+        assert len(reopened) == 2
+        reopened.close()
+    print("PASS: Cache roundtrip keyed by model and dimensions")
+
+
+def test_cached_embedding_counts_hits():
+    """Only texts not seen before reach the wrapped model; order is preserved."""
+    inner = _CountingEmbedding(embed_dim=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(Path(tmp) / "cache.sqlite")
+        first = CachedEmbedding(inner, cache)
+        vectors = first.get_text_embedding_batch(["unu", "doi", "unu"])
+        assert inner.embedded == 2
+        assert vectors[0] == vectors[2] and vectors[1][0] == 3.0
+        assert first.stats()["misses"] == 3
+
+        second = CachedEmbedding(inner, cache)
+        again = asyncio.run(second.aget_text_embedding_batch(["doi", "trei", "unu"]))
+        assert inner.embedded == 3
+        assert again[0] == vectors[1] and again[2] == vectors[0]
+        assert second.stats() == {"hits": 2, "misses": 1, "hit_rate": 0.667}
+        cache.close()
+    print("PASS: Cached embedding counts hits and misses")
+
+
+def test_full_reingest_served_from_cache():
+    """A forced full re-ingestion re-chunks everything but embeds nothing new."""
+    inner = _CountingEmbedding(embed_dim=4)
+    saved = (settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = str(Path(tmp) / "chroma")
+        settings.data_dir = str(Path(tmp) / "data")
+        run_ingestion._get_embedding = lambda **kwargs: inner
+        works = Path(settings.data_dir) / "cioran" / "works"
+        works.mkdir(parents=True)
+        for name in ("amurgul", "lacrimi", "tratat"):
+            (works / f"{name}.txt").write_text(f"Eseul {name}. " * 5, encoding="utf-8")
+
+        try:
+            assert run_ingestion.ingest_works("cioran") == 3
+            assert inner.embedded == 3
+            assert run_ingestion.ingest_works("cioran", full=True) == 3
+            assert inner.embedded == 3
+        finally:
+            settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding = saved
+            run_ingestion._embedding_cache = None
+    print("PASS: Full re-ingestion served from the embedding cache")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EMBEDDING CACHE TESTS")
+    print("=" * 60)
+
+    test_cache_roundtrip_is_keyed_by_model()
+    test_cached_embedding_counts_hits()
+    test_full_reingest_served_from_cache()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
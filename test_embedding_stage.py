@@ -0,0 +1,205 @@
+"""Test the concurrent, rate-limited ingestion embedding stage (no API keys required)."""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from ingest import embedding_stage
+from ingest.embedding_cache import CachedEmbedding, EmbeddingCache
+from ingest.embedding_stage import EmbeddingStage, RateBudget
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str):
+        super().__init__("Too Many Requests")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+class _ServerError(Exception):
+    status_code = 503
+
+
+class _SlowEmbedding:
+    """Async embedding model with fixed latency; fails the first `throttled` calls with 429
+    and the next `failing` calls with 503."""
+
+    def __init__(self, latency: float = 0.05, throttled: int = 0, failing: int = 0):
+        self.latency = latency
+        self.throttled = throttled
+        self.failing = failing
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def _aget_text_embeddings(self, texts):
+        self.calls += 1
+        if self.throttled:
+            self.throttled -= 1
+            raise _RateLimitError("0.05")
+        if self.failing:
+            self.failing -= 1
+            raise _ServerError("Service Unavailable")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _nodes(n: int) -> list[TextNode]:
+    return [TextNode(id_=f"n{i}", text=f"Fragmentul {i}") for i in range(n)]
+
+
+def test_batches_run_concurrently_and_are_written():
+    """Up to `concurrency` requests are in flight; every node is embedded and written once."""
+    model = _SlowEmbedding(latency=0.05)
+    stage = EmbeddingStage(model, concurrency=4, batch_size=10)
+    written: list[list[str]] = []
+
+    start = time.perf_counter()
+    count = asyncio.run(stage.run(stage.batches(_nodes(80)), lambda b: written.append([n.node_id for n in b])))
+    elapsed = time.perf_counter() - start
+
+    assert count == 80 and model.calls == 8
+    assert model.max_in_flight == 4
+    assert elapsed < 8 * 0.05  # faster than one request at a time
+    assert sorted(i for batch in written for i in batch) == sorted(f"n{i}" for i in range(80))
+    assert all(len(batch) == 10 for batch in written)
+    print("PASS: Batches run concurrently and are written as they complete")
+
+
+def test_batch_source_runs_off_the_event_loop():
+    """Blocking work in the batch source overlaps with the embedding requests in flight."""
+    model = _SlowEmbedding(latency=0.05)
+    stage = EmbeddingStage(model, concurrency=4, batch_size=10)
+
+    def slow_batches():
+        for batch in stage.batches(_nodes(80)):
+            time.sleep(0.05)  # e.g. reading and splitting the next file
+            yield batch
+
+    async def scenario():
+        gaps: list[float] = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticking = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        count = await stage.run(slow_batches(), lambda b: None)
+        ticking.cancel()
+        return count, max(gaps)
+
+    count, max_gap = asyncio.run(scenario())
+    assert count == 80
+    assert max_gap < 0.04, f"Event loop stalled for {max_gap:.3f}s"
+    print("PASS: Batch source runs off the event loop")
+
+
+def test_rate_limited_batches_are_retried():
+    """429 responses pause the stage and the batch is retried."""
+    model = _SlowEmbedding(latency=0.0, throttled=2)
+    stage = EmbeddingStage(model, concurrency=2, batch_size=5)
+    nodes = _nodes(10)
+
+    assert asyncio.run(stage.run(stage.batches(nodes), lambda b: None)) == 10
+    assert stage.stats()["rate_limited"] == 2
+    assert all(n.embedding is not None for n in nodes)
+    print("PASS: Rate-limited batches are retried")
+
+
+def test_transient_errors_are_retried():
+    """5xx responses back off and retry; other errors still fail the run."""
+    model = _SlowEmbedding(latency=0.0, failing=2)
+    stage = EmbeddingStage(model, concurrency=1, batch_size=5, backoff_base=0.01)
+    assert asyncio.run(stage.run(stage.batches(_nodes(5)), lambda b: None)) == 5
+    assert stage.stats()["transient_errors"] == 2 and stage.stats()["rate_limited"] == 0
+
+    class _Broken(_SlowEmbedding):
+        async def _aget_text_embeddings(self, texts):
+            raise ValueError("bad input")
+
+    try:
+        asyncio.run(EmbeddingStage(_Broken()).run([_nodes(1)], lambda b: None))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Non-transient errors must not be retried")
+    print("PASS: Transient errors are retried")
+
+
+def test_cached_texts_skip_the_rate_budget():
+    """Cache hits are served before budgeting: a fully cached re-run sends no requests."""
+    original = embedding_stage.WINDOW_SECONDS
+    embedding_stage.WINDOW_SECONDS = 2.0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = EmbeddingCache(Path(tmp) / "cache.sqlite")
+            model = CachedEmbedding(MockEmbedding(embed_dim=4), cache)
+            first = EmbeddingStage(model, concurrency=2, batch_size=5, rpm=2)
+            assert asyncio.run(first.run(first.batches(_nodes(10)), lambda b: None)) == 10
+            assert first.stats()["requests"] == 2
+
+            again = EmbeddingStage(model, concurrency=2, batch_size=5, rpm=2)
+            start = time.perf_counter()
+            assert asyncio.run(again.run(again.batches(_nodes(10)), lambda b: None)) == 10
+            assert time.perf_counter() - start < 1.0, "Cached texts must not wait on the budget"
+            assert again.stats()["requests"] == 0 and again.stats()["tokens"] == 0
+            cache.close()
+    finally:
+        embedding_stage.WINDOW_SECONDS = original
+    print("PASS: Cached texts skip the rate budget")
+
+
+async def _acquire(budget: RateBudget, tokens: list[int]) -> float:
+    start = time.perf_counter()
+    for t in tokens:
+        await budget.acquire(t)
+    return time.perf_counter() - start
+
+
+def test_rate_budget_limits_requests_and_tokens():
+    """A request over the per-window budget waits until the oldest request expires."""
+    original = embedding_stage.WINDOW_SECONDS
+    embedding_stage.WINDOW_SECONDS = 0.2
+    try:
+        assert asyncio.run(_acquire(RateBudget(rpm=2), [10, 10])) < 0.1
+        assert asyncio.run(_acquire(RateBudget(rpm=2), [10, 10, 10])) >= 0.15
+        assert asyncio.run(_acquire(RateBudget(tpm=100), [60, 60])) >= 0.15
+        # A single batch above the token budget still goes out (into an empty window)
+        assert asyncio.run(_acquire(RateBudget(tpm=100), [500])) < 0.1
+    finally:
+        embedding_stage.WINDOW_SECONDS = original
+    print("PASS: Rate budget limits requests and tokens per window")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EMBEDDING STAGE TESTS")
+    print("=" * 60)
+
+    test_batches_run_concurrently_and_are_written()
+    test_batch_source_runs_off_the_event_loop()
+    test_rate_limited_batches_are_retried()
+    test_transient_errors_are_retried()
+    test_cached_texts_skip_the_rate_budget()
+    test_rate_budget_limits_requests_and_tokens()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,87 @@
+"""Test the in-memory NumPy flat index (no API keys required)."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.schema import QueryBundle
+
+from agent.flat_index import FlatIndex, FlatRetriever
+
+
+def _index(n: int = 300, dim: int = 64) -> FlatIndex:
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"n{i}" for i in range(n)]
+    return FlatIndex(ids, [f"text {i}" for i in range(n)], [{"source_file": f"{i}.txt"} for i in range(n)], vectors)
+
+
+def test_exact_top_k():
+    """argpartition top-k should equal a full sort by cosine similarity."""
+    index = _index()
+    query = np.random.default_rng(3).standard_normal(64)
+    expected = np.argsort(index.matrix @ (query / np.linalg.norm(query)))[::-1][:10]
+    got = [i for i, _ in index.search(query, 10)]
+    assert got == expected.tolist()
+
+    # top_k larger than the collection returns everything, best first
+    small = _index(n=5)
+    results = small.search(query, 10)
+    assert len(results) == 5
+    assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+    print("PASS: Exact top-k with argpartition")
+
+
+def test_flat_retriever():
+    """The retriever should return nodes and embed the query itself when needed."""
+    index = _index()
+    target = index.matrix[42]
+    embed_model = SimpleNamespace(get_query_embedding=lambda text: target.tolist())
+    retriever = FlatRetriever(index, similarity_top_k=3, embed_model=embed_model)
+
+    nodes = retriever.retrieve(QueryBundle(query_str="q", embedding=target.tolist()))
+    assert nodes[0].node_id == "n42" and nodes[0].metadata["source_file"] == "42.txt"
+    assert len(nodes) == 3
+
+    nodes = retriever.retrieve(QueryBundle(query_str="q"))
+    assert nodes[0].get_content() == "text 42"
+    print("PASS: Flat retriever")
+
+
+def test_quantized_storage():
+    """int8/float16 storage shrinks memory; rescoring restores the exact ranking."""
+    full = _index(n=2000, dim=128)
+    queries = np.random.default_rng(11).standard_normal((20, 128))
+    exact = [[i for i, _ in full.search(q, 10)] for q in queries]
+
+    for quantization, ratio in (("float16", 2), ("int8", 4)):
+        quantized = FlatIndex(full.ids, full.texts, full.metadatas, full.matrix, quantization=quantization)
+        assert quantized.nbytes <= full.nbytes / ratio + 4 * len(full)
+        got = [[i for i, _ in quantized.search(q, 10)] for q in queries]
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(got, exact)])
+        assert recall >= 0.9, (quantization, recall)
+
+    rescored = FlatIndex(
+        full.ids, full.texts, full.metadatas, full.matrix,
+        quantization="int8", full_precision=lambda rows: full.matrix[rows],
+    )
+    assert [[i for i, _ in rescored.search(q, 10)] for q in queries] == exact
+    print("PASS: Quantized storage and full-precision rescoring")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("FLAT INDEX TESTS")
+    print("=" * 60)
+
+    test_exact_top_k()
+    test_flat_retriever()
+    test_quantized_storage()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,172 @@
+"""Test incremental, manifest-based ingestion with a local embedding model (no API keys required)."""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document
+
+from config import settings
+from ingest import parallel_chunking, run_ingestion
+from ingest.manifest import load_manifest, plan_ingestion, save_manifest
+
+PARAMS = {"chunk_size": 256, "chunk_overlap": 20, "embedding_model": "test"}
+
+
+class _CountingEmbedding(MockEmbedding):
+    """Deterministic local embedding that counts embedded texts."""
+
+    embedded: int = 0
+
+    def _get_text_embeddings(self, texts):
+        self.embedded += len(texts)
+        return super()._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+
+def test_plan_detects_changes():
+    """The plan should skip unchanged documents, re-ingest changed ones and prune removed ones."""
+    docs = [Document(id_=f"doc{i}", text=f"Textul {i}.") for i in range(3)]
+    with tempfile.TemporaryDirectory() as tmp:
+        original = settings.chroma_persist_dir
+        settings.chroma_persist_dir = tmp
+        try:
+            first = plan_ingestion("col", PARAMS, existing_vectors=0)
+            assert [d.id_ for d in first.select(docs)] == ["doc0", "doc1", "doc2"]
+            assert first.new == 3 and not first.full and first.finish() == []
+            save_manifest("col", PARAMS, first.hashes)
+
+            edited = [docs[0], Document(id_="doc1", text="Textul 1, revizuit."), Document(id_="doc9", text="Nou.")]
+            plan = plan_ingestion("col", PARAMS, existing_vectors=3)
+            stale: list[str] = []
+            selected = [d.id_ for d in plan.select(iter(edited), on_stale=stale.extend)]
+            assert selected == stale == ["doc1", "doc9"]
+            assert plan.finish() == ["doc2"]
+            assert (plan.unchanged, plan.changed, plan.new, plan.removed) == (1, 1, 1, ["doc2"])
+
+            rebuilt = plan_ingestion("col", {**PARAMS, "chunk_size": 512}, existing_vectors=3)
+            assert rebuilt.full and rebuilt.reason == "parameters changed"
+            legacy = plan_ingestion("other", PARAMS, existing_vectors=10)
+            assert legacy.full and legacy.reason == "no manifest"
+            dropped = plan_ingestion("col", PARAMS, existing_vectors=0)
+            assert dropped.full and dropped.reason == "collection empty"
+        finally:
+            settings.chroma_persist_dir = original
+    print("PASS: Plan detects new, changed and removed documents")
+
+
+def test_incremental_ingest_works():
+    """Re-running ingest_works embeds only new/changed files and keeps no duplicates."""
+    embedding = _CountingEmbedding(embed_dim=8)
+    saved = (settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = str(Path(tmp) / "chroma")
+        settings.data_dir = str(Path(tmp) / "data")
+        run_ingestion._get_embedding = lambda **kwargs: embedding
+        works = Path(settings.data_dir) / "eminescu" / "works"
+        works.mkdir(parents=True)
+        for name in ("luceafarul", "glossa", "oda"):
+            (works / f"{name}.txt").write_text(f"Poezia {name}. " * 5, encoding="utf-8")
+
+        try:
+            first_count = run_ingestion.ingest_works("eminescu")
+            first_embedded = embedding.embedded
+            assert first_count == first_embedded == 3
+
+            # Nothing changed: no embedding calls, same vectors
+            assert run_ingestion.ingest_works("eminescu") == 3
+            assert embedding.embedded == first_embedded
+
+            # One new file, one edited, one removed
+            (works / "scrisoarea.txt").write_text("Scrisoarea I. " * 5, encoding="utf-8")
+            (works / "glossa.txt").write_text("Glossa, varianta noua. " * 5, encoding="utf-8")
+            (works / "oda.txt").unlink()
+            assert run_ingestion.ingest_works("eminescu") == 3
+            assert embedding.embedded == first_embedded + 2
+
+            collection = run_ingestion.get_collection("eminescu_works")
+            sources = sorted(m["source_file"] for m in collection.get(include=["metadatas"])["metadatas"])
+            assert sources == ["glossa.txt", "luceafarul.txt", "scrisoarea.txt"]
+            assert len(load_manifest("eminescu_works")["files"]) == 3
+        finally:
+            settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding = saved
+    print("PASS: Incremental ingestion re-embeds only changed files")
+
+
+def test_reingest_after_collection_dropped():
+    """A dropped collection (e.g. persona deleted) is rebuilt even though the manifest is unchanged."""
+    embedding = _CountingEmbedding(embed_dim=8)
+    saved = (settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = str(Path(tmp) / "chroma")
+        settings.data_dir = str(Path(tmp) / "data")
+        run_ingestion._get_embedding = lambda **kwargs: embedding
+        works = Path(settings.data_dir) / "eminescu" / "works"
+        works.mkdir(parents=True)
+        for name in ("luceafarul", "glossa"):
+            (works / f"{name}.txt").write_text(f"Poezia {name}. " * 5, encoding="utf-8")
+
+        try:
+            assert run_ingestion.ingest_works("eminescu") == 2
+            run_ingestion._get_chroma_client().delete_collection("eminescu_works")
+            assert run_ingestion.ingest_works("eminescu") == 2
+            assert run_ingestion.get_collection("eminescu_works").count() == 2
+        finally:
+            settings.chroma_persist_dir, settings.data_dir, run_ingestion._get_embedding = saved
+            run_ingestion._embedding_cache = None
+    print("PASS: Dropped collection is re-ingested")
+
+
+def test_streaming_pipeline_batches_by_node_count():
+    """Documents are pulled lazily and written in batches of at most `batch_size` nodes."""
+    embedding = _CountingEmbedding(embed_dim=8)
+    pulled: list[int] = []
+    written: list[tuple[int, int]] = []  # (batch size, documents pulled when written)
+
+    def docs():
+        for i in range(20):
+            pulled.append(i)
+            yield Document(id_=f"doc{i}", text=" ".join(f"Versul {i}.{j} din poem." for j in range(60)))
+
+    pipeline = SimpleNamespace(
+        transformations=[SentenceSplitter(chunk_size=64, chunk_overlap=0), embedding],
+        vector_store=SimpleNamespace(add=lambda nodes: written.append((len(nodes), len(pulled)))),
+    )
+    original = (settings.ingest_embedding_batch_size, settings.ingest_embedding_concurrency)
+    min_unit_chars = parallel_chunking.MIN_UNIT_CHARS
+    settings.ingest_embedding_batch_size, settings.ingest_embedding_concurrency = 10, 2
+    parallel_chunking.MIN_UNIT_CHARS = 1  # one document per unit of work
+    try:
+        total = run_ingestion._run_pipeline_streaming(pipeline, docs())
+    finally:
+        settings.ingest_embedding_batch_size, settings.ingest_embedding_concurrency = original
+        parallel_chunking.MIN_UNIT_CHARS = min_unit_chars
+
+    assert total == embedding.embedded == sum(size for size, _ in written) > 20
+    assert max(size for size, _ in written) == 10
+    assert written[0][1] < 20  # the first batch was written before the corpus was read
+    print("PASS: Streaming pipeline batches writes by node count")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("INCREMENTAL INGESTION TESTS")
+    print("=" * 60)
+
+    test_plan_detects_changes()
+    test_incremental_ingest_works()
+    test_reingest_after_collection_dropped()
+    test_streaming_pipeline_batches_by_node_count()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,167 @@
+"""Test the BM25 lexical index and hybrid fusion (no API keys required)."""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ingest.lexical_index import (
+    BM25Index,
+    fold_diacritics,
+    is_lexical_query,
+    reciprocal_rank_fusion,
+)
+
+TEXTS = [
+    "Scrisoarea III începe cu visul sultanului și lupta de la Rovine.",
+    "Luceafărul este un poem despre geniu și iubirea imposibilă.",
+    "Ştefan cel Mare apare în Doina, ca apărător al ţării.",
+    "Jupân Dumitrache și Ipingescu discută despre revoluție în Noaptea furtunoasă.",
+]
+
+
+def _index() -> BM25Index:
+    ids = [f"n{i}" for i in range(len(TEXTS))]
+    return BM25Index.build(ids, TEXTS, [{"source_file": f"{i}.txt"} for i in ids])
+
+
+def test_diacritic_folding():
+    """Comma-below and cedilla variants should fold to the same ASCII form."""
+    assert fold_diacritics("Ștefan Țepeș") == "stefan tepes"
+    assert fold_diacritics("Ştefan Ţepeş") == "stefan tepes"
+    assert fold_diacritics("ĂÂÎ ăâî") == "aai aai"
+    print("PASS: Diacritic folding")
+
+
+def test_bm25_exact_lookup():
+    """Titles and names should match regardless of diacritics and case."""
+    index = _index()
+    assert index.ids[index.search("scrisoarea III", 2)[0][0]] == "n0"
+    assert index.ids[index.search("stefan cel mare", 2)[0][0]] == "n2"
+    assert index.ids[index.search("JUPAN DUMITRACHE", 2)[0][0]] == "n3"
+    assert index.search("cuvant inexistent", 2) == []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "col.json"
+        index.save(path)
+        loaded = BM25Index.load(path)
+    assert loaded.search("Luceafarul", 1) == index.search("Luceafarul", 1)
+    print("PASS: BM25 exact lookup with folding and persistence")
+
+
+def test_rrf_and_lexical_only_query():
+    """RRF favours items ranked by both lists; quoted queries skip vector search."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert fused[0][0] == "b"
+
+    assert is_lexical_query('"Scrisoarea III"')
+    assert is_lexical_query("„Noaptea furtunoasă”")
+    assert not is_lexical_query("Ce este Scrisoarea III?")
+
+    from agent import mcp_server
+
+    index = _index()
+    original = mcp_server._get_lexical_index, mcp_server._get_retriever
+
+    def no_retriever(*_):
+        raise AssertionError("vector retriever used for a lexical-only query")
+
+    mcp_server._get_lexical_index = lambda *_: index
+    mcp_server._get_retriever = no_retriever
+    try:
+        nodes = mcp_server._retrieve_nodes('"Scrisoarea III"', "eminescu", "works", None, True)
+        assert nodes[0].node_id == "n0"
+
+        # Hybrid: dense ranks n1 first, lexical ranks n0 first; both are kept
+        dense = [SimpleNamespace(node_id="n1", score=0.9), SimpleNamespace(node_id="n3", score=0.5)]
+        mcp_server._get_retriever = lambda *_: SimpleNamespace(retrieve=lambda bundle: list(dense))
+        nodes = mcp_server._retrieve_nodes("Scrisoarea III Luceafarul", "eminescu", "works", [0.1], False)
+        ids = [n.node_id for n in nodes]
+        assert {"n0", "n1"} <= set(ids), ids
+    finally:
+        mcp_server._get_lexical_index, mcp_server._get_retriever = original
+    print("PASS: RRF fusion and lexical-only retrieval")
+
+
+class _FakeCollection:
+    """Chroma collection stand-in serving `get(limit, offset)` batches."""
+
+    name = "fake_works"
+
+    def __init__(self, ids, texts, metadatas):
+        self.ids, self.texts, self.metadatas = ids, texts, metadatas
+        self.calls = 0
+
+    def get(self, include, limit, offset):
+        assert "embeddings" not in include
+        self.calls += 1
+        window = slice(offset, offset + limit)
+        return {"ids": self.ids[window], "documents": self.texts[window], "metadatas": self.metadatas[window]}
+
+
+def test_build_from_batches_matches_one_shot():
+    """Streaming the collection in batches builds the same index as one pass."""
+    from ingest import lexical_index
+
+    ids = [f"n{i}" for i in range(len(TEXTS))]
+    metadatas = [{"source_file": f"{i}.txt", "_node_content": "{}"} for i in ids]
+    collection = _FakeCollection(ids, TEXTS, metadatas)
+    whole = _index()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = lexical_index.lexical_index_path
+        lexical_index.lexical_index_path = lambda name: Path(tmp) / f"{name}.json"
+        try:
+            streamed = lexical_index.build_lexical_index(collection, "g1", batch_size=3)
+            loaded = BM25Index.load(Path(tmp) / "fake_works.json")
+        finally:
+            lexical_index.lexical_index_path = original
+
+    assert collection.calls == 3  # two batches and the empty end
+    assert streamed.postings == whole.postings and streamed.doc_lens == whole.doc_lens
+    assert streamed.metadatas == whole.metadatas  # LlamaIndex internals dropped
+    assert loaded.generation == "g1"
+    assert loaded.search("stefan cel mare", 2) == whole.search("stefan cel mare", 2)
+    print("PASS: Batched build matches the one-shot index")
+
+
+def test_stale_index_falls_back_to_vector_search():
+    """An index saved for another ingestion generation is not served."""
+    from agent import mcp_server
+
+    index = _index()
+    index.generation = "g1"
+    saved = mcp_server.lexical_index_path, mcp_server._collection_generation, mcp_server._lexical_cache
+    mcp_server._lexical_cache = mcp_server.RetrieverCache(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "col.json"
+        index.save(path)
+        mcp_server.lexical_index_path = lambda name: path
+        try:
+            mcp_server._collection_generation = lambda name: "g2"
+            assert mcp_server._get_lexical_index("eminescu", "works") is None
+
+            mcp_server._collection_generation = lambda name: "g1"
+            current = mcp_server._get_lexical_index("eminescu", "works")
+            assert current is not None and len(current) == len(TEXTS)
+        finally:
+            mcp_server.lexical_index_path, mcp_server._collection_generation, mcp_server._lexical_cache = saved
+    print("PASS: Stale lexical index falls back to vector search")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LEXICAL INDEX TESTS")
+    print("=" * 60)
+
+    test_diacritic_folding()
+    test_bm25_exact_lookup()
+    test_rrf_and_lexical_only_query()
+    test_build_from_batches_matches_one_shot()
+    test_stale_index_falls_back_to_vector_search()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
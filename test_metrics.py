@@ -0,0 +1,93 @@
+"""Test Prometheus metrics recording and the /metrics route (no API keys required)."""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent import mcp_server
+from agent.metrics import REGISTRY, record_cache
+from agent.synthesis_client import get_synthesis_manager
+
+_USAGE = SimpleNamespace(
+    input_tokens=100, output_tokens=30, cache_read_input_tokens=0, cache_creation_input_tokens=500
+)
+
+
+class _FakeMessages:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    async def create(self, **request):
+        if self.fail:
+            raise RuntimeError("API indisponibil")
+        return SimpleNamespace(content=[SimpleNamespace(text="Raspuns.")], usage=_USAGE)
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _synthesize(persona: str, fail: bool = False) -> str:
+    get_synthesis_manager()._client = SimpleNamespace(messages=_FakeMessages(fail))
+    try:
+        return asyncio.run(mcp_server._synthesize_with_claude(
+            "Intrebare", "context", "  - sursa", "voice", "Emil Cioran", persona_id=persona,
+        ))
+    finally:
+        get_synthesis_manager()._client = None
+
+
+def test_synthesis_metrics():
+    """Synthesis should record latency and token usage under the persona label."""
+    count = _sample("persona_synthesis_seconds_count", persona="cioran")
+    output = _sample("persona_synthesis_tokens_total", persona="cioran", type="output")
+    writes = _sample("persona_synthesis_tokens_total", persona="cioran", type="cache_creation_input")
+
+    assert _synthesize("cioran") == "Raspuns."
+
+    assert _sample("persona_synthesis_seconds_count", persona="cioran") == count + 1
+    assert _sample("persona_synthesis_tokens_total", persona="cioran", type="output") == output + 30
+    assert _sample("persona_synthesis_tokens_total", persona="cioran", type="cache_creation_input") == writes + 500
+    print("PASS: Synthesis latency and tokens")
+
+
+def test_synthesis_fallback_counted():
+    """A failed synthesis should count a fallback and still observe its latency."""
+    fallbacks = _sample("persona_synthesis_fallbacks_total", persona="eliade")
+    result = _synthesize("eliade", fail=True)
+    assert isinstance(result, mcp_server._FallbackAnswer)
+    assert _sample("persona_synthesis_fallbacks_total", persona="eliade") == fallbacks + 1
+    assert _sample("persona_synthesis_seconds_count", persona="eliade") >= 1
+    print("PASS: Synthesis fallback counted")
+
+
+def test_metrics_route():
+    """/metrics should serve the text exposition format with the labelled series."""
+    record_cache("retriever", False, "eminescu", "works")
+    response = asyncio.run(mcp_server.metrics(None))
+    body = response.body.decode()
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE persona_retrieval_seconds histogram" in body
+    assert (
+        'persona_cache_requests_total{cache="retriever",collection_type="works",'
+        'persona="eminescu",result="miss"}'
+    ) in body
+    print("PASS: /metrics route")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("METRICS TESTS")
+    print("=" * 60)
+
+    test_synthesis_metrics()
+    test_synthesis_fallback_counted()
+    test_metrics_route()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,93 @@
+"""Test multi-process chunking for ingestion (no API keys required)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document, NodeRelationship
+
+from ingest import parallel_chunking
+from ingest.parallel_chunking import chunk_documents
+
+
+def _docs(n: int) -> list[Document]:
+    return [
+        Document(
+            id_=f"opera{i}.txt",
+            text=" ".join(f"Strofa {i}.{j} despre codru si izvor." for j in range(40 + 25 * (i % 4))),
+            metadata={"source_file": f"opera{i}.txt"},
+        )
+        for i in range(n)
+    ]
+
+
+def _summary(nodes) -> list[tuple]:
+    return [
+        (
+            n.ref_doc_id,
+            n.text,
+            n.relationships.get(NodeRelationship.PREVIOUS) is not None,
+            n.relationships.get(NodeRelationship.NEXT) is not None,
+        )
+        for n in nodes
+    ]
+
+
+def test_parallel_matches_single_process():
+    """Pooled chunking yields the same nodes, in the same order, as the single-process path."""
+    docs = _docs(12)
+    serial = [node for doc in docs for node in run_transformations([doc], [SentenceSplitter(chunk_size=64, chunk_overlap=8)])]
+    original = parallel_chunking.MIN_UNIT_CHARS
+    parallel_chunking.MIN_UNIT_CHARS = 1  # one document per unit of work
+    try:
+        pooled = list(chunk_documents(iter(docs), 64, 8, workers=2))
+    finally:
+        parallel_chunking.MIN_UNIT_CHARS = original
+        parallel_chunking.shutdown_pool()
+
+    assert len(pooled) > len(docs)
+    assert _summary(pooled) == _summary(serial)
+    # prev/next links point at the reassembled neighbours
+    for prev, node in zip(pooled, pooled[1:]):
+        if prev.ref_doc_id == node.ref_doc_id:
+            assert node.relationships[NodeRelationship.PREVIOUS].node_id == prev.node_id
+    print("PASS: Parallel chunking matches the single-process path")
+
+
+def test_small_documents_are_grouped():
+    """Documents below the unit size share one unit of work; input is consumed lazily."""
+    pulled: list[int] = []
+
+    def docs():
+        for i, doc in enumerate(_docs(6)):
+            pulled.append(i)
+            yield doc
+
+    assert [len(u) for u in parallel_chunking._units(_docs(6))] == [6]
+
+    original = parallel_chunking.MIN_UNIT_CHARS
+    parallel_chunking.MIN_UNIT_CHARS = 1000
+    try:
+        assert [len(u) for u in parallel_chunking._units(_docs(6))] == [1] * 6
+        nodes = chunk_documents(docs(), 64, 8, workers=1)
+        assert next(nodes).ref_doc_id == "opera0.txt"
+        assert pulled == [0]
+    finally:
+        parallel_chunking.MIN_UNIT_CHARS = original
+    print("PASS: Small documents are grouped into one unit of work")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PARALLEL CHUNKING TESTS")
+    print("=" * 60)
+
+    test_parallel_matches_single_process()
+    test_small_documents_are_grouped()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
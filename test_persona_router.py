@@ -0,0 +1,102 @@
+"""Test centroid-based persona routing (no API keys required)."""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.persona_router import PersonaRouter
+from config import settings
+from ingest.snapshot import representative_vectors, write_snapshot
+
+DIM = 64
+
+
+def _topic_vectors(center: np.ndarray, n: int, rng) -> np.ndarray:
+    return center + 0.1 * rng.standard_normal((n, DIM)).astype(np.float32)
+
+
+def test_representative_vectors():
+    """k-means centroids should be unit length and cover each topic cluster."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((3, DIM)).astype(np.float32)
+    data = np.vstack([_topic_vectors(c, 40, rng) for c in centers])
+    centroids = representative_vectors(data, k=3)
+    assert centroids.shape == (3, DIM)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+    for center in centers:
+        best = centroids @ (center / np.linalg.norm(center))
+        assert best.max() > 0.9
+    print("PASS: Representative vectors")
+
+
+def test_router_ranks_personas_from_snapshots():
+    """Centroids written at ingestion should route a query to the matching persona."""
+    rng = np.random.default_rng(1)
+    topics = {pid: rng.standard_normal(DIM).astype(np.float32) for pid in ("eminescu", "bratianu", "cioran")}
+    registry = {
+        pid: SimpleNamespace(**{f"{t}_collection": f"{pid}_{t}" for t in ("profile", "works", "quotes")})
+        for pid in topics
+    }
+
+    original = settings.chroma_persist_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = tmp
+        try:
+            for pid, topic in topics.items():
+                for ct in ("profile", "works"):  # quotes missing: skipped
+                    vectors = _topic_vectors(topic, 30, rng)
+                    ids = [f"{pid}-{ct}-{i}" for i in range(30)]
+                    write_snapshot(f"{pid}_{ct}", ids, ids, [{}] * 30, vectors)
+            router = PersonaRouter.from_registry(registry, ("profile", "works", "quotes"))
+        finally:
+            settings.chroma_persist_dir = original
+
+    assert len(router) == 3
+    ranked = router.rank(topics["bratianu"] + 0.05 * rng.standard_normal(DIM), limit=2)
+    assert ranked[0][0] == "bratianu" and len(ranked) == 2
+    assert ranked[0][1] > ranked[1][1]
+    print("PASS: Router ranks personas from snapshot centroids")
+
+
+def test_suggest_personas_tool():
+    """The MCP tool should return registry personas, best first, up to `limit`."""
+    from agent import mcp_server
+
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((4, DIM)).astype(np.float32)
+    router = PersonaRouter(["eminescu", "eminescu", "cioran", "caragiale"], vectors)
+
+    async def fake_embed(query):
+        return vectors[2].tolist()
+
+    original = mcp_server.embed_query, mcp_server._get_persona_router
+    mcp_server.embed_query = fake_embed
+    mcp_server._get_persona_router = lambda: router
+    try:
+        result = asyncio.run(mcp_server.suggest_personas("Despre neant si disperare", limit=2))
+    finally:
+        mcp_server.embed_query, mcp_server._get_persona_router = original
+
+    assert [r["persona"] for r in result][0] == "cioran"
+    assert len(result) == 2 and result[0]["display_name"]
+    print("PASS: suggest_personas tool")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PERSONA ROUTER TESTS")
+    print("=" * 60)
+
+    test_representative_vectors()
+    test_router_ranks_personas_from_snapshots()
+    test_suggest_personas_tool()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
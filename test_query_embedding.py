@@ -0,0 +1,72 @@
+"""Test the query embedding stage and its LRU cache (no API keys required)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import agent.query_embedding as qe
+from agent.query_embedding import QueryEmbeddingCache, normalize_query
+
+
+class _CountingEmbedModel:
+    """Stand-in for OpenAIEmbedding that counts embedding calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def aget_query_embedding(self, query: str) -> list[float]:
+        self.calls += 1
+        return [float(len(query)), 1.0]
+
+
+def test_normalize_query():
+    """Whitespace and case differences should map to the same cache key."""
+    assert normalize_query("  Ce este   Luceafarul? ") == normalize_query("ce este luceafarul?")
+    assert normalize_query("Scrisoarea\tIII") == "scrisoarea iii"
+    print("PASS: Query normalization")
+
+
+def test_lru_eviction():
+    """The cache should evict the least recently used entry when full."""
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put(("m", "a"), [1.0])
+    cache.put(("m", "b"), [2.0])
+    assert cache.get(("m", "a")) == [1.0]  # "a" becomes most recent
+    cache.put(("m", "c"), [3.0])
+    assert cache.get(("m", "b")) is None, "Least recently used entry should be evicted"
+    assert cache.get(("m", "a")) == [1.0]
+    assert cache.get(("m", "c")) == [3.0]
+    assert len(cache) == 2
+    print("PASS: LRU eviction")
+
+
+def test_embed_query_cached():
+    """Repeated (normalized) queries should hit the embedding model only once."""
+    model = _CountingEmbedModel()
+    qe._embed_model = model
+    qe._cache.clear()
+    try:
+        first = asyncio.run(qe.embed_query("Ce crezi despre politica?"))
+        second = asyncio.run(qe.embed_query("ce crezi   despre politica?"))
+        assert first == second
+        assert model.calls == 1, f"Expected 1 embedding call, got {model.calls}"
+        print("PASS: Repeated query served from cache")
+    finally:
+        qe._embed_model = None
+        qe._cache.clear()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUERY EMBEDDING TESTS")
+    print("=" * 60)
+
+    test_normalize_query()
+    test_lru_eviction()
+    test_embed_query_cached()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
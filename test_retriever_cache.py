@@ -0,0 +1,57 @@
+"""Test the bounded, version-aware retriever cache (no API keys required)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.retriever_cache import RetrieverCache
+
+
+def test_stamp_change_reloads():
+    """A new top_k or ingestion generation should rebuild the retriever."""
+    cache = RetrieverCache(max_entries=10)
+    loads = []
+
+    def loader(tag):
+        def load():
+            loads.append(tag)
+            return f"retriever-{tag}"
+        return load
+
+    key = ("eminescu", "works")
+    assert cache.get_or_load(key, (8, "gen1"), loader("a")) == "retriever-a"
+    assert cache.get_or_load(key, (8, "gen1"), loader("b")) == "retriever-a", "Same stamp should hit"
+    assert cache.get_or_load(key, (12, "gen1"), loader("c")) == "retriever-c", "top_k change should reload"
+    assert cache.get_or_load(key, (12, "gen2"), loader("d")) == "retriever-d", "Re-ingestion should reload"
+    assert loads == ["a", "c", "d"]
+    assert cache.stats()["reloads"] == 2
+    print("PASS: Stale retrievers rebuilt on stamp change")
+
+
+def test_lru_eviction_and_prune():
+    """Cold retrievers are evicted beyond the budget; removed personas are pruned."""
+    cache = RetrieverCache(max_entries=2)
+    cache.get_or_load(("eminescu", "works"), 1, lambda: "e")
+    cache.get_or_load(("cioran", "works"), 1, lambda: "c")
+    cache.get_or_load(("eminescu", "works"), 1, lambda: "unused")  # eminescu most recent
+    cache.get_or_load(("eliade", "works"), 1, lambda: "el")
+
+    assert ("cioran", "works") not in cache, "Least recently used retriever should be evicted"
+    assert ("eminescu", "works") in cache and ("eliade", "works") in cache
+    assert cache.prune({"eminescu"}) == 1
+    assert len(cache) == 1
+    print("PASS: LRU eviction and pruning")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RETRIEVER CACHE TESTS")
+    print("=" * 60)
+
+    test_stamp_change_reloads()
+    test_lru_eviction_and_prune()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,120 @@
+"""Test the asynchronous slow-query log (no API keys required)."""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent import mcp_server, slow_query_log
+from agent.context import RetrievedChunk
+from agent.slow_query_log import SlowQueryLog
+from config import settings
+
+
+def _read(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writer_batches_without_blocking():
+    """record() returns immediately; close() writes every queued entry in order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "logs" / "slow.jsonl"
+        log = SlowQueryLog(path, batch_size=10, flush_interval=0.05)
+
+        start = time.perf_counter()
+        for i in range(25):
+            log.record({"i": i})
+        assert time.perf_counter() - start < 0.5
+
+        log.close()
+        assert [e["i"] for e in _read(path)] == list(range(25))
+        assert log.written == 25 and log.dropped == 0
+    print("PASS: Writer batches without blocking")
+
+
+def test_full_queue_drops():
+    """A full queue drops entries (counted) instead of blocking the caller."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SlowQueryLog(Path(tmp) / "slow.jsonl", max_pending=1)
+        log._ensure_started = lambda: None  # writer not running: nothing drains the queue
+        log.record({"i": 0})
+        log.record({"i": 1})
+        assert log.dropped == 1
+    print("PASS: Full queue drops entries")
+
+
+def test_slow_answer_is_logged():
+    """A slow answer is recorded with stage timings, chunk scores, prompt size and model."""
+
+    async def embed(query):
+        return [0.1, 0.2, 0.3]
+
+    async def search(query, persona_id, collection_type, query_embedding=None, lexical_only=False):
+        return [RetrievedChunk(
+            text=f"Text din {collection_type}.", source=f"{collection_type}.txt",
+            collection_type=collection_type, node_id=f"{collection_type}-1", score=0.5,
+        )]
+
+    async def synthesize(query, context, source_list, voice_prompt, display_name, on_text=None,
+                         persona_id=None, diagnostics=None):
+        diagnostics.update(model="model-test", prompt_tokens=321)
+        return "Raspuns."
+
+    async def noop(text):
+        pass
+
+    from personas import get_persona
+
+    saved = (
+        mcp_server._embed_query, mcp_server._search_collection,
+        mcp_server._synthesize_with_claude, mcp_server.get_answer_cache,
+        settings.slow_query_log_seconds, settings.slow_query_log_path, slow_query_log._log,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "slow.jsonl"
+        mcp_server._embed_query = embed
+        mcp_server._search_collection = search
+        mcp_server._synthesize_with_claude = synthesize
+        mcp_server.get_answer_cache = lambda: None
+        settings.slow_query_log_seconds = 1e-9
+        settings.slow_query_log_path = str(path)
+        slow_query_log._log = None
+        try:
+            answer = asyncio.run(mcp_server._answer_persona("Ce este timpul?", get_persona("eliade"), noop))
+            slow_query_log.get_slow_query_log().close()
+            records = _read(path)
+        finally:
+            (
+                mcp_server._embed_query, mcp_server._search_collection,
+                mcp_server._synthesize_with_claude, mcp_server.get_answer_cache,
+                settings.slow_query_log_seconds, settings.slow_query_log_path, slow_query_log._log,
+            ) = saved
+
+    assert answer == "Raspuns."
+    [record] = records
+    assert record["persona"] == "eliade" and record["query"] == "Ce este timpul?"
+    assert {"embedding", "retrieval_profile", "retrieval_works", "retrieval_quotes",
+            "context", "synthesis"} <= set(record["stages"])
+    assert {c["node_id"] for c in record["chunks"]} == {"profile-1", "works-1", "quotes-1"}
+    assert all(c["score"] == 0.5 and c["in_context"] for c in record["chunks"])
+    assert record["prompt_tokens"] == 321 and record["model"] == "model-test"
+    assert record["fallback"] is False
+    print("PASS: Slow answer is logged")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SLOW-QUERY LOG TESTS")
+    print("=" * 60)
+
+    test_writer_batches_without_blocking()
+    test_full_queue_drops()
+    test_slow_answer_is_logged()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
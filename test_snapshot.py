@@ -0,0 +1,113 @@
+"""Test memory-mapped embedding snapshots (no API keys required)."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent.flat_index import FlatIndex
+from config import settings
+from ingest import snapshot as snapshot_module
+from ingest.snapshot import Snapshot, write_snapshot, write_snapshot_batches
+
+
+def _data(n: int = 50, dim: int = 32):
+    rng = np.random.default_rng(5)
+    ids = [f"id-{i}" for i in range(n)]
+    texts = [f"Fragmentul {i}: dorul, țara și ştiinţa" for i in range(n)]
+    metadatas = [{"source_file": f"opera_{i}.txt", "source_type": "literary_work"} for i in range(n)]
+    return ids, texts, metadatas, rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_snapshot_roundtrip():
+    """Records and embeddings should read back exactly, through mmap."""
+    ids, texts, metadatas, embeddings = _data()
+    original = settings.chroma_persist_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = tmp
+        try:
+            write_snapshot("eminescu_works", ids, texts, metadatas, embeddings, generation="g1")
+            snapshot = Snapshot.open("eminescu_works")
+            assert snapshot.generation == "g1" and len(snapshot) == 50
+            assert isinstance(snapshot.embeddings, np.memmap)
+            assert snapshot.ids[7] == "id-7" and snapshot.ids[-1] == "id-49"
+            assert snapshot.texts[3] == texts[3]
+            assert snapshot.metadatas[10] == metadatas[10]
+            assert Snapshot.open("missing_collection") is None
+
+            # Re-ingestion replaces the snapshot atomically
+            write_snapshot("eminescu_works", ids[:5], texts[:5], metadatas[:5], embeddings[:5], "g2")
+            assert Snapshot.open("eminescu_works").generation == "g2"
+        finally:
+            settings.chroma_persist_dir = original
+    print("PASS: Snapshot roundtrip through mmap")
+
+
+def test_flat_index_over_snapshot():
+    """A flat index over a snapshot should search the mapped file without copying it."""
+    ids, texts, metadatas, embeddings = _data()
+    in_memory = FlatIndex(ids, texts, metadatas, embeddings)
+    original = settings.chroma_persist_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = tmp
+        try:
+            write_snapshot("cioran_quotes", ids, texts, metadatas, embeddings)
+            mapped = FlatIndex.from_snapshot(Snapshot.open("cioran_quotes"))
+            assert isinstance(mapped.matrix, np.memmap)
+
+            query = embeddings[12]
+            assert [i for i, _ in mapped.search(query, 5)] == [i for i, _ in in_memory.search(query, 5)]
+            assert mapped.ids[mapped.search(query, 1)[0][0]] == "id-12"
+
+            quantized = FlatIndex.from_snapshot(Snapshot.open("cioran_quotes"), quantization="int8", rescore=True)
+            assert quantized.search(query, 1)[0][0] == 12
+        finally:
+            settings.chroma_persist_dir = original
+    print("PASS: Flat index over a memory-mapped snapshot")
+
+
+def test_streamed_snapshot_matches_in_memory():
+    """Batches streamed into the memmap give the same snapshot and centroids as one block."""
+    ids, texts, metadatas, embeddings = _data(n=45)
+    batches = [
+        (ids[i:i + 10], texts[i:i + 10], metadatas[i:i + 10], embeddings[i:i + 10]) for i in range(0, 45, 10)
+    ]
+    original = (settings.chroma_persist_dir, snapshot_module._BLOCK_ROWS)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.chroma_persist_dir = tmp
+        try:
+            write_snapshot("whole", ids, texts, metadatas, embeddings, "g1")
+            snapshot_module._BLOCK_ROWS = 7  # cluster and copy in small blocks
+            # `count` is an upper bound (chunks deleted while streaming)
+            write_snapshot_batches("streamed", iter(batches), 50, "g1")
+
+            whole, streamed = Snapshot.open("whole"), Snapshot.open("streamed")
+            assert len(streamed) == 45 and streamed.embeddings.shape == (45, 32)
+            assert np.allclose(whole.embeddings, streamed.embeddings)
+            assert streamed.ids[44] == "id-44" and streamed.metadatas[12] == metadatas[12]
+            # Centroids clustered block-wise on the memmap match the single-block result
+            assert np.allclose(
+                np.load(Path(tmp) / "snapshots" / "streamed" / "centroids.npy"),
+                np.load(Path(tmp) / "snapshots" / "whole" / "centroids.npy"),
+                atol=1e-5,
+            )
+        finally:
+            settings.chroma_persist_dir, snapshot_module._BLOCK_ROWS = original
+    print("PASS: Streamed snapshot matches in-memory snapshot")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SNAPSHOT TESTS")
+    print("=" * 60)
+
+    test_snapshot_roundtrip()
+    test_streamed_snapshot_matches_in_memory()
+    test_flat_index_over_snapshot()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,128 @@
+"""Test Claude synthesis request handling with a fake Anthropic client (no API keys required)."""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent import mcp_server
+from agent.synthesis_client import get_synthesis_manager
+
+
+_USAGE = SimpleNamespace(
+    input_tokens=120, output_tokens=40, cache_read_input_tokens=900, cache_creation_input_tokens=0
+)
+
+
+class _FakeStream:
+    def __init__(self, parts: list[str]):
+        self._parts = parts
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for part in self._parts:
+            yield part
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=_USAGE)
+
+
+class _FakeMessages:
+    def __init__(self, parts: list[str]):
+        self.parts = parts
+        self.requests: list[dict] = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return SimpleNamespace(content=[SimpleNamespace(text="".join(self.parts))], usage=_USAGE)
+
+    def stream(self, **request):
+        self.requests.append(request)
+        return _FakeStream(self.parts)
+
+
+def _with_fake_client(parts: list[str]) -> _FakeMessages:
+    messages = _FakeMessages(parts)
+    get_synthesis_manager()._client = SimpleNamespace(messages=messages)
+    return messages
+
+
+def test_streaming_synthesis_forwards_deltas():
+    """Streaming mode should pass every text delta to the callback as it arrives."""
+    _with_fake_client(["Luceafarul ", "este ", "dorul de absolut."])
+    received: list[str] = []
+
+    async def on_text(text: str):
+        received.append(text)
+
+    try:
+        result = asyncio.run(mcp_server._synthesize_with_claude(
+            "Ce este Luceafarul?", "context", "  - sursa", "voice", "Mihai Eminescu",
+            on_text=on_text,
+        ))
+    finally:
+        get_synthesis_manager()._client = None
+
+    assert received == ["Luceafarul ", "este ", "dorul de absolut."]
+    assert result == "".join(received)
+    print("PASS: Streaming synthesis forwards deltas")
+
+
+def test_non_streaming_synthesis():
+    """Without a callback the regular (non-streaming) API should be used."""
+    messages = _with_fake_client(["Raspuns complet."])
+    try:
+        result = asyncio.run(mcp_server._synthesize_with_claude(
+            "Intrebare", "context", "  - sursa", "voice", "Emil Cioran",
+        ))
+    finally:
+        get_synthesis_manager()._client = None
+
+    assert result == "Raspuns complet."
+    assert messages.requests[0]["model"]
+    print("PASS: Non-streaming synthesis")
+
+
+def test_prompt_caching_prefix():
+    """Voice prompt + static instructions form the cached system prefix; usage is recorded."""
+    messages = _with_fake_client(["Raspuns."])
+    manager = get_synthesis_manager()
+    reads_before = manager.usage["cache_read_input_tokens"]
+    try:
+        asyncio.run(mcp_server._synthesize_with_claude(
+            "Intrebare", "CONTEXT-VARIABIL", "  - sursa", "VOCEA-PERSONALITATII", "Ion Luca Caragiale",
+        ))
+    finally:
+        manager._client = None
+
+    request = messages.requests[0]
+    system = request["system"]
+    assert system[0]["text"] == "VOCEA-PERSONALITATII"
+    assert "Instructiuni de Raspuns" in system[-1]["text"]
+    assert system[-1]["cache_control"] == {"type": "ephemeral"}
+    user_content = request["messages"][0]["content"]
+    assert "CONTEXT-VARIABIL" in user_content and "Instructiuni" not in user_content
+    assert manager.usage["cache_read_input_tokens"] == reads_before + 900
+    print("PASS: Stable system prefix marked for prompt caching")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SYNTHESIS TESTS")
+    print("=" * 60)
+
+    test_streaming_synthesis_forwards_deltas()
+    test_non_streaming_synthesis()
+    test_prompt_caching_prefix()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
@@ -0,0 +1,96 @@
+"""Test per-request tracing with the local file exporter (no API keys required)."""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent import tracing
+from agent.concurrency import StageLimiter
+from config import settings
+
+
+def _read_spans(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_disabled_span_is_noop():
+    """With the default exporter (none), spans cost nothing and accept attributes."""
+    assert tracing.configure_tracing("none") is False
+    with tracing.span("ask_persona", persona="eminescu") as current:
+        current.set_attribute("chunks", 3)
+    print("PASS: Disabled tracing is a no-op")
+
+
+def test_file_exporter_nests_spans_across_threads():
+    """Spans opened on a StageLimiter worker thread are children of the caller's span."""
+    stage = StageLimiter("test", max_concurrency=2, max_workers=2)
+
+    def blocking_query():
+        with tracing.span("vector_query", retriever="FlatRetriever"):
+            return tracing.get_request_id()
+
+    async def request():
+        tracing.set_request_id("req-123")
+        with tracing.span("search_collection", persona="cioran", collection_type="works"):
+            return await stage.run(blocking_query)
+
+    original = settings.tracing_file
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.tracing_file = str(Path(tmp) / "traces.jsonl")
+        try:
+            assert tracing.configure_tracing("file") is True
+            seen_request_id = asyncio.run(request())
+            tracing.shutdown_tracing()
+            spans = {s["name"]: s for s in _read_spans(Path(settings.tracing_file))}
+        finally:
+            settings.tracing_file = original
+            stage.shutdown()
+
+    assert seen_request_id == "req-123"
+    parent, child = spans["search_collection"], spans["vector_query"]
+    assert child["parent_id"] == parent["span_id"]
+    assert child["trace_id"] == parent["trace_id"]
+    assert parent["attributes"] == {"persona": "cioran", "collection_type": "works", "request.id": "req-123"}
+    assert child["duration_ms"] >= 0
+    print("PASS: File exporter nests spans across threads")
+
+
+def test_request_id_middleware():
+    """The HTTP middleware should reuse a client X-Request-ID and echo it back."""
+    from agent.mcp_server import _wrap_with_request_id
+
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["request_id"] = tracing.get_request_id()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/mcp", "headers": [(b"x-request-id", b"abc-1")]}
+    asyncio.run(_wrap_with_request_id(app)(scope, None, send))
+
+    assert seen["request_id"] == "abc-1"
+    assert [b"x-request-id", b"abc-1"] in sent[0]["headers"]
+    print("PASS: Request ID middleware")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TRACING TESTS")
+    print("=" * 60)
+
+    test_disabled_span_is_noop()
+    test_file_exporter_nests_spans_across_threads()
+    test_request_id_middleware()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)
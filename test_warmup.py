@@ -0,0 +1,110 @@
+"""Test startup warmup and /health readiness gating (no API keys required)."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import personas
+from agent import mcp_server, query_embedding
+
+
+class _Patched:
+    """Replace the loaders warmup calls with local fakes for the duration of a test."""
+
+    def __init__(self, registry_error: Exception | None = None):
+        self.registry_error = registry_error
+        self.warmed: list[tuple[str, str]] = []
+        self.status_during_warmup: str | None = None
+
+    def get_registry(self):
+        self.status_during_warmup = mcp_server._warmup["status"]
+        if self.registry_error is not None:
+            raise self.registry_error
+        return {"eminescu": SimpleNamespace(persona_id="eminescu")}
+
+    def __enter__(self):
+        self._saved = (
+            dict(mcp_server._warmup), personas.get_registry, mcp_server._warm_collection,
+            mcp_server._persona_fingerprint, mcp_server._get_persona_router,
+            query_embedding._get_embed_model, mcp_server.get_synthesis_manager,
+        )
+        personas.get_registry = self.get_registry
+        mcp_server._warm_collection = lambda pid, ct: self.warmed.append((pid, ct))
+        mcp_server._persona_fingerprint = lambda persona_config: "fingerprint"
+        mcp_server._get_persona_router = lambda: None
+        query_embedding._get_embed_model = lambda: None
+        mcp_server.get_synthesis_manager = lambda: SimpleNamespace(client=None)
+        return self
+
+    def __exit__(self, *exc):
+        (
+            warmup, personas.get_registry, mcp_server._warm_collection,
+            mcp_server._persona_fingerprint, mcp_server._get_persona_router,
+            query_embedding._get_embed_model, mcp_server.get_synthesis_manager,
+        ) = self._saved
+        mcp_server._warmup.clear()
+        mcp_server._warmup.update(warmup)
+        return False
+
+
+def _health() -> tuple[int, dict]:
+    response = asyncio.run(mcp_server.health(None))
+    return response.status_code, json.loads(response.body)
+
+
+def test_health_not_ready_while_warming_up():
+    """/health should answer 503 while warmup is pending or running."""
+    with _Patched():
+        for status in ("pending", "running"):
+            mcp_server._warmup.clear()
+            mcp_server._warmup["status"] = status
+            code, body = _health()
+            assert code == 503 and body["status"] == "warming_up"
+            assert body["warmup"]["status"] == status
+    print("PASS: /health is 503 while warming up")
+
+
+def test_health_ready_after_warmup():
+    """Warmup loads every collection and /health turns ready once it is done."""
+    with _Patched() as patched:
+        mcp_server._warmup["status"] = "pending"
+        asyncio.run(mcp_server.warmup_retrievers())
+        code, body = _health()
+
+    assert patched.status_during_warmup == "running"
+    assert sorted(patched.warmed) == sorted(("eminescu", ct) for ct in mcp_server.COLLECTION_TYPES)
+    assert code == 200 and body["status"] == "ok"
+    assert body["warmup"]["status"] == "done"
+    assert body["warmup"]["loaded"] == len(mcp_server.COLLECTION_TYPES)
+    print("PASS: /health is 200 after warmup")
+
+
+def test_health_ready_after_warmup_error():
+    """A failing warmup must not keep the server unready: it serves cold instead."""
+    with _Patched(registry_error=RuntimeError("registry indisponibil")):
+        mcp_server._warmup["status"] = "pending"
+        asyncio.run(mcp_server.warmup_retrievers())
+        code, body = _health()
+
+    assert code == 200 and body["status"] == "ok"
+    assert body["warmup"]["status"] == "done"
+    assert body["warmup"]["error"] == "registry indisponibil"
+    print("PASS: /health is 200 after a warmup error")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("WARMUP / READINESS TESTS")
+    print("=" * 60)
+
+    test_health_not_ready_while_warming_up()
+    test_health_ready_after_warmup()
+    test_health_ready_after_warmup_error()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED")
+    print("=" * 60)